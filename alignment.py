@@ -0,0 +1,127 @@
+INF = 1 << 30
+
+
+class BandedAligner:
+    def __init__(self, phrase, band):
+        """
+        Distancia de edición incremental entre el input y la frase objetivo.
+        Cada pulsación calcula una fila de la matriz de programación dinámica
+        limitada a una banda de +/- band posiciones alrededor de la diagonal:
+        O(band) por tecla y O(1) para borrar (se descarta la última fila)
+
+        Args:
+            phrase: Frase objetivo
+            band: Máximo desplazamiento (caracteres saltados o repetidos) que se alinea
+        """
+        self.phrase = phrase
+        self.band = band
+        self.width = 2 * band + 1
+
+        # Fila 0: distancia de '' a phrase[:j] = j  (celda k <-> j = i - band + k)
+        first = [INF] * self.width
+        for k in range(self.width):
+            j = k - band
+            if 0 <= j <= len(phrase):
+                first[k] = j
+        self.rows = [first]
+        self.distances = [0]  # mínimo de cada fila
+        self.positions = [0]  # posición alineada en la frase tras cada fila
+
+    @property
+    def typed_length(self):
+        return len(self.rows) - 1
+
+    @property
+    def distance(self):
+        """
+        Errores del input actual contra el mejor prefijo alineado de la frase
+        """
+        return self.distances[-1]
+
+    @property
+    def position(self):
+        """
+        Posición de la frase donde continúa el input según la alineación
+        """
+        return self.positions[-1]
+
+    def push(self, char):
+        """
+        Añade un carácter escrito
+
+        Returns:
+            (coincide, errores_nuevos): si el carácter quedó alineado con el mismo
+            carácter de la frase y cuántos errores de edición sumó
+        """
+        phrase = self.phrase
+        phrase_length = len(phrase)
+        band = self.band
+        prev = self.rows[-1]
+        i = len(self.rows)
+        row = [INF] * self.width
+
+        best_k = -1
+        best_value = INF
+        best_match = False
+        for k in range(self.width):
+            j = i - band + k
+            if j < 0 or j > phrase_length:
+                continue
+            if j == 0:
+                value = i
+                match = False
+            else:
+                # prev[k] es (i-1, j-1); prev[k + 1] es (i-1, j); row[k - 1] es (i, j-1)
+                match = phrase[j - 1] == char
+                value = prev[k] + (0 if match else 1)
+                match = match and prev[k] < INF
+                if k + 1 < self.width and prev[k + 1] + 1 < value:
+                    value = prev[k + 1] + 1
+                    match = False
+                if k > 0 and row[k - 1] + 1 < value:
+                    value = row[k - 1] + 1
+                    match = False
+            row[k] = value
+
+            # Mejor celda: menor distancia; a igualdad, la que avanza por coincidencia
+            # y luego la más adelantada en la frase
+            if value < best_value or (value == best_value and (match or not best_match)):
+                best_k, best_value, best_match = k, value, match
+
+        if best_value >= INF:
+            # Fuera de la banda (demasiados caracteres de más): cada tecla es un error
+            best_value = self.distances[-1] + 1
+            position = phrase_length
+        else:
+            position = i - band + best_k
+
+        self.rows.append(row)
+        self.distances.append(best_value)
+        self.positions.append(position)
+        return best_match, max(0, best_value - self.distances[-2])
+
+    def pop(self):
+        """
+        Descarta el último carácter escrito (O(1))
+        """
+        if len(self.rows) > 1:
+            self.rows.pop()
+            self.distances.pop()
+            self.positions.pop()
+
+    def expected_char(self):
+        """
+        Siguiente carácter esperado según la alineación (None al final de la frase)
+        """
+        if self.position < len(self.phrase):
+            return self.phrase[self.position]
+        return None
+
+    def full_distance(self):
+        """
+        Distancia del input completo contra la frase completa (INF si está fuera de la banda)
+        """
+        k = len(self.phrase) - self.typed_length + self.band
+        if 0 <= k < self.width:
+            return self.rows[-1][k]
+        return INF
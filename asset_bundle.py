@@ -0,0 +1,316 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from config import (
+    ASSET_BUNDLE_PATH, COMPLETE_SOUND_PATH, PLAYER_SIZE,
+    MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER
+)
+from floor import FLOOR_TILE_PATH
+from player import SPRITE_CONFIG
+import synth
+
+# Formato del bundle (little-endian):
+#   cabecera: magic 'NMAB', versión u16, cantidad de entradas u16
+#   índice: por entrada nombre (24 bytes UTF-8), tipo u8, clave u64,
+#           offset u32 y tamaño u32 de los datos, ancho u16, alto u16
+#   datos: alineados a DATA_ALIGN bytes
+#     imagen: píxeles RGBA ya convertidos (y escalados por frame si es sprite sheet)
+#     sonido: PCM en el formato del mixer, listo para Sound(buffer=...)
+# La clave es un hash de la fuente (ruta, tamaño, fecha o definición) y del formato:
+# si no coincide con la actual la entrada está vieja y se usa el archivo suelto
+BUNDLE_MAGIC = b'NMAB'
+BUNDLE_VERSION = 1
+HEADER = struct.Struct('<4sHH')
+ENTRY = struct.Struct('<24sBQIIHH')
+DATA_ALIGN = 16
+
+KIND_IMAGE = 0
+KIND_SOUND = 1
+
+# Sonidos procedurales de synth que usa el juego
+SYNTH_SOUNDS = ('error', 'uppercase', 'lowercase')
+
+
+def image_sources():
+    """
+    (nombre, ruta, frames) de las imágenes; frames es None si no es un sprite sheet
+    """
+    sources = [(f"sprite_{anim_name}", sprite['path'], sprite['frames'])
+               for anim_name, sprite in SPRITE_CONFIG.items()]
+    sources.append(('floor_tile', FLOOR_TILE_PATH, None))
+    return sources
+
+
+def sound_sources():
+    """
+    (nombre, ruta) de los sonidos; ruta es None para los procedurales
+    """
+    return [(name, None) for name in SYNTH_SOUNDS] + [('complete', COMPLETE_SOUND_PATH)]
+
+
+def _hash_key(key_data):
+    digest = hashlib.sha1(json.dumps(key_data, sort_keys=True).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return [os.path.normpath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def expected_keys(mixer_format):
+    """
+    Claves actuales de cada asset; las fuentes que faltan no tienen clave
+    """
+    keys = {}
+    for name, path, frames in image_sources():
+        try:
+            keys[name] = _hash_key([BUNDLE_VERSION, _file_key(path), frames, PLAYER_SIZE])
+        except OSError:
+            pass
+    for name, path in sound_sources():
+        try:
+            if path is None:
+                source = [synth.SYNTH_VERSION, synth.SYNTH_SAMPLE_RATE, synth.SOUND_DEFINITIONS[name]]
+            else:
+                source = _file_key(path)
+        except OSError:
+            continue
+        keys[name] = _hash_key([BUNDLE_VERSION, source, list(mixer_format)])
+    return keys
+
+
+class AssetBundle:
+    def __init__(self, path, keys):
+        """
+        Mapea el bundle en memoria y lee su índice; solo quedan disponibles
+        las entradas cuya clave coincide con keys (las demás están viejas)
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        self.entries = {}
+        self.stale = []
+        try:
+            self._read_index(keys)
+        except ValueError:
+            self.close()
+            raise
+
+    def _read_index(self, keys):
+        if len(self.map) < HEADER.size:
+            raise ValueError(f"{self.path} está vacío o truncado")
+        magic, version, count = HEADER.unpack_from(self.map, 0)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            raise ValueError(f"{self.path} no es un bundle de assets (versión {BUNDLE_VERSION})")
+        if HEADER.size + count * ENTRY.size > len(self.map):
+            raise ValueError(f"{self.path}: índice truncado")
+
+        for i in range(count):
+            raw_name, kind, key, offset, size, width, height = ENTRY.unpack_from(
+                self.map, HEADER.size + i * ENTRY.size)
+            name = raw_name.rstrip(b'\0').decode('utf-8')
+            if offset + size > len(self.map):
+                raise ValueError(f"{self.path}: datos de '{name}' truncados")
+            if keys.get(name) != key:
+                self.stale.append(name)
+                continue
+            self.entries[name] = (kind, offset, size, width, height)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def kind(self, name):
+        return self.entries[name][0]
+
+    def data(self, name):
+        """
+        Vista de los datos de una entrada (sin copiar)
+        """
+        _, offset, size, _, _ = self.entries[name]
+        return self.view[offset:offset + size]
+
+    def image(self, name):
+        """
+        Surface RGBA que usa directamente la memoria mapeada; convert_alpha() la copia
+        """
+        _, _, _, width, height = self.entries[name]
+        return pygame.image.frombuffer(self.data(name), (width, height), 'RGBA')
+
+    def sound(self, name):
+        """
+        Sound creado desde el PCM mapeado (requiere el mixer inicializado)
+        """
+        return pygame.mixer.Sound(buffer=self.data(name))
+
+    def close(self):
+        """
+        Libera el mapeo; las Surfaces de frombuffer no deben usarse después
+        """
+        self.view.release()
+        self.map.close()
+
+
+def open_bundle(path=ASSET_BUNDLE_PATH, mixer_format=None):
+    """
+    Retorna el AssetBundle o None si no existe o está dañado (se usan los archivos sueltos)
+    """
+    if not os.path.exists(path):
+        return None
+    mixer_format = mixer_format or pygame.mixer.get_init() or ()
+    try:
+        bundle = AssetBundle(path, expected_keys(mixer_format))
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] No se pudo abrir el bundle de assets: {e}")
+        return None
+    if bundle.stale:
+        print(f"[ERROR] Bundle de assets desactualizado para {', '.join(bundle.stale)}; "
+              f"se cargan los archivos sueltos (python asset_bundle.py build)")
+    return bundle
+
+
+def _image_pixels(path, frames):
+    """
+    Píxeles RGBA de una imagen con el mismo proceso que el juego:
+    convert_alpha y, para los sprite sheets, cada frame escalado a PLAYER_SIZE
+    """
+    surface = pygame.image.load(path).convert_alpha()
+    if frames is None:
+        return surface.get_size(), pygame.image.tobytes(surface, 'RGBA')
+
+    frame_width = surface.get_width() // frames
+    columns = []
+    for i in range(frames):
+        frame = surface.subsurface(pygame.Rect(i * frame_width, 0, frame_width, surface.get_height()))
+        scaled = pygame.transform.scale(frame, (PLAYER_SIZE, PLAYER_SIZE))
+        columns.append(np.frombuffer(pygame.image.tobytes(scaled, 'RGBA'), dtype=np.uint8)
+                       .reshape(PLAYER_SIZE, PLAYER_SIZE, 4))
+    sheet = np.concatenate(columns, axis=1)
+    return (frames * PLAYER_SIZE, PLAYER_SIZE), sheet.tobytes()
+
+
+def build(path=ASSET_BUNDLE_PATH):
+    """
+    Pre-decodifica imágenes y sonidos y escribe el bundle (reemplazo atómico)
+    """
+    pygame.mixer.pre_init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER)
+    pygame.init()
+    # convert_alpha necesita un modo de video; la ventana no se muestra
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    mixer_format = pygame.mixer.get_init()
+    keys = expected_keys(mixer_format)
+
+    entries = []  # (nombre, tipo, ancho, alto, datos)
+    for name, source, frames in image_sources():
+        (width, height), pixels = _image_pixels(source, frames)
+        entries.append((name, KIND_IMAGE, width, height, pixels))
+    for name, source in sound_sources():
+        if source is None:
+            pcm = synth.get_pcm(name, mixer_format)
+        else:
+            pcm = synth.get_file_pcm(source, mixer_format)
+        entries.append((name, KIND_SOUND, 0, 0, np.ascontiguousarray(pcm).tobytes()))
+
+    offset = HEADER.size + len(entries) * ENTRY.size
+    index = [HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(entries))]
+    blobs = []
+    for name, kind, width, height, data in entries:
+        padding = -offset % DATA_ALIGN
+        blobs.append(b'\0' * padding + data)
+        offset += padding
+        index.append(ENTRY.pack(name.encode('utf-8'), kind, keys[name], offset, len(data), width, height))
+        offset += len(data)
+
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(b''.join(index))
+        for blob in blobs:
+            f.write(blob)
+    os.replace(temporary, path)
+    print(f"[OK] Bundle {path}: {len(entries)} assets, {offset / 1024:.0f} KB")
+    return path
+
+
+def _load_loose(mixer_format):
+    """
+    Carga como el juego sin bundle: PNG decodificado + PCM desde la caché .npy
+    """
+    assets = {}
+    for name, path, _ in image_sources():
+        assets[name] = pygame.image.load(path).convert_alpha()
+    for name, path in sound_sources():
+        pcm = synth.get_pcm(name, mixer_format) if path is None else synth.get_file_pcm(path, mixer_format)
+        assets[name] = pygame.sndarray.make_sound(pcm)
+    return assets
+
+
+def _load_bundled(path, mixer_format):
+    bundle = open_bundle(path, mixer_format)
+    assets = {}
+    for name in bundle.entries:
+        if bundle.kind(name) == KIND_IMAGE:
+            assets[name] = bundle.image(name).convert_alpha()
+        else:
+            assets[name] = bundle.sound(name)
+    return bundle, assets
+
+
+def benchmark(path=ASSET_BUNDLE_PATH, repeat=20):
+    """
+    Compara el tiempo de carga de los archivos sueltos contra el bundle mapeado
+    """
+    pygame.mixer.pre_init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER)
+    pygame.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    mixer_format = pygame.mixer.get_init()
+
+    # Decodificación completa (primer arranque, sin caché de PCM)
+    start = time.perf_counter()
+    for _, source, _ in image_sources():
+        pygame.image.load(source).convert_alpha()
+    for name, source in sound_sources():
+        if source is None:
+            pygame.sndarray.make_sound(synth.render(synth.SOUND_DEFINITIONS[name], channels=mixer_format[2]))
+        else:
+            pygame.mixer.Sound(source)
+    decode_ms = (time.perf_counter() - start) * 1000
+
+    _load_loose(mixer_format)  # calentar la caché .npy
+    start = time.perf_counter()
+    for _ in range(repeat):
+        _load_loose(mixer_format)
+    loose_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        bundle, assets = _load_bundled(path, mixer_format)
+        del assets
+        bundle.close()
+    bundle_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    print(f"  Decodificación completa (sin caché):  {decode_ms:.2f} ms")
+    print(f"  Archivos sueltos (PNG + caché .npy):  {loose_ms:.2f} ms")
+    print(f"  Bundle mapeado:                       {bundle_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    # python asset_bundle.py build [ruta] | bench [ruta]
+    command = sys.argv[1] if len(sys.argv) > 1 else 'build'
+    target = sys.argv[2] if len(sys.argv) > 2 else ASSET_BUNDLE_PATH
+    if command == 'build':
+        build(target)
+    elif command == 'bench':
+        if not os.path.exists(target):
+            build(target)
+        benchmark(target)
+    else:
+        print("Uso: python asset_bundle.py [build|bench] [ruta]")
@@ -0,0 +1,133 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from asset_bundle import KIND_IMAGE
+
+
+class AssetManager:
+    def __init__(self, max_workers=4):
+        """
+        Carga assets en paralelo: la decodificación (PNG, PCM) se hace en un pool
+        de hilos y solo el paso final (convert_alpha, crear el Sound) en el hilo principal
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='assets')
+        self.assets = {}
+        self.errors = {}
+        self.pending = []  # (nombre, future, finalize)
+        self.main_tasks = []  # (nombre, función) que deben correr en el hilo principal
+        self.total = 0
+        self.completed = 0
+
+    def add(self, name, load, finalize=None):
+        """
+        Encola un asset genérico
+
+        Args:
+            name: Nombre con el que se recupera luego con get()
+            load: Función que corre en un hilo del pool (decodificación)
+            finalize: Opcional, función que recibe el resultado en el hilo principal
+        """
+        future = self.executor.submit(load)
+        self.pending.append((name, future, finalize))
+        self.total += 1
+
+    def add_image(self, name, path):
+        """
+        Encola una imagen: decodifica en el pool y hace convert_alpha en el hilo principal
+        """
+        self.add(name, lambda: pygame.image.load(path), lambda surface: surface.convert_alpha())
+
+    def add_sound(self, name, load_pcm):
+        """
+        Encola un sonido: load_pcm retorna un array PCM (en el pool) y el Sound
+        se crea en el hilo principal
+        """
+        self.add(name, load_pcm, pygame.sndarray.make_sound)
+
+    def add_bundled(self, name, bundle):
+        """
+        Encola un asset desde el bundle mapeado en memoria (sin decodificar).
+        Retorna False si no hay bundle o la entrada falta o está vieja: el
+        llamador debe cargar el archivo suelto
+        """
+        if bundle is None or name not in bundle:
+            return False
+        if bundle.kind(name) == KIND_IMAGE:
+            self.add(name, lambda: bundle.image(name), lambda surface: surface.convert_alpha())
+        else:
+            self.add(name, lambda: bundle.data(name), lambda data: pygame.mixer.Sound(buffer=data))
+        return True
+
+    def add_main_thread(self, name, func):
+        """
+        Encola un paso que debe ejecutarse en el hilo principal (p. ej. abrir la cámara);
+        cuenta para el progreso igual que los demás assets
+        """
+        self.main_tasks.append((name, func))
+        self.total += 1
+
+    def _store(self, name, func, *args):
+        try:
+            self.assets[name] = func(*args)
+        except Exception as e:
+            print(f"[ERROR] Error cargando asset '{name}': {e}")
+            self.errors[name] = e
+        self.completed += 1
+
+    def poll(self):
+        """
+        Finaliza los assets ya decodificados y, si no queda nada listo,
+        ejecuta una tarea del hilo principal. Retorna el progreso (0-100)
+        """
+        still_pending = []
+        finished_any = False
+        for name, future, finalize in self.pending:
+            if not future.done():
+                still_pending.append((name, future, finalize))
+                continue
+
+            finished_any = True
+            error = future.exception()
+            if error is not None:
+                print(f"[ERROR] Error cargando asset '{name}': {error}")
+                self.errors[name] = error
+                self.completed += 1
+            elif finalize is not None:
+                self._store(name, finalize, future.result())
+            else:
+                self._store(name, future.result)
+        self.pending = still_pending
+
+        # Las tareas del hilo principal bloquean el redibujado: solo una por llamada
+        if not finished_any and self.main_tasks:
+            name, func = self.main_tasks.pop(0)
+            self._store(name, func)
+
+        return self.get_progress()
+
+    def get_progress(self):
+        """
+        Retorna el porcentaje de assets terminados (0-100)
+        """
+        if self.total == 0:
+            return 100
+        return int(self.completed * 100 / self.total)
+
+    def is_done(self):
+        """
+        Verifica si todos los assets terminaron (con o sin error)
+        """
+        return self.completed >= self.total
+
+    def get(self, name, default=None):
+        """
+        Retorna un asset cargado (default si falló o no existe)
+        """
+        return self.assets.get(name, default)
+
+    def shutdown(self):
+        """
+        Libera el pool de hilos
+        """
+        self.executor.shutdown(wait=False)
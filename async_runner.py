@@ -0,0 +1,217 @@
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+
+def _infer(camera):
+    """
+    Corre en el hilo de la cámara: lectura + FaceMesh y copia del resultado
+    (el estado de la cámara real no se lee desde el loop mientras cambia)
+    """
+    eyes_open = camera.detect_eyes()
+    return eyes_open, camera.face_detected, camera.frame_ok, camera.get_frame()
+
+
+class AsyncCamera:
+    def __init__(self, camera, requested):
+        """
+        Fachada de la cámara para el runner asíncrono: detect_eyes() no bloquea,
+        pide una inferencia y retorna el último resultado entregado. El estado
+        solo cambia entre frames (apply), así un frame ve siempre el mismo
+
+        Args:
+            camera: Cámara real (o FakeCamera)
+            requested: asyncio.Event que despierta a la tarea de la cámara
+        """
+        self.camera = camera
+        self.requested = requested
+        self.eyes_open = camera.eyes_open
+        self.face_detected = camera.face_detected
+        self.frame_ok = camera.frame_ok
+        self.frame = camera.get_frame()
+
+    def detect_eyes(self):
+        self.requested.set()
+        return self.eyes_open
+
+    def apply(self, result):
+        self.eyes_open, self.face_detected, self.frame_ok, self.frame = result
+
+    def get_frame(self):
+        return self.frame
+
+    def release(self):
+        self.camera.release()
+
+
+class AsyncRunner:
+    def __init__(self, game):
+        """
+        Bucle alternativo a Game.run() con asyncio: el render es una tarea con
+        ritmo por timers del loop, la inferencia corre en un executor y entrega
+        los resultados por un asyncio.Queue, y el cierre (puntajes, telemetría,
+        leaderboard, cámara) son tareas concurrentes
+        """
+        self.game = game
+        # Un solo hilo: la cámara nunca procesa dos frames a la vez y release()
+        # queda detrás de la última inferencia
+        self.camera_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='camera')
+        self.camera = None
+        self.results = None
+        self.frame_times = []  # perf_counter de cada frame, para medir jitter
+
+    def run(self):
+        """
+        Ejecuta el juego hasta que se pida salir y cierra pygame
+        """
+        asyncio.run(self.main())
+        pygame.quit()
+
+    async def main(self, max_frames=None):
+        """
+        Corre las tareas hasta que termine el juego (o max_frames) y luego el cierre
+        """
+        game = self.game
+        game.deferred_quit = True
+        self.results = asyncio.Queue()
+        self.camera = AsyncCamera(game.camera, asyncio.Event())
+        game.camera = self.camera
+
+        camera_task = asyncio.create_task(self.camera_loop())
+        try:
+            await self.render_loop(max_frames)
+        finally:
+            camera_task.cancel()
+            game.running = False
+            game.camera = self.camera.camera
+            await self.shutdown()
+
+    async def camera_loop(self):
+        """
+        Espera pedidos de inferencia y entrega cada resultado en la cola
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.camera.requested.wait()
+            self.camera.requested.clear()
+            result = await loop.run_in_executor(self.camera_executor, _infer, self.camera.camera)
+            await self.results.put(result)
+
+    def deliver_camera_results(self):
+        """
+        Aplica los resultados llegados desde el frame anterior (el último gana)
+        """
+        while not self.results.empty():
+            self.camera.apply(self.results.get_nowait())
+
+    async def render_loop(self, max_frames=None):
+        """
+        Lógica y dibujo a game.fps con deadlines absolutos del loop; en reposo
+        solo se redibuja con eventos o al vencer el intervalo, como en Game.run()
+        """
+        game = self.game
+        loop = asyncio.get_running_loop()
+        period = 1.0 / game.fps
+        deadline = loop.time()
+        last_step = float('-inf')
+        frames = 0
+        while game.running and (max_frames is None or frames < max_frames):
+            self.deliver_camera_results()
+            events = pygame.event.get()
+            now = loop.time()
+            if (not game.is_idle() or events
+                    or (now - last_step) * 1000 >= game.get_idle_redraw_timeout()):
+                game.step(events)
+                game.draw()
+                last_step = now
+                self.frame_times.append(time.perf_counter())
+                frames += 1
+
+            deadline += period
+            now = loop.time()
+            if deadline < now - period:
+                # Atrasado más de un frame: no recuperar con una ráfaga de frames
+                deadline = now
+            await asyncio.sleep(max(0.0, deadline - now))
+
+    async def shutdown(self):
+        """
+        Grabación, puntajes, telemetría, leaderboard y cámara se cierran en
+        paralelo sin bloquear el loop; la cámara en su propio hilo
+        """
+        loop = asyncio.get_running_loop()
+        game = self.game
+        closing = [loop.run_in_executor(None, game.stop_recording)]
+        for close in game.shutdown_tasks():
+            executor = self.camera_executor if close == game.camera.release else None
+            closing.append(loop.run_in_executor(executor, close))
+        await asyncio.gather(*closing)
+        self.camera_executor.shutdown(wait=True)
+
+
+def frame_jitter(times, fps):
+    """
+    Estadísticas de los intervalos entre frames (ms): media, desvío,
+    percentil 99, máximo y frames más largos que 1.5 periodos
+    """
+    intervals = [(b - a) * 1000 for a, b in zip(times, times[1:])]
+    period = 1000.0 / fps
+    ordered = sorted(intervals)
+    return {
+        'mean': statistics.fmean(intervals),
+        'stdev': statistics.pstdev(intervals),
+        'p99': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        'max': ordered[-1],
+        'late': sum(1 for interval in intervals if interval > 1.5 * period),
+    }
+
+
+def benchmark(frames=300, inference_ms=12.0):
+    """
+    Compara el jitter del bucle síncrono y del asíncrono con una cámara
+    simulada cuya inferencia tarda inference_ms (bloqueante, como FaceMesh)
+    """
+    from main import Game
+    from session_recorder import FakeCamera, FLAG_FACE_DETECTED, FLAG_FRAME_OK
+
+    class SlowCamera(FakeCamera):
+        def detect_eyes(self):
+            time.sleep(inference_ms / 1000)
+            return super().detect_eyes()
+
+    # Ojos cerrados con la cara visible: las paredes avanzan lento y no hay pausa
+    game = Game(camera=SlowCamera(FLAG_FACE_DETECTED | FLAG_FRAME_OK), persist=False)
+    print(f"  {frames} frames a {game.fps} FPS, inferencia de {inference_ms:g} ms "
+          f"cada {game.inference_interval} frames")
+
+    game.start_session(0)
+    times = []
+    for _ in range(frames):
+        game.run_frame()
+        times.append(time.perf_counter())
+    results = {'síncrono': frame_jitter(times, game.fps)}
+
+    game.start_session(0)
+    runner = AsyncRunner(game)
+    asyncio.run(runner.main(max_frames=frames))
+    results['asyncio'] = frame_jitter(runner.frame_times, game.fps)
+
+    for name, stats in results.items():
+        print(f"  {name:9s} media {stats['mean']:6.2f} ms  desvío {stats['stdev']:5.2f} ms  "
+              f"p99 {stats['p99']:6.2f} ms  máx {stats['max']:6.2f} ms  "
+              f"frames tardíos {stats['late']}")
+    pygame.quit()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runner asyncio del juego")
+    parser.add_argument('command', choices=['bench'], help="bench: jitter síncrono vs asyncio")
+    parser.add_argument('--frames', type=int, default=300, help="frames medidos por bucle")
+    parser.add_argument('--inference-ms', type=float, default=12.0, help="duración simulada de FaceMesh")
+    args = parser.parse_args()
+    benchmark(args.frames, args.inference_ms)
@@ -0,0 +1,86 @@
+import time
+
+import pygame
+
+from config import (
+    MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER,
+    KEYSTROKE_CHANNELS, AUDIO_LATENCY_LOG
+)
+
+
+def pre_init_mixer():
+    """
+    Configura el mixer de baja latencia; debe llamarse antes de pygame.init()
+    """
+    pygame.mixer.pre_init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER)
+
+
+class KeystrokeAudio:
+    def __init__(self, channel_count=KEYSTROKE_CHANNELS, measure=AUDIO_LATENCY_LOG):
+        """
+        Pool de canales reservados para los sonidos de teclado.
+        Si todos están ocupados se roba la voz más antigua en lugar de perder el sonido
+        """
+        # Los canales reservados no los usa Sound.play() ni otros sonidos del juego
+        pygame.mixer.set_reserved(channel_count)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channel_count)]
+        self.started_at = [0.0] * channel_count
+        self.measure = measure
+        self.stolen = 0
+
+        # Latencia de un bloque del mixer (lo que tarda como mínimo en sonar)
+        frequency = pygame.mixer.get_init()[0]
+        self.buffer_ms = MIXER_BUFFER * 1000.0 / frequency
+
+    def _pick_channel(self):
+        """
+        Retorna el índice de un canal libre o, si no hay, el de la voz más antigua
+        """
+        oldest = 0
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return i
+            if self.started_at[i] < self.started_at[oldest]:
+                oldest = i
+        self.stolen += 1
+        return oldest
+
+    def play(self, sound, event_time=None, queue_wait_ms=0.0):
+        """
+        Reproduce un sonido de teclado en el pool
+
+        Args:
+            sound: pygame.mixer.Sound a reproducir
+            event_time: Opcional, time.perf_counter() de cuando se leyó la tecla
+                (para el modo de medición)
+            queue_wait_ms: Opcional, máximo que pudo esperar la tecla en la cola de
+                eventos (tiempo desde la lectura anterior)
+        """
+        if sound is None:
+            return
+        index = self._pick_channel()
+        self.channels[index].play(sound)
+        now = time.perf_counter()
+        self.started_at[index] = now
+
+        if self.measure and event_time is not None:
+            self.log_latency(event_time, now, queue_wait_ms)
+
+    def get_busy_count(self):
+        """
+        Retorna cuántas voces del pool están sonando
+        """
+        return sum(1 for channel in self.channels if channel.get_busy())
+
+    def log_latency(self, event_time, play_time, queue_wait_ms=0.0):
+        """
+        Registra la latencia tecla -> play() y la profundidad de la cola del mixer
+        """
+        latency_ms = (play_time - event_time) * 1000
+        busy = self.get_busy_count()
+        # El mixer no expone su cola: estimamos con las voces activas y el tamaño de bloque
+        print(
+            f"[AUDIO] tecla->play {latency_ms:.2f} ms (+ cola <= {queue_wait_ms:.1f} ms) "
+            f"| voces {busy}/{len(self.channels)} "
+            f"| bloque {MIXER_BUFFER} ({self.buffer_ms:.1f} ms) | robadas {self.stolen}"
+        )
@@ -1,115 +1,189 @@
+import threading
+import time
+
 import mediapipe as mp
-import cv2  
+import cv2
 import numpy as np
-from config import WEBCAM_WIDTH, WEBCAM_HEIGHT, EYE_ASPECT_RATIO_THRESHOLD
+from config import (
+    WEBCAM_WIDTH, WEBCAM_HEIGHT, EYE_ASPECT_RATIO_THRESHOLD,
+    INFERENCE_SERVER, INFERENCE_RETRY_SECONDS
+)
+
+# Índices de landmarks para los ojos
+# Ojo izquierdo: [362, 385, 387, 263, 373, 380]
+# Ojo derecho: [33, 160, 158, 133, 153, 144]
+LEFT_EYE = [362, 385, 387, 263, 373, 380]
+RIGHT_EYE = [33, 160, 158, 133, 153, 144]
+
+
+def create_face_mesh(refine_landmarks=True, static_image_mode=False):
+    """
+    Inicializa Mediapipe Face Mesh (una cara). static_image_mode detecta la
+    cara en cada frame en lugar de seguirla desde el anterior (frames de
+    varias cámaras mezclados)
+    """
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=static_image_mode,
+        max_num_faces=1,
+        refine_landmarks=refine_landmarks,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+
+def eye_aspect_ratio(eye_landmarks):
+    """
+    Calcula el Eye Aspect Ratio  para determinar si el ojo esta abierto
+    """
+    # Calcular distancias verticales
+    A = np.linalg.norm(eye_landmarks[1] - eye_landmarks[5])
+    B = np.linalg.norm(eye_landmarks[2] - eye_landmarks[4])
+
+    # Calcular distancia horizontal
+    C = np.linalg.norm(eye_landmarks[0] - eye_landmarks[3])
+
+    # EAR
+    ear = (A + B) / (2.0 * C)
+    return ear
+
+
+def measure_ear(face_mesh, rgb_frame):
+    """
+    Procesa un frame RGB con FaceMesh. Retorna el EAR promedio de ambos ojos
+    (None si no se detecta una cara)
+    """
+    results = face_mesh.process(rgb_frame)
+    if not results.multi_face_landmarks:
+        return None
+    landmarks = results.multi_face_landmarks[0].landmark
+
+    # Extraer coordenadas de los ojos en píxeles
+    h, w = rgb_frame.shape[:2]
+    left_eye_coords = np.array([[landmarks[idx].x * w, landmarks[idx].y * h] for idx in LEFT_EYE])
+    right_eye_coords = np.array([[landmarks[idx].x * w, landmarks[idx].y * h] for idx in RIGHT_EYE])
+
+    # Promedio de ambos ojos
+    return (eye_aspect_ratio(left_eye_coords) + eye_aspect_ratio(right_eye_coords)) / 2.0
 
 
 class Camera:
-    def __init__(self):
+    def __init__(self, width=WEBCAM_WIDTH, height=WEBCAM_HEIGHT, refine_landmarks=True, remote=INFERENCE_SERVER):
+        """
+        remote: Opcional, 'host:puerto' del servidor de inferencia compartido;
+        si no responde se usa FaceMesh local, que se carga en segundo plano
+        recién al primer fallo (sin servidor caído no hay un grafo por estación)
+        """
         self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, WEBCAM_WIDTH)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, WEBCAM_HEIGHT)
-        
-        # Inicializar Mediapipe Face Mesh
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-        
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+        self.refine_landmarks = refine_landmarks
+        self.face_mesh = None
+        self.remote = None
+        self.remote_retry_at = 0.0  # time.monotonic() desde el que se vuelve a probar el servidor
+        self.local_ready = threading.Event()  # FaceMesh local listo (o falló su carga)
+        self.loader = None  # hilo que carga el FaceMesh de respaldo
+        if remote:
+            from inference_server import InferenceClient
+            self.remote = InferenceClient(remote)
+        else:
+            self.face_mesh = create_face_mesh(refine_landmarks)
+            self.local_ready.set()
+
         self.eyes_open = False
+        self.ear = None
         self.frame = None
-        
-        # Índices de landmarks para los ojos 
-        # Ojo izquierdo: [362, 385, 387, 263, 373, 380]
-        # Ojo derecho: [33, 160, 158, 133, 153, 144]
-        self.LEFT_EYE = [362, 385, 387, 263, 373, 380]
-        self.RIGHT_EYE = [33, 160, 158, 133, 153, 144]
-    
+        self.frame_ok = False  # la última lectura de la cámara devolvió un frame
+        self.face_detected = False
+
+        self.LEFT_EYE = LEFT_EYE
+        self.RIGHT_EYE = RIGHT_EYE
+
     def calculate_eye_aspect_ratio(self, eye_landmarks):
         """
         Calcula el Eye Aspect Ratio  para determinar si el ojo esta abierto
         """
-        # Calcular distancias verticales
-        A = np.linalg.norm(eye_landmarks[1] - eye_landmarks[5])
-        B = np.linalg.norm(eye_landmarks[2] - eye_landmarks[4])
-        
-        # Calcular distancia horizontal
-        C = np.linalg.norm(eye_landmarks[0] - eye_landmarks[3])
-        
-        # EAR
-        ear = (A + B) / (2.0 * C)
-        return ear
-    
+        return eye_aspect_ratio(eye_landmarks)
+
+    def _load_face_mesh(self):
+        """
+        Crea el FaceMesh local de respaldo fuera del bucle de juego
+        """
+        try:
+            self.face_mesh = create_face_mesh(self.refine_landmarks)
+        except Exception as e:
+            print(f"[ERROR] No se pudo cargar FaceMesh local: {e}")
+        finally:
+            self.local_ready.set()
+
+    def measure(self, frame):
+        """
+        EAR de un frame BGR: en el servidor compartido si está disponible,
+        si no con FaceMesh local. None si no hay cara; mientras el FaceMesh
+        local se sigue cargando se repite la última medida
+        """
+        if self.remote is not None and time.monotonic() >= self.remote_retry_at:
+            try:
+                return self.remote.infer(frame, self.refine_landmarks).ear
+            except (OSError, ValueError) as e:
+                print(f"[ERROR] Servidor de inferencia no disponible ({e}); se usa FaceMesh local")
+                self.remote_retry_at = time.monotonic() + INFERENCE_RETRY_SECONDS
+                if self.loader is None:
+                    self.loader = threading.Thread(target=self._load_face_mesh, name="facemesh-loader",
+                                                   daemon=True)
+                    self.loader.start()
+
+        if not self.local_ready.is_set() or self.face_mesh is None:
+            return self.ear
+        # Convertir a RGB para Mediapipe
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return measure_ear(self.face_mesh, rgb_frame)
+
     def detect_eyes(self):
         """
         Detecta si los ojos estan abiertos o cerrados
         Retorna True si los ojos estan abiertos
         """
         ret, frame = self.cap.read()
+        self.frame_ok = ret
         if not ret:
             return self.eyes_open
-        
+
         # Voltear horizontalmente para efecto espejo
         frame = cv2.flip(frame, 1)
         self.frame = frame.copy()
-        
-        # Convertir a RGB para Mediapipe
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
-        
-        if results.multi_face_landmarks:
-            face_landmarks = results.multi_face_landmarks[0]
-            
-            # Obtener dimensiones de la imagen
-            h, w = frame.shape[:2]
-            
-            # Extraer coordenadas de los ojos
-            left_eye_coords = []
-            right_eye_coords = []
-            
-            for idx in self.LEFT_EYE:
-                landmark = face_landmarks.landmark[idx]
-                left_eye_coords.append([landmark.x * w, landmark.y * h])
-            
-            for idx in self.RIGHT_EYE:
-                landmark = face_landmarks.landmark[idx]
-                right_eye_coords.append([landmark.x * w, landmark.y * h])
-            
-            left_eye_coords = np.array(left_eye_coords)
-            right_eye_coords = np.array(right_eye_coords)
-            
-            # Calcular EAR para ambos ojos
-            left_ear = self.calculate_eye_aspect_ratio(left_eye_coords)
-            right_ear = self.calculate_eye_aspect_ratio(right_eye_coords)
-            
-            # Promedio de ambos ojos
-            avg_ear = (left_ear + right_ear) / 2.0
-            
+
+        self.ear = self.measure(frame)
+        self.face_detected = self.ear is not None
+
+        if self.face_detected:
             # Determinar si los ojos estan abiertos
-            self.eyes_open = avg_ear > EYE_ASPECT_RATIO_THRESHOLD
-            
+            self.eyes_open = self.ear > EYE_ASPECT_RATIO_THRESHOLD
+
             # Dibujar indicador visual en el frame
             color = (0, 0, 255) if self.eyes_open else (0, 255, 0)
             status = "ABIERTOS" if self.eyes_open else "CERRADOS"
-            cv2.putText(frame, status, (10, 30), 
+            cv2.putText(frame, status, (10, 30),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-            
+
             self.frame = frame
-        
+
         return self.eyes_open
-    
+
     def get_frame(self):
         """
         Retorna el frame actual de la cámara para mostrar en Pygame
         """
         return self.frame
-    
+
     def release(self):
         """
         Libera los recursos de la cámara
         """
         self.cap.release()
-        self.face_mesh.close()
\ No newline at end of file
+        if self.loader is not None:
+            self.loader.join()
+        if self.face_mesh is not None:
+            self.face_mesh.close()
+        if self.remote is not None:
+            self.remote.close()
@@ -42,11 +42,17 @@ WALL_HEIGHT = 450 # Altura de las paredes
 WALL_SPEED = 2  # píxeles por frame cuando los ojos están abiertos (base, se ajusta por nivel)
 WALL_START_LEFT = 0
 WALL_START_RIGHT = WINDOW_WIDTH - WALL_WIDTH
+WALL_SPEED_EYES_CLOSED = 0.5  # velocidad mínima mientras el jugador tiene los ojos cerrados
+ERROR_SPEED_PENALTY = 0.3  # aumento de velocidad por cada error de escritura
+WALL_STOP_DURATION = 2000  # ms que se detienen las paredes al completar la frase
+OBSTACLE_LAYOUT = 'two_walls'  # configuración de obstáculos (obstacles.OBSTACLE_LAYOUTS)
 
 # Tiempo
 TOLERANCE_TIME = 4  # segundos para memorizar la frase (base, se ajusta por nivel)
 
 # Fuentes
+FONT_FAMILY = 'consolas'  # monospace; si no está instalada se usa la fuente por defecto
+BUNDLED_FONT_PATH = 'assets/fonts/mono.ttf'  # si existe, se carga directamente sin buscar en el sistema
 FONT_SIZE = 32
 PHRASE_FONT_SIZE = 36
 INPUT_FONT_SIZE = 32
@@ -59,7 +65,127 @@ SCREEN_SHAKE_INTENSITY = 8
 SCREEN_SHAKE_DURATION = 10
 GLOW_SIZE = 5
 
-# Frases por dificultad
+# Audio (mixer de baja latencia para el feedback de teclado)
+MIXER_FREQUENCY = 22050  # igual a la de los sonidos sintetizados: no se re-muestrean
+MIXER_SIZE = -16  # int16 con signo
+MIXER_CHANNELS = 2
+MIXER_BUFFER = 256  # muestras por bloque (~12 ms a 22050 Hz); más chico = menos latencia
+KEYSTROKE_CHANNELS = 4  # canales reservados para sonidos de teclado (con robo de voz)
+AUDIO_LATENCY_LOG = False  # registra la latencia tecla -> play() para ajustar cada máquina
+
+# Modo de corrección por alineación (distancia de edición): un carácter saltado o
+# repetido cuenta como un solo error en lugar de marcar mal todo lo que sigue
+ALIGNMENT_MODE = False
+ALIGNMENT_BAND = 8  # máximo desplazamiento que se alinea (costo O(banda) por tecla)
+ALIGNMENT_MAX_DISTANCE = 0  # errores de edición tolerados para dar la frase por completa
+
+# Métricas de escritura
+WPM_WINDOW = 10  # segundos de la ventana móvil del WPM instantáneo
+KEY_INTERVAL_BIN_MS = 10  # resolución del histograma de intervalos entre teclas
+KEY_INTERVAL_MAX_MS = 2000  # intervalos mayores van al último casillero
+
+# Modo reposo (pantallas estáticas y pausa por ausencia de cara)
+IDLE_STATES = ["MENU", "LEVEL_COMPLETE", "GAME_OVER", "GAME_COMPLETE", "PAUSED"]
+IDLE_REDRAW_MS = 250  # en reposo se redibuja con cada evento o, como mínimo, cada N ms
+IDLE_INFERENCE_INTERVAL_MS = 500  # FaceMesh en pantallas estáticas (0 = suspendido)
+PAUSED_INFERENCE_INTERVAL_MS = 200  # FaceMesh en pausa, para detectar que la cara vuelve
+NO_FACE_PAUSE_TIME = 3  # segundos sin cara detectada antes de pausar la partida
+
+# Caché en disco (probe de hardware, sonidos, fuentes...)
+CACHE_DIR = '.cache'
+
+# Assets pre-decodificados en un solo archivo (python asset_bundle.py build);
+# si falta o quedó viejo se cargan los archivos sueltos
+ASSET_BUNDLE_PATH = 'assets.bundle'
+COMPLETE_SOUND_PATH = 'Sonidos/myinstants.mp3'
+
+# Puntajes (SQLite en modo WAL, compartible entre kioscos en el mismo directorio)
+SCORE_DB_PATH = 'scores.db'
+LEGACY_HIGH_SCORES_PATH = 'high_scores.json'  # formato anterior, se migra una vez
+SCORE_WRITE_BATCH = 64  # escrituras máximas por transacción del hilo escritor
+
+# Telemetría por nivel (log binario append-only con rotación)
+TELEMETRY_DIR = 'telemetry'
+TELEMETRY_MAX_BYTES = 1024 * 1024  # tamaño del archivo antes de rotar
+TELEMETRY_BACKUPS = 5  # archivos rotados que se conservan
+TELEMETRY_FLUSH_INTERVAL = 1.0  # segundos máximos que un registro espera en memoria
+
+# Leaderboard por nivel (distribución de puntajes ordenada, en .npy)
+LEADERBOARD_DIR = 'leaderboard'
+LEADERBOARD_BUFFER = 4096  # resultados nuevos que se acumulan antes de fusionarlos
+
+# Modo infinito: los niveles se generan por fórmula a medida que se juegan
+ENDLESS_START_SPEED = 1.5
+ENDLESS_SPEED_STEP = 0.2  # velocidad extra por nivel
+ENDLESS_MAX_SPEED = 5.0
+ENDLESS_START_TOLERANCE = 5.0
+ENDLESS_TOLERANCE_STEP = 0.15  # segundos de memorización menos por nivel
+ENDLESS_MIN_TOLERANCE = 1.5
+ENDLESS_RAMP_LEVELS = 20  # niveles hasta llegar a las frases más difíciles
+ENDLESS_HISTORY = 50  # resultados de nivel en memoria (todos van a la base al completarse)
+ENDLESS_LEADERBOARD_OFFSET = 1000  # niveles del leaderboard para el modo infinito (1001, 1002...)
+
+# Espectadores (python main.py --spectate): estado del juego por TCP en deltas binarios
+SPECTATOR_HOST = '127.0.0.1'  # solo local; otra interfaz con --spectate HOST:PUERTO
+SPECTATOR_PORT = 5757
+SPECTATOR_KEYFRAME_INTERVAL = 60  # frames entre estados completos (1 s a 60 FPS)
+SPECTATOR_QUEUE_FRAMES = 120  # mensajes pendientes por espectador antes de resincronizar
+
+# Servidor de inferencia compartido (python inference_server.py serve): varias estaciones
+# en la misma máquina usan un pool de FaceMesh en lugar de cargar uno cada una
+INFERENCE_SERVER = None  # 'host:puerto' (o main.py --inference-server); None = FaceMesh local
+INFERENCE_PORT = 5858
+# Sin respuesta en este tiempo se usa FaceMesh local. Con 1 CPU el pool atiende ~150-170
+# frames/s: a 30 frames/s por estación (hasta 4) el p99 medido es ~36 ms, así que 100 ms
+# deja margen de ~2.8x. Más estaciones saturan el pool y caen a local (inference_server.py load)
+INFERENCE_TIMEOUT_MS = 100
+INFERENCE_RETRY_SECONDS = 5  # espera antes de volver a probar el servidor tras un fallo
+INFERENCE_ENCODING = 'jpeg'  # 'jpeg' o 'raw' (BGR sin comprimir)
+INFERENCE_JPEG_QUALITY = 80
+
+# Presets de rendimiento: el probe de hardware elige uno en el primer arranque
+# 'high' equivale a los valores por defecto de arriba
+REFERENCE_FPS = 60  # las velocidades (píxeles por frame) están pensadas para 60 FPS
+DEFAULT_PRESET = 'high'
+PERFORMANCE_PRESETS = {
+    'low': {
+        'fps': 30,
+        'camera_width': 160,
+        'camera_height': 120,
+        'refine_landmarks': False,
+        'inference_interval': 3,  # procesar 1 de cada N frames con FaceMesh
+        'max_glow': 1,
+        'particle_count': 1,
+        'max_particles': 60,
+    },
+    'medium': {
+        'fps': 45,
+        'camera_width': 320,
+        'camera_height': 240,
+        'refine_landmarks': False,
+        'inference_interval': 2,
+        'max_glow': 2,
+        'particle_count': 2,
+        'max_particles': 150,
+    },
+    'high': {
+        'fps': FPS,
+        'camera_width': WEBCAM_WIDTH,
+        'camera_height': WEBCAM_HEIGHT,
+        'refine_landmarks': True,
+        'inference_interval': 1,
+        'max_glow': GLOW_SIZE,
+        'particle_count': PARTICLE_COUNT,
+        'max_particles': 300,
+    },
+}
+
+# Corpus externo de frases (ver phrase_corpus.py); si no existe se usan las listas de abajo
+PHRASE_CORPUS_PATH = 'phrases.corpus'
+PHRASE_DIFFICULTY_SPREAD = 0.2  # ancho de la selección alrededor de la dificultad objetivo (posición 0-1 dentro de la etiqueta)
+PHRASE_SAMPLE_BINS = 64  # tramos por etiqueta para sortear sin reposición cerca del objetivo
+
+# Frases por dificultad (corpus por defecto)
 PHRASES_EASY = [
     "Hola mundo",
     "Buenos dias",
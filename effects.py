@@ -2,6 +2,24 @@ import pygame
 import random
 import math
 
+# Límite global de capas de brillo (lo ajusta el preset de rendimiento)
+_max_glow = None
+
+
+def set_max_glow(max_glow):
+    """
+    Limita el número de capas de brillo de draw_glow_rect/draw_glow_text
+    (None = sin límite)
+    """
+    global _max_glow
+    _max_glow = max_glow
+
+
+def _limit_glow(glow_size):
+    if _max_glow is None:
+        return glow_size
+    return min(glow_size, _max_glow)
+
 
 class Particle:
     def __init__(self, x, y, color, velocity_x=None, velocity_y=None):
@@ -34,13 +52,16 @@ class Particle:
 
 
 class ParticleSystem:
-    def __init__(self):
+    def __init__(self, max_particles=None):
         self.particles = []
+        self.max_particles = max_particles  # presupuesto de partículas vivas (None = sin límite)
     
     def emit(self, x, y, color, count=5, direction=None):
         """
         Emite particulas desde una posicion
         """
+        if self.max_particles is not None:
+            count = min(count, self.max_particles - len(self.particles))
         for _ in range(count):
             if direction == 'left':
                 vx = random.uniform(-3, -1)
@@ -155,6 +176,7 @@ def draw_glow_rect(surface, color, rect, glow_size=5):
     """
     if isinstance(rect, tuple):
         rect = pygame.Rect(rect)
+    glow_size = _limit_glow(glow_size)
     
     # Dibujar capas de brillo con transparencia decreciente (MÍNIMO)
     for i in range(glow_size, 0, -1):
@@ -172,6 +194,8 @@ def draw_glow_text(surface, font, text, pos, color, glow_size=3):
     """
     Dibuja texto con efecto de brillo SUAVE
     """
+    glow_size = _limit_glow(glow_size)
+
     # Renderizar texto con antialiasing
     text_surface = font.render(text, True, color)  # True = antialiasing
     text_rect = text_surface.get_rect(center=pos)
@@ -191,3 +215,27 @@ def draw_glow_text(surface, font, text, pos, color, glow_size=3):
     # Dibujar texto principal
     surface.blit(text_surface, text_rect)
     return text_rect
+
+
+def render_glow_text(font, text, color, glow_size=3):
+    """
+    Renderiza una vez el texto con brillo (el mismo efecto que draw_glow_text)
+    en una superficie con alpha, para blitearla cada frame sin volver a renderizar
+    """
+    glow_size = _limit_glow(glow_size)
+    text_surface = font.render(text, True, color)
+    width, height = text_surface.get_size()
+    result = pygame.Surface((width + glow_size * 2, height + glow_size * 2), pygame.SRCALPHA)
+    # Fondo transparente del mismo color: las capas se mezclan sin oscurecer los bordes
+    result.fill((*color[:3], 0))
+
+    for i in range(glow_size, 0, -1):
+        alpha = int(25 * (i / glow_size))
+        glow_surf = font.render(text, True, (*color, alpha) if len(color) == 3 else color)
+        for dx in [-i, 0, i]:
+            for dy in [-i, 0, i]:
+                if dx != 0 or dy != 0:
+                    result.blit(glow_surf, (glow_size + dx, glow_size + dy))
+
+    result.blit(text_surface, (glow_size, glow_size))
+    return result
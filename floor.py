@@ -1,11 +1,18 @@
 import pygame
 from config import WINDOW_WIDTH, WINDOW_HEIGHT
 
+FLOOR_TILE_PATH = 'assets/land/tile_0196.png'
+
 class Floor:
-    def __init__(self):
+    def __init__(self, tile_image=None):
+        """
+        tile_image: Opcional, Surface del tile ya cargada (AssetManager)
+        """
         try:
-            # Cargar la imagen del suelo
-            self.tile_image = pygame.image.load('assets/land/tile_0196.png').convert_alpha()
+            # Cargar la imagen del suelo (precargada o desde disco)
+            if tile_image is None:
+                tile_image = pygame.image.load(FLOOR_TILE_PATH).convert_alpha()
+            self.tile_image = tile_image
             # Escalar si es necesario (opcional, por ahora usamos tamaño original)
             self.tile_width = self.tile_image.get_width()
             self.tile_height = self.tile_image.get_height()
@@ -0,0 +1,109 @@
+import json
+import os
+import time
+
+import pygame
+
+from config import FONT_FAMILY, BUNDLED_FONT_PATH, CACHE_DIR
+
+FONT_CACHE_FILE = os.path.join(CACHE_DIR, 'fonts.json')
+
+
+class FontManager:
+    def __init__(self, family=FONT_FAMILY, bundled_path=BUNDLED_FONT_PATH):
+        """
+        Resuelve cada familia de fuente una sola vez (la ruta se guarda en disco)
+        y comparte los objetos Font entre quienes piden el mismo tamaño/estilo
+        """
+        pygame.font.init()
+        self.family = family
+        self.bundled_path = bundled_path
+        self.resolved = self._load_cache()  # familia -> {'regular': ruta, 'bold': ruta}
+        self.fonts = {}  # (ruta, tamaño, bold sintético) -> Font
+        self.lookup_ms = 0.0
+
+    def _load_cache(self):
+        if os.path.exists(FONT_CACHE_FILE):
+            try:
+                with open(FONT_CACHE_FILE, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                return {}
+        return {}
+
+    def _save_cache(self):
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(FONT_CACHE_FILE, 'w') as f:
+                json.dump(self.resolved, f, indent=2)
+        except OSError as e:
+            print(f"[ERROR] No se pudo guardar la caché de fuentes: {e}")
+
+    def _is_valid(self, entry):
+        """
+        Una entrada es válida si sus rutas siguen existiendo (None = fuente por defecto)
+        """
+        return all(path is None or os.path.exists(path) for path in entry.values())
+
+    def resolve(self, family):
+        """
+        Retorna {'regular': ruta, 'bold': ruta} de una familia del sistema.
+        Solo la primera vez (o si el archivo desapareció) se consulta al sistema,
+        que en Linux implica escanear las fuentes con fc-list
+        """
+        entry = self.resolved.get(family)
+        if entry is not None and self._is_valid(entry):
+            return entry
+
+        start = time.perf_counter()
+        entry = {
+            'regular': pygame.font.match_font(family),
+            'bold': pygame.font.match_font(family, bold=True),
+        }
+        self.lookup_ms += (time.perf_counter() - start) * 1000
+
+        self.resolved[family] = entry
+        self._save_cache()
+        return entry
+
+    def get(self, size, bold=False):
+        """
+        Retorna un Font de la familia configurada (compartido si ya existe)
+        """
+        if self.bundled_path and os.path.exists(self.bundled_path):
+            # Fuente incluida con el juego: carga directa por ruta, bold sintético
+            path = self.bundled_path
+            fake_bold = bold
+        else:
+            entry = self.resolve(self.family)
+            path = entry['bold'] if bold else entry['regular']
+            # Sin archivo bold propio se aplica bold sintético (igual que SysFont)
+            fake_bold = bold and (path is None or path == entry['regular'])
+            if path is None:
+                path = entry['regular']
+
+        key = (path, size, fake_bold)
+        font = self.fonts.get(key)
+        if font is None:
+            # resolve() ya sumó su propio tiempo: aquí solo la carga del archivo
+            start = time.perf_counter()
+            font = pygame.font.Font(path, size)
+            font.set_bold(fake_bold)
+            self.fonts[key] = font
+            self.lookup_ms += (time.perf_counter() - start) * 1000
+
+        return font
+
+    def report(self):
+        """
+        Imprime el tiempo de arranque gastado en resolver y cargar fuentes
+        """
+        print(f"[OK] Fuentes: {len(self.fonts)} cargadas en {self.lookup_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    # Vuelve a resolver la familia configurada y actualiza la caché
+    manager = FontManager()
+    manager.resolved.pop(manager.family, None)
+    print(f"{manager.family}: {manager.resolve(manager.family)}")
+    manager.report()
@@ -0,0 +1,42 @@
+import time
+
+# Reloj de la lógica del juego: se fija una vez por frame y todo el frame lee
+# el mismo valor. En microsegundos enteros para que una grabación lo reproduzca
+# exactamente (replay con reloj virtual)
+_origin = time.perf_counter()
+_current_us = 0
+
+
+def advance(frame_us=None):
+    """
+    Fija el tiempo del frame actual
+
+    Args:
+        frame_us: Opcional, tiempo en microsegundos (replay); por defecto el reloj real
+    """
+    global _current_us
+    if frame_us is None:
+        frame_us = int((time.perf_counter() - _origin) * 1000000)
+    _current_us = frame_us
+    return _current_us
+
+
+def micros():
+    """
+    Tiempo del frame en microsegundos
+    """
+    return _current_us
+
+
+def ticks():
+    """
+    Tiempo del frame en milisegundos (reemplaza a pygame.time.get_ticks en la lógica)
+    """
+    return _current_us // 1000
+
+
+def now():
+    """
+    Tiempo del frame en segundos
+    """
+    return _current_us / 1000000.0
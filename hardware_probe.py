@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import platform
+import time
+
+import cv2
+import numpy as np
+import pygame
+
+from config import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, WEBCAM_WIDTH, WEBCAM_HEIGHT, WHITE,
+    GLOW_SIZE, PARTICLE_COUNT, HUD_FONT_SIZE, CACHE_DIR,
+    PERFORMANCE_PRESETS, DEFAULT_PRESET
+)
+from effects import ParticleSystem, draw_glow_text
+
+# Subir este número invalida los resultados guardados (p. ej. si cambian los benchmarks)
+PROBE_VERSION = 1
+PROBE_CACHE_FILE = os.path.join(CACHE_DIR, 'hardware_probe.json')
+
+# Orden de preferencia: se elige el preset más alto que entra en el presupuesto
+PRESET_ORDER = ['high', 'medium', 'low']
+
+# Fracción del tiempo de frame que puede consumir el trabajo estimado
+FRAME_BUDGET_RATIO = 0.8
+
+# Textos con brillo que se dibujan por frame en el peor caso (HUD + frase + aviso)
+GLOW_TEXTS_PER_FRAME = 6
+
+
+def machine_fingerprint():
+    """
+    Identificador estable de la máquina para indexar la caché del probe
+    """
+    parts = [
+        platform.node(),
+        platform.system(),
+        platform.machine(),
+        platform.processor(),
+        str(os.cpu_count()),
+        pygame.version.ver,
+        str(PROBE_VERSION),
+    ]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def _median_ms(func, repeats):
+    """
+    Ejecuta func varias veces y retorna la mediana en milisegundos
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def _make_still(width, height):
+    """
+    Genera una imagen fija con una cara esquemática para la inferencia de prueba
+    (evita depender de la webcam durante el probe)
+    """
+    still = np.full((height, width, 3), 90, dtype=np.uint8)
+    center = (width // 2, height // 2)
+    cv2.ellipse(still, center, (width // 5, height // 3), 0, 0, 360, (170, 190, 220), -1)
+    for dx in (-width // 12, width // 12):
+        cv2.ellipse(still, (center[0] + dx, center[1] - height // 12),
+                    (width // 30, height // 60), 0, 0, 360, (40, 40, 40), -1)
+    cv2.ellipse(still, (center[0], center[1] + height // 8),
+                (width // 15, height // 60), 0, 0, 360, (60, 40, 120), -1)
+    return still
+
+
+def benchmark_face_mesh(repeats=5):
+    """
+    Mide una inferencia de FaceMesh con refine_landmarks (peor caso)
+    """
+    import mediapipe as mp
+    still = _make_still(WEBCAM_WIDTH, WEBCAM_HEIGHT)
+    with mp.solutions.face_mesh.FaceMesh(
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    ) as face_mesh:
+        face_mesh.process(still)  # calentamiento (carga del grafo)
+        return _median_ms(lambda: face_mesh.process(still), repeats)
+
+
+def benchmark_glow_text(repeats=10):
+    """
+    Mide el dibujo de un texto con el brillo máximo
+    """
+    pygame.font.init()
+    font = pygame.font.Font(None, HUD_FONT_SIZE)
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    return _median_ms(
+        lambda: draw_glow_text(surface, font, 'SCORE: 12345', (200, 20), WHITE, glow_size=GLOW_SIZE),
+        repeats
+    )
+
+
+def benchmark_particles(repeats=10):
+    """
+    Mide un lote de actualización y dibujo de partículas con el presupuesto por defecto
+    """
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    particles = ParticleSystem()
+
+    def step():
+        # Emisión equivalente a dos paredes en un frame
+        for i in range(PARTICLE_COUNT * 2):
+            particles.emit(WINDOW_WIDTH // 2, 100 + i * 50, (0, 120, 120), count=2, direction='left')
+        particles.update()
+        particles.draw(surface)
+
+    # Llenar el sistema hasta un estado estable antes de medir
+    for _ in range(40):
+        step()
+    return _median_ms(step, repeats)
+
+
+def benchmark_blit(screen, repeats=10):
+    """
+    Mide el blit de una superficie de pantalla completa (como Game.draw)
+    """
+    source = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    source.fill((10, 10, 20))
+
+    def blit():
+        screen.fill((0, 0, 0))
+        screen.blit(source, (0, 0))
+
+    return _median_ms(blit, repeats)
+
+
+def estimate_frame_ms(results, preset):
+    """
+    Estima el costo por frame de un preset a partir de los resultados del probe
+    """
+    default = PERFORMANCE_PRESETS[DEFAULT_PRESET]
+    pixels_ratio = (preset['camera_width'] * preset['camera_height']) / float(
+        default['camera_width'] * default['camera_height'])
+    # Sin refine_landmarks el grafo de FaceMesh es bastante más barato
+    refine_ratio = 1.0 if preset['refine_landmarks'] else 0.7
+    face_mesh = results['face_mesh_ms'] * max(0.25, pixels_ratio) * refine_ratio / preset['inference_interval']
+
+    glow_ratio = preset['max_glow'] / float(max(1, GLOW_SIZE))
+    glow = results['glow_text_ms'] * glow_ratio * GLOW_TEXTS_PER_FRAME
+
+    particle_ratio = preset['particle_count'] / float(max(1, PARTICLE_COUNT))
+    particles = results['particles_ms'] * particle_ratio
+
+    return face_mesh + glow + particles + results['blit_ms']
+
+
+def choose_preset(results):
+    """
+    Elige el preset más alto cuyo costo estimado entra en su presupuesto de frame
+    """
+    for name in PRESET_ORDER:
+        preset = PERFORMANCE_PRESETS[name]
+        budget = 1000.0 / preset['fps'] * FRAME_BUDGET_RATIO
+        if estimate_frame_ms(results, preset) <= budget:
+            return name
+    return PRESET_ORDER[-1]
+
+
+def run_probe(screen):
+    """
+    Ejecuta todos los benchmarks y retorna los tiempos medidos (ms)
+    """
+    results = {
+        'glow_text_ms': benchmark_glow_text(),
+        'particles_ms': benchmark_particles(),
+        'blit_ms': benchmark_blit(screen),
+    }
+    try:
+        results['face_mesh_ms'] = benchmark_face_mesh()
+    except Exception as e:
+        print(f"[ERROR] No se pudo medir FaceMesh: {e}")
+        # Sin medición asumimos el peor caso para no saturar la máquina
+        results['face_mesh_ms'] = 1000.0 / PERFORMANCE_PRESETS['low']['fps']
+    return results
+
+
+def _load_cache():
+    if os.path.exists(PROBE_CACHE_FILE):
+        try:
+            with open(PROBE_CACHE_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+
+def _save_cache(cache):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(PROBE_CACHE_FILE, 'w') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        print(f"[ERROR] No se pudo guardar el resultado del probe: {e}")
+
+
+def load_or_probe(screen, force=False):
+    """
+    Retorna (nombre, preset) para esta máquina.
+    Usa el resultado guardado si existe; si no, ejecuta el probe y lo guarda.
+
+    Args:
+        screen: Superficie de pantalla ya inicializada (para medir el blit)
+        force: Ignora la caché y vuelve a medir
+    """
+    fingerprint = machine_fingerprint()
+    cache = _load_cache()
+    entry = cache.get(fingerprint)
+
+    if not force and entry and entry.get('preset') in PERFORMANCE_PRESETS:
+        name = entry['preset']
+        print(f"[OK] Preset de rendimiento '{name}' (guardado)")
+        return name, dict(PERFORMANCE_PRESETS[name])
+
+    start = time.perf_counter()
+    results = run_probe(screen)
+    name = choose_preset(results)
+    elapsed = time.perf_counter() - start
+
+    cache[fingerprint] = {
+        'preset': name,
+        'results': {k: round(v, 3) for k, v in results.items()},
+        'probed_at': int(time.time()),
+    }
+    _save_cache(cache)
+    print(f"[OK] Probe de hardware en {elapsed:.2f}s -> preset '{name}' {cache[fingerprint]['results']}")
+    return name, dict(PERFORMANCE_PRESETS[name])
+
+
+if __name__ == "__main__":
+    # Vuelve a medir esta máquina y actualiza la caché
+    pygame.init()
+    probe_screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    preset_name, preset = load_or_probe(probe_screen, force=True)
+    for key, value in preset.items():
+        print(f"  {key}: {value}")
+    pygame.quit()
@@ -0,0 +1,430 @@
+import argparse
+import math
+import multiprocessing
+import os
+import signal
+import socket
+import statistics
+import struct
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from config import (
+    WEBCAM_WIDTH, WEBCAM_HEIGHT, INFERENCE_PORT, INFERENCE_TIMEOUT_MS, INFERENCE_RETRY_SECONDS,
+    INFERENCE_ENCODING, INFERENCE_JPEG_QUALITY
+)
+
+# Protocolo (little-endian) sobre TCP:
+#   saludo del cliente: magic 'NMIS', versión u16
+#   pedido: id u32, codificación u8, refine_landmarks u8, ancho u16, alto u16,
+#           timeout del cliente u16 (ms, 0 = sin límite), tamaño u32 + datos (BGR crudo o JPEG)
+#   respuesta: id u32, estado u8, EAR f32, latencia en el servidor u32 (µs,
+#              cola + inferencia), inferencia u32 (µs)
+# Las respuestas de una conexión pueden llegar en otro orden que los pedidos
+# (el pool atiende varios a la vez): el id las identifica. Un pedido que sigue
+# en la cola cuando el cliente ya dejó de esperarlo se descarta sin respuesta
+INFERENCE_MAGIC = b'NMIS'
+INFERENCE_VERSION = 2
+HELLO = struct.Struct('<4sH')
+REQUEST = struct.Struct('<IBBHHHI')
+RESPONSE = struct.Struct('<IBfII')
+
+ENCODINGS = ('raw', 'jpeg')
+
+STATUS_FACE = 0
+STATUS_NO_FACE = 1
+STATUS_ERROR = 2
+STATUS_EXPIRED = 3  # interno: el cliente ya no espera la respuesta
+
+InferenceResult = namedtuple('InferenceResult', 'ear server_us inference_us round_trip_us')
+
+
+def parse_address(address):
+    """
+    'host:puerto' (o solo 'puerto') -> (host, puerto)
+    """
+    if isinstance(address, tuple):
+        return address
+    host, _, port = str(address).rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def encode_frame(frame, encoding=INFERENCE_ENCODING):
+    """
+    Retorna (codificación, ancho, alto, bytes) de un frame BGR
+    """
+    height, width = frame.shape[:2]
+    if encoding == 'jpeg':
+        ok, data = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, INFERENCE_JPEG_QUALITY])
+        if not ok:
+            raise ValueError("no se pudo codificar el frame en JPEG")
+        return ENCODINGS.index('jpeg'), width, height, data.tobytes()
+    return ENCODINGS.index('raw'), width, height, np.ascontiguousarray(frame).tobytes()
+
+
+def decode_frame(encoding, width, height, data):
+    if ENCODINGS[encoding] == 'jpeg':
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError("JPEG inválido")
+        return frame
+    return np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+
+
+def _recv_exact(connection, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("conexión cerrada")
+        data += chunk
+    return bytes(data)
+
+
+def _worker_main(jobs, results):
+    """
+    Proceso del pool: cada uno carga su propio FaceMesh (uno por refine_landmarks)
+    y toma el siguiente pedido libre de la cola compartida
+    """
+    from camera import create_face_mesh, measure_ear
+    meshes = {}
+    while True:
+        try:
+            job = jobs.get()
+        except KeyboardInterrupt:
+            # Ctrl+C en la terminal llega a todo el grupo; el servidor cierra el pool
+            continue
+        if job is None:
+            break
+        connection_id, request_id, encoding, refine, width, height, data, deadline = job
+        if time.monotonic() > deadline:
+            # Sobrecarga: no gastar FaceMesh en un frame que el juego ya resolvió local
+            results.put((connection_id, request_id, STATUS_EXPIRED, 0.0, 0))
+            continue
+        start = time.perf_counter()
+        try:
+            frame = decode_frame(encoding, width, height, data)
+            mesh = meshes.get(refine)
+            if mesh is None:
+                # Los frames llegan mezclados de varias cámaras: sin seguimiento entre frames
+                mesh = meshes[refine] = create_face_mesh(bool(refine), static_image_mode=True)
+            ear = measure_ear(mesh, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            status = STATUS_NO_FACE if ear is None else STATUS_FACE
+        except Exception as e:
+            print(f"[ERROR] Inferencia fallida: {e}")
+            ear, status = None, STATUS_ERROR
+        inference_us = int((time.perf_counter() - start) * 1000000)
+        results.put((connection_id, request_id, status, ear or 0.0, inference_us))
+    for mesh in meshes.values():
+        mesh.close()
+
+
+class InferenceServer:
+    def __init__(self, host='127.0.0.1', port=INFERENCE_PORT, workers=None):
+        """
+        Servidor de FaceMesh compartido: un hilo lee los pedidos de cada conexión,
+        un pool de procesos (uno por CPU) los atiende desde una cola común
+        y un hilo devuelve cada resultado a su conexión
+        """
+        self.worker_count = workers or os.cpu_count() or 1
+        context = multiprocessing.get_context('spawn')
+        self.jobs = context.Queue()
+        self.results = context.Queue()
+        # Los procesos arrancan antes que los hilos del servidor
+        self.workers = [context.Process(target=_worker_main, args=(self.jobs, self.results),
+                                        name=f"inference-{i}", daemon=True)
+                        for i in range(self.worker_count)]
+        for worker in self.workers:
+            worker.start()
+
+        self.connections = {}  # id -> (socket, lock de envío)
+        self.arrivals = {}  # (id de conexión, id de pedido) -> perf_counter de llegada
+        self.lock = threading.Lock()
+        self.next_connection = 0
+        self.socket = socket.create_server((host, port))
+        self.port = self.socket.getsockname()[1]
+        self.dispatcher = threading.Thread(target=self._dispatch_loop, name="inference-dispatch", daemon=True)
+        self.dispatcher.start()
+        print(f"[OK] Servidor de inferencia en {host}:{self.port} con {self.worker_count} procesos")
+
+    def serve_forever(self):
+        """
+        Acepta clientes hasta que se cierre el socket
+        """
+        while True:
+            try:
+                connection, address = self.socket.accept()
+            except OSError:
+                break
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self.lock:
+                connection_id = self.next_connection
+                self.next_connection += 1
+                self.connections[connection_id] = (connection, threading.Lock())
+            threading.Thread(target=self._read_loop, args=(connection_id, connection),
+                             name="inference-reader", daemon=True).start()
+
+    def _read_loop(self, connection_id, connection):
+        try:
+            magic, version = HELLO.unpack(_recv_exact(connection, HELLO.size))
+            if magic != INFERENCE_MAGIC or version != INFERENCE_VERSION:
+                raise ValueError(f"cliente incompatible (versión {INFERENCE_VERSION})")
+            while True:
+                request_id, encoding, refine, width, height, timeout_ms, size = REQUEST.unpack(
+                    _recv_exact(connection, REQUEST.size))
+                data = _recv_exact(connection, size)
+                # monotonic: comparable entre procesos (perf_counter no lo garantiza)
+                deadline = time.monotonic() + timeout_ms / 1000 if timeout_ms else math.inf
+                with self.lock:
+                    self.arrivals[(connection_id, request_id)] = time.perf_counter()
+                self.jobs.put((connection_id, request_id, encoding, refine, width, height, data, deadline))
+        except (OSError, ValueError, struct.error):
+            pass
+        with self.lock:
+            self.connections.pop(connection_id, None)
+        connection.close()
+
+    def _dispatch_loop(self):
+        while True:
+            result = self.results.get()
+            if result is None:
+                break
+            connection_id, request_id, status, ear, inference_us = result
+            with self.lock:
+                arrival = self.arrivals.pop((connection_id, request_id), None)
+                entry = self.connections.get(connection_id)
+            if entry is None or arrival is None or status == STATUS_EXPIRED:
+                continue  # el cliente se desconectó o ya no espera
+            server_us = int((time.perf_counter() - arrival) * 1000000)
+            connection, send_lock = entry
+            try:
+                with send_lock:
+                    connection.sendall(RESPONSE.pack(request_id, status, ear, server_us, inference_us))
+            except OSError:
+                pass
+
+    def close(self):
+        self.socket.close()
+        for _ in self.workers:
+            self.jobs.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+        self.results.put(None)
+        self.dispatcher.join(timeout=5)
+        with self.lock:
+            connections = [connection for connection, _ in self.connections.values()]
+        for connection in connections:
+            connection.close()
+
+
+class InferenceClient:
+    def __init__(self, address, timeout_ms=INFERENCE_TIMEOUT_MS, encoding=INFERENCE_ENCODING):
+        """
+        Cliente del servidor de inferencia (Camera en modo remoto). Conecta al
+        primer pedido; si algo falla o vence el timeout cierra la conexión y
+        la excepción (OSError/ValueError) le indica a Camera que use FaceMesh local
+        """
+        self.address = parse_address(address)
+        self.timeout = timeout_ms / 1000
+        self.encoding = encoding
+        self.socket = None
+        self.next_id = 0
+
+    def _connect(self):
+        self.socket = socket.create_connection(self.address, timeout=self.timeout)
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.socket.sendall(HELLO.pack(INFERENCE_MAGIC, INFERENCE_VERSION))
+
+    def infer(self, frame, refine_landmarks=True):
+        """
+        EAR de un frame BGR calculado en el servidor (ear None si no hay cara)
+        """
+        return self.request(encode_frame(frame, self.encoding), refine_landmarks)
+
+    def request(self, encoded, refine_landmarks=True):
+        """
+        Envía un frame ya codificado (encode_frame) y espera su respuesta
+        """
+        encoding, width, height, data = encoded
+        request_id = self.next_id
+        self.next_id = (self.next_id + 1) & 0xFFFFFFFF
+        start = time.perf_counter()
+        try:
+            if self.socket is None:
+                self._connect()
+            self.socket.sendall(REQUEST.pack(request_id, encoding, int(refine_landmarks), width, height,
+                                             min(int(self.timeout * 1000), 0xFFFF), len(data)) + data)
+            response_id, status, ear, server_us, inference_us = RESPONSE.unpack(
+                _recv_exact(self.socket, RESPONSE.size))
+        except OSError:
+            self.close()
+            raise
+        if response_id != request_id:
+            self.close()
+            raise ValueError(f"respuesta {response_id} para el pedido {request_id}")
+        if status == STATUS_ERROR:
+            raise ValueError("el servidor no pudo procesar el frame")
+        round_trip_us = int((time.perf_counter() - start) * 1000000)
+        return InferenceResult(ear if status == STATUS_FACE else None, server_us, inference_us, round_trip_us)
+
+    def close(self):
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+
+def serve(host='127.0.0.1', port=INFERENCE_PORT, workers=None):
+    server = InferenceServer(host, port, workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+def _wait_for_server(address, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(address, timeout=1).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def _client_loop(address, encoded, stop_at, stats, timeout_ms, rate):
+    """
+    Una estación: pide un frame cada 1/rate s (rate 0 = apenas llega la
+    respuesta) con el timeout del juego. Tras un fallo, como Camera, usa
+    FaceMesh local durante INFERENCE_RETRY_SECONDS (esos frames cuentan como locales)
+    """
+    client = InferenceClient(address, timeout_ms=timeout_ms)
+    period = 1.0 / rate if rate else 0.0
+    next_at = time.perf_counter()
+    remote_at = 0.0
+    while True:
+        now = time.perf_counter()
+        if period:
+            if next_at > now:
+                time.sleep(next_at - now)
+                now = next_at
+            next_at = max(next_at + period, now)
+        if now >= stop_at:
+            break
+        stats['frames'] += 1
+        if now < remote_at:
+            stats['local'] += 1
+            continue
+        try:
+            result = client.request(encoded)
+        except (OSError, ValueError):
+            stats['failures'] += 1
+            stats['local'] += 1
+            if period:
+                remote_at = time.perf_counter() + INFERENCE_RETRY_SECONDS
+            continue
+        stats['latencies'].append(result.round_trip_us / 1000)
+        stats['inference'].append(result.inference_us / 1000)
+    client.close()
+
+
+def load_test(address, client_counts=(1, 4, 16), seconds=5.0, encoding=INFERENCE_ENCODING, image=None,
+              timeout_ms=INFERENCE_TIMEOUT_MS, rate=0):
+    """
+    Generador de carga: N estaciones con el timeout del juego, en lazo cerrado
+    (rate 0: cada una manda el siguiente frame al recibir la respuesta) o a
+    rate frames/s. Reporta throughput, latencias de las respuestas a tiempo,
+    pedidos vencidos y frames que el juego habría resuelto con FaceMesh local
+    """
+    if image:
+        frame = cv2.imread(image)
+    else:
+        from hardware_probe import _make_still
+        frame = cv2.cvtColor(_make_still(WEBCAM_WIDTH, WEBCAM_HEIGHT), cv2.COLOR_RGB2BGR)
+    encoded = encode_frame(frame, encoding)
+    # Calentar los FaceMesh del pool
+    warm = InferenceClient(address, timeout_ms=30000)
+    face = warm.request(encoded).ear is not None
+    warm.close()
+    print(f"  Frame {frame.shape[1]}x{frame.shape[0]} {encoding} ({len(encoded[3]) / 1024:.0f} KB), "
+          f"cara detectada: {'sí' if face else 'no'}; timeout {timeout_ms} ms, "
+          f"{f'{rate:g} frames/s por estación' if rate else 'lazo cerrado'}")
+
+    rows = []
+    for count in client_counts:
+        stats = [{'frames': 0, 'local': 0, 'failures': 0, 'latencies': [], 'inference': []}
+                 for _ in range(count)]
+        start = time.perf_counter()
+        threads = [threading.Thread(target=_client_loop,
+                                    args=(address, encoded, start + seconds, stats[i], timeout_ms, rate))
+                   for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        all_latencies = sorted(value for item in stats for value in item['latencies'])
+        all_inference = [value for item in stats for value in item['inference']]
+        answered = len(all_latencies)
+        failures = sum(item['failures'] for item in stats)
+        row = {
+            'clients': count,
+            'requests': answered + failures,
+            'throughput': answered / elapsed,
+            'p50_ms': all_latencies[answered // 2] if answered else math.nan,
+            'p99_ms': all_latencies[min(answered - 1, int(answered * 0.99))] if answered else math.nan,
+            'inference_ms': statistics.fmean(all_inference) if all_inference else math.nan,
+            'timeouts': failures / max(1, answered + failures),
+            'local': sum(item['local'] for item in stats) / max(1, sum(item['frames'] for item in stats)),
+        }
+        rows.append(row)
+        print(f"  {count:2d} clientes: {row['throughput']:6.1f} frames/s  p50 {row['p50_ms']:6.1f} ms  "
+              f"p99 {row['p99_ms']:6.1f} ms  (inferencia {row['inference_ms']:.1f} ms)  "
+              f"vencidos {row['timeouts']:6.1%}  frames locales {row['local']:6.1%}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de inferencia FaceMesh compartido")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help="atender estaciones de juego")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=INFERENCE_PORT)
+    serve_parser.add_argument('--workers', type=int, help="procesos de FaceMesh (por defecto uno por CPU)")
+    load_parser = subparsers.add_parser('load', help="generador de carga")
+    load_parser.add_argument('--address', help="servidor ya corriendo (por defecto se levanta uno local)")
+    load_parser.add_argument('--workers', type=int)
+    load_parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16])
+    load_parser.add_argument('--seconds', type=float, default=5.0)
+    load_parser.add_argument('--encoding', choices=ENCODINGS, default=INFERENCE_ENCODING)
+    load_parser.add_argument('--image', help="foto para usar como frame (por defecto una sintética)")
+    load_parser.add_argument('--timeout-ms', type=int, default=INFERENCE_TIMEOUT_MS,
+                             help="timeout de cada pedido (por defecto el del juego)")
+    load_parser.add_argument('--rate', type=float, default=0,
+                             help="frames/s por estación (0 = lazo cerrado)")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.host, args.port, args.workers)
+    else:
+        process = None
+        address = parse_address(args.address) if args.address else ('127.0.0.1', INFERENCE_PORT)
+        if not args.address:
+            process = multiprocessing.get_context('spawn').Process(
+                target=serve, args=(address[0], address[1], args.workers))
+            process.start()
+        if not _wait_for_server(address):
+            print(f"[ERROR] El servidor de inferencia no responde en {address[0]}:{address[1]}")
+        else:
+            load_test(address, args.clients, args.seconds, args.encoding, args.image,
+                      args.timeout_ms, args.rate)
+        if process is not None:
+            # Ctrl+C simulado: serve() cierra el pool ordenadamente
+            os.kill(process.pid, signal.SIGINT)
+            process.join()
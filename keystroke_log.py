@@ -0,0 +1,157 @@
+import numpy as np
+
+import game_clock
+from config import WPM_WINDOW, KEY_INTERVAL_BIN_MS, KEY_INTERVAL_MAX_MS
+
+# Bits del campo flags
+FLAG_CORRECT = 1
+FLAG_EYES_OPEN = 2
+
+# Caracteres con estadística propia (Latin-1 cubre las tildes y la ñ);
+# el resto comparte el último casillero
+KEY_STATS_SIZE = 256
+OTHER_KEY = KEY_STATS_SIZE - 1
+
+
+class KeystrokeLog:
+    def __init__(self, capacity=1024):
+        """
+        Registro de pulsaciones en arrays preasignados (sin un objeto por tecla)
+        con métricas móviles que se actualizan en O(1) por pulsación
+        """
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)  # game_clock.now()
+        self.keys = np.zeros(capacity, dtype=np.int32)  # código del carácter escrito
+        self.expected = np.zeros(capacity, dtype=np.int32)  # código esperado (-1 = ninguno)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+
+        # Histograma de intervalos entre teclas (el último casillero es "o más")
+        self.interval_bins = np.zeros(KEY_INTERVAL_MAX_MS // KEY_INTERVAL_BIN_MS + 1, dtype=np.int64)
+
+        # Intentos y errores por carácter esperado
+        self.key_attempts = np.zeros(KEY_STATS_SIZE, dtype=np.int64)
+        self.key_errors = np.zeros(KEY_STATS_SIZE, dtype=np.int64)
+
+        self.reset()
+
+    def reset(self):
+        """
+        Vacía el registro reutilizando los arrays (nuevo nivel)
+        """
+        self.count = 0
+        self.start_time = None
+        self.window_start = 0  # índice de la primera pulsación dentro de la ventana
+        self.window_correct = 0  # correctas dentro de la ventana
+        self.interval_bins.fill(0)
+        self.interval_count = 0
+        self.key_attempts.fill(0)
+        self.key_errors.fill(0)
+
+    def start(self, now=None):
+        """
+        Marca el inicio de la escritura (fin de la memorización)
+        """
+        self.start_time = game_clock.now() if now is None else now
+
+    def _grow(self):
+        self.capacity *= 2
+        self.timestamps = np.resize(self.timestamps, self.capacity)
+        self.keys = np.resize(self.keys, self.capacity)
+        self.expected = np.resize(self.expected, self.capacity)
+        self.flags = np.resize(self.flags, self.capacity)
+
+    def append(self, char, expected_char, is_correct, eyes_open, now=None):
+        """
+        Registra una pulsación
+
+        Args:
+            char: Carácter escrito
+            expected_char: Carácter esperado (None si la frase ya terminó)
+            is_correct: Si la pulsación fue correcta
+            eyes_open: Si los ojos estaban abiertos al escribir
+        """
+        now = game_clock.now() if now is None else now
+        if self.count == self.capacity:
+            self._grow()
+
+        i = self.count
+        expected_code = ord(expected_char) if expected_char else -1
+        self.timestamps[i] = now
+        self.keys[i] = ord(char)
+        self.expected[i] = expected_code
+        self.flags[i] = (FLAG_CORRECT if is_correct else 0) | (FLAG_EYES_OPEN if eyes_open else 0)
+        self.count += 1
+
+        if is_correct:
+            self.window_correct += 1
+
+        # Intervalo con la pulsación anterior
+        if i > 0:
+            interval_ms = (now - self.timestamps[i - 1]) * 1000
+            bin_index = min(int(interval_ms // KEY_INTERVAL_BIN_MS), len(self.interval_bins) - 1)
+            self.interval_bins[bin_index] += 1
+            self.interval_count += 1
+
+        # Estadística por tecla esperada
+        if expected_code >= 0:
+            slot = expected_code if expected_code < OTHER_KEY else OTHER_KEY
+            self.key_attempts[slot] += 1
+            if not is_correct:
+                self.key_errors[slot] += 1
+
+    def _advance_window(self, now):
+        """
+        Saca de la ventana las pulsaciones más viejas que WPM_WINDOW (amortizado O(1))
+        """
+        limit = now - WPM_WINDOW
+        while self.window_start < self.count and self.timestamps[self.window_start] < limit:
+            if self.flags[self.window_start] & FLAG_CORRECT:
+                self.window_correct -= 1
+            self.window_start += 1
+
+    def instant_wpm(self, now=None):
+        """
+        WPM de los últimos WPM_WINDOW segundos (5 caracteres correctos = 1 palabra)
+        """
+        if self.start_time is None:
+            return 0
+        now = game_clock.now() if now is None else now
+        self._advance_window(now)
+
+        span = min(WPM_WINDOW, now - self.start_time)
+        if span <= 0:
+            return 0
+        return int((self.window_correct / 5.0) / (span / 60.0))
+
+    def interval_percentile(self, percentile):
+        """
+        Percentil (0-100) del intervalo entre teclas en ms, con resolución KEY_INTERVAL_BIN_MS
+        """
+        if self.interval_count == 0:
+            return 0
+        target = self.interval_count * percentile / 100.0
+        cumulative = np.cumsum(self.interval_bins)
+        bin_index = int(np.searchsorted(cumulative, target))
+        return (min(bin_index, len(self.interval_bins) - 1) + 1) * KEY_INTERVAL_BIN_MS
+
+    def error_rate(self, char):
+        """
+        Porcentaje de error cuando se esperaba este carácter
+        """
+        code = ord(char)
+        slot = code if code < OTHER_KEY else OTHER_KEY
+        attempts = self.key_attempts[slot]
+        if attempts == 0:
+            return 0
+        return int(self.key_errors[slot] * 100 / attempts)
+
+    def worst_keys(self, limit=3):
+        """
+        Retorna [(carácter, % error)] de las teclas con más errores
+        """
+        slots = np.flatnonzero(self.key_errors)
+        if len(slots) == 0:
+            return []
+        rates = self.key_errors[slots] / self.key_attempts[slots]
+        order = np.argsort(-rates, kind='stable')[:limit]
+        return [(chr(slots[i]) if slots[i] != OTHER_KEY else '?', int(rates[i] * 100)) for i in order]
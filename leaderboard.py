@@ -0,0 +1,224 @@
+import bisect
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from config import LEADERBOARD_DIR, LEADERBOARD_BUFFER, SCORE_DB_PATH
+
+# level_N.npy; otros archivos del directorio (temporales, nombres ajenos) se ignoran
+LEVEL_FILE = re.compile(r'level_(\d+)\.npy')
+
+
+class LevelBoard:
+    def __init__(self, scores=None, buffer_size=LEADERBOARD_BUFFER):
+        """
+        Distribución de puntajes de un nivel: un array ordenado (base) más un
+        buffer ordenado chico con los resultados nuevos. Las consultas son dos
+        búsquedas binarias; el buffer se fusiona al llenarse en O(n) (sin reordenar)
+        """
+        self.base = scores if scores is not None else np.zeros(0, dtype=np.int32)
+        self.buffer = []
+        self.buffer_size = buffer_size
+
+    def __len__(self):
+        return len(self.base) + len(self.buffer)
+
+    def add(self, score):
+        bisect.insort(self.buffer, int(score))
+        if len(self.buffer) >= self.buffer_size:
+            self.merge()
+
+    def merge(self):
+        """
+        Inserta el buffer en la base (copia lineal, sin ordenar de nuevo)
+        """
+        if self.buffer:
+            new = np.array(self.buffer, dtype=np.int32)
+            self.base = np.insert(self.base, np.searchsorted(self.base, new), new)
+            self.buffer = []
+
+    def count_below(self, score):
+        """
+        Cantidad de puntajes estrictamente menores: O(log n)
+        """
+        # La clave con el dtype de la base: si no, numpy convierte el array entero
+        key = np.int32(score)
+        return int(np.searchsorted(self.base, key, 'left')) + bisect.bisect_left(self.buffer, score)
+
+    def count_above(self, score):
+        above_base = len(self.base) - int(np.searchsorted(self.base, np.int32(score), 'right'))
+        return above_base + len(self.buffer) - bisect.bisect_right(self.buffer, score)
+
+    def rank(self, score):
+        """
+        Posición que tendría el puntaje (1 = el mejor)
+        """
+        return self.count_above(score) + 1
+
+    def percentile(self, score):
+        """
+        Porcentaje de resultados que el puntaje supera (None si no hay resultados)
+        """
+        total = len(self)
+        if total == 0:
+            return None
+        return int(self.count_below(score) * 100 / total)
+
+    def top(self, k=10):
+        """
+        Los k mejores puntajes (de mayor a menor): O(k)
+        """
+        candidates = np.concatenate([self.base[-k:] if k else self.base[:0],
+                                     np.array(self.buffer[-k:], dtype=np.int32)])
+        return np.sort(candidates)[::-1][:k].tolist()
+
+
+class Leaderboard:
+    def __init__(self, directory=LEADERBOARD_DIR):
+        """
+        Leaderboard de todos los niveles; cada nivel se guarda como un .npy
+        ordenado que se abre con mmap (arranque inmediato sin importar el tamaño)
+        """
+        self.directory = directory
+        self.levels = {}
+        self.dirty = set()
+
+    @staticmethod
+    def level_path(directory, level):
+        return os.path.join(directory, f"level_{level}.npy")
+
+    @classmethod
+    def load(cls, directory=LEADERBOARD_DIR):
+        board = cls(directory)
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                match = LEVEL_FILE.fullmatch(name)
+                if match:
+                    level = int(match.group(1))
+                    try:
+                        scores = np.load(os.path.join(directory, name), mmap_mode='r')
+                    except (OSError, ValueError) as e:
+                        print(f"[ERROR] No se pudo cargar {name}: {e}")
+                        continue
+                    board.levels[level] = LevelBoard(scores)
+        return board
+
+    def get(self, level):
+        if level not in self.levels:
+            self.levels[level] = LevelBoard()
+        return self.levels[level]
+
+    def submit(self, level, score):
+        """
+        Agrega un resultado y retorna el porcentaje de resultados anteriores que supera
+        """
+        board = self.get(level)
+        percentile = board.percentile(score)
+        board.add(score)
+        self.dirty.add(level)
+        return percentile
+
+    def save(self):
+        """
+        Guarda los niveles modificados (escritura atómica: archivo temporal + rename)
+        """
+        if not self.dirty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for level in sorted(self.dirty):
+            board = self.levels[level]
+            board.merge()
+            path = self.level_path(self.directory, level)
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix='.tmp', delete=False) as f:
+                np.save(f, np.ascontiguousarray(board.base, dtype=np.int32))
+            os.replace(f.name, path)
+        self.dirty.clear()
+
+
+def rebuild(db_path=SCORE_DB_PATH, directory=LEADERBOARD_DIR):
+    """
+    Reconstruye el leaderboard desde la base de puntajes (todas las partidas)
+    """
+    connection = sqlite3.connect(db_path)
+    rows = connection.execute("SELECT level, score FROM level_results").fetchall()
+    connection.close()
+
+    board = Leaderboard(directory)
+    if rows:
+        data = np.array(rows, dtype=np.int64)
+        for level in np.unique(data[:, 0]):
+            scores = np.sort(data[data[:, 0] == level, 1].astype(np.int32))
+            board.levels[int(level)] = LevelBoard(scores)
+            board.dirty.add(int(level))
+    board.save()
+    print(f"[OK] Leaderboard reconstruido con {len(rows)} resultados")
+
+
+def benchmark(size, rng):
+    directory = tempfile.mkdtemp()
+    scores = rng.integers(0, 20000, size=size, dtype=np.int32)
+
+    start = time.perf_counter()
+    board = Leaderboard(directory)
+    board.levels[1] = LevelBoard(np.sort(scores))
+    board.dirty.add(1)
+    board.save()
+    save_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    board = Leaderboard.load(directory)
+    load_ms = (time.perf_counter() - start) * 1000
+    level = board.get(1)
+
+    queries = rng.integers(0, 20000, size=10000)
+    start = time.perf_counter()
+    for score in queries:
+        level.percentile(int(score))
+        level.rank(int(score))
+    query_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        level.top(10)
+    top_us = (time.perf_counter() - start) / 1000 * 1e6
+
+    # Deja el buffer casi lleno para medir una fusión completa
+    additions = rng.integers(0, 20000, size=LEADERBOARD_BUFFER * 2 - 1)
+    start = time.perf_counter()
+    for score in additions:
+        board.submit(1, int(score))
+    submit_us = (time.perf_counter() - start) / len(additions) * 1e6
+
+    start = time.perf_counter()
+    level.merge()
+    merge_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{size:>10} resultados: guardar {save_ms:.0f} ms, cargar {load_ms:.2f} ms, "
+          f"percentil+rank {query_us:.1f} µs, top10 {top_us:.1f} µs, "
+          f"agregar {submit_us:.1f} µs (con fusiones), fusión {merge_ms:.1f} ms")
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    usage = (
+        "Uso:\n"
+        "  python leaderboard.py bench      (1M y 10M resultados)\n"
+        "  python leaderboard.py rebuild    (desde la base de puntajes)"
+    )
+    if len(sys.argv) != 2 or sys.argv[1] not in ('bench', 'rebuild'):
+        print(usage)
+        sys.exit(1)
+
+    if sys.argv[1] == 'bench':
+        generator = np.random.default_rng(0)
+        for n in (1000000, 10000000):
+            benchmark(n, generator)
+    else:
+        rebuild()
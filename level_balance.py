@@ -0,0 +1,236 @@
+import argparse
+import csv
+import os
+import time
+
+import cv2
+import numpy as np
+
+from config import (
+    REFERENCE_FPS, WALL_START_LEFT, WALL_START_RIGHT, WALL_WIDTH,
+    WALL_SPEED_EYES_CLOSED, ERROR_SPEED_PENALTY
+)
+from level_manager import LevelManager
+from player import Player
+
+_wall_gap = None
+
+# Caracteres por segundo que un jugador memoriza durante el tiempo de tolerancia:
+# si la frase no entra en la memoria tiene que mirar (menos tiempo con ojos cerrados)
+MEMORIZE_CHARS_PER_SECOND = 8.0
+
+# Grilla por defecto: (nombre, valores)
+DEFAULT_GRID = {
+    'wall_speed': np.arange(1.0, 5.01, 0.25),
+    'tolerance_time': np.arange(1.0, 6.01, 0.5),
+    'phrase_length': np.arange(10, 81, 5),
+    'error_rate': np.arange(0.0, 0.201, 0.02),
+    'closed_fraction': np.arange(0.0, 1.001, 0.1),
+}
+
+
+def wall_gap():
+    """
+    Distancia que recorre cada pared hasta tocar los píxeles del jugador
+    mientras escribe (animación 'walk'; las dos paredes son simétricas)
+    """
+    global _wall_gap
+    if _wall_gap is None:
+        player = Player(load_sprites=False)
+        walk = player.bounds['walk']
+        body = walk[0].unionall(walk[1:]).move(player.rect.topleft)
+        _wall_gap = min(body.left - (WALL_START_LEFT + WALL_WIDTH), WALL_START_RIGHT - body.right)
+    return _wall_gap
+
+
+def evaluate(wall_speed, tolerance_time, phrase_length, error_rate, closed_fraction,
+             memorize_rate=MEMORIZE_CHARS_PER_SECOND):
+    """
+    Evalúa en forma cerrada (arrays con broadcasting) cuánto tiempo hay antes del
+    choque y qué velocidad de escritura hace falta para terminar la frase a tiempo.
+
+    Modelo (un nivel = una frase, como en Game):
+      - cada carácter se intenta hasta acertar: errores E = L·e/(1-e); cada error
+        cuesta la tecla equivocada y un retroceso: teclas K = L + 2E
+      - cada error suma ERROR_SPEED_PENALTY a la velocidad con ojos abiertos;
+        repartidos en el tiempo T de escritura la velocidad crece linealmente
+      - con ojos cerrados (fracción c) la pared va a WALL_SPEED_EYES_CLOSED;
+        c se limita a la parte de la frase memorizada en tolerance_time
+      - distancia recorrida al terminar: FPS·T·(a + (1-c)·E·penalización/2)
+        con a = (1-c)·v0 + c·v_cerrados, que debe ser menor que wall_gap()
+    La parada de WALL_STOP_DURATION ocurre al completar la frase, cuando el nivel
+    ya terminó: no cambia la supervivencia de un nivel de una frase.
+
+    Returns:
+        dict con survival_time (s disponibles), required_wpm, errors, keystrokes,
+        effective_closed (fracción con ojos cerrados alcanzable)
+    """
+    error_rate = np.minimum(error_rate, 0.95)
+    errors = phrase_length * error_rate / (1.0 - error_rate)
+    keystrokes = phrase_length + 2.0 * errors
+
+    memorized = np.minimum(1.0, tolerance_time * memorize_rate / phrase_length)
+    closed = closed_fraction * memorized
+
+    base_speed = (1.0 - closed) * wall_speed + closed * WALL_SPEED_EYES_CLOSED
+    ramp_speed = 0.5 * (1.0 - closed) * errors * ERROR_SPEED_PENALTY  # promedio de la rampa
+    survival_time = wall_gap() / (REFERENCE_FPS * (base_speed + ramp_speed))
+
+    # 5 caracteres (teclas) por palabra
+    required_wpm = (keystrokes / 5.0) / (survival_time / 60.0)
+    return {
+        'survival_time': survival_time,
+        'required_wpm': required_wpm,
+        'errors': errors,
+        'keystrokes': keystrokes,
+        'effective_closed': closed,
+    }
+
+
+def evaluate_grid(grid):
+    """
+    Evalúa el producto cartesiano de la grilla en una sola pasada vectorizada.
+    Retorna (ejes, resultados) con arrays de forma (n1, n2, n3, n4, n5)
+    """
+    names = list(DEFAULT_GRID)
+    axes = [np.asarray(grid[name], dtype=np.float64) for name in names]
+    shaped = []
+    for i, values in enumerate(axes):
+        shape = [1] * len(axes)
+        shape[i] = len(values)
+        shaped.append(values.reshape(shape))
+    results = evaluate(*shaped)
+    full_shape = tuple(len(values) for values in axes)
+    results = {name: np.broadcast_to(values, full_shape) for name, values in results.items()}
+    return dict(zip(names, axes)), results
+
+
+def write_grid_csv(path, axes, results):
+    names = list(axes)
+    mesh = np.meshgrid(*axes.values(), indexing='ij')
+    columns = [m.ravel() for m in mesh] + [results['survival_time'].ravel(), results['required_wpm'].ravel()]
+    table = np.column_stack(columns)
+    header = ','.join(names + ['survival_time', 'required_wpm'])
+    np.savetxt(path, table, delimiter=',', header=header, comments='', fmt='%.4g')
+
+
+def average_phrase_length(level):
+    """
+    Largo medio de las frases que el nivel puede elegir (según el corpus actual)
+    """
+    from phrase_manager import PhraseManager
+    manager = PhraseManager()
+    corpus = manager.corpus
+    count = corpus.count(level.phrase_difficulty)
+    if level.target_difficulty is not None:
+        # Frases de la etiqueta alrededor de la posición objetivo (mismo criterio que el muestreo)
+        order = manager.features.label_order(corpus.phrase_id(level.phrase_difficulty, 0), count)
+        center = int(level.target_difficulty * (count - 1))
+        window = max(1, count // 10)
+        ids = order[max(0, center - window):center + window + 1]
+        return float(np.mean([len(corpus.get_by_id(int(i))) for i in ids]))
+    return float(np.mean([len(corpus.get(level.phrase_difficulty, i)) for i in range(count)]))
+
+
+def write_level_report(path, error_rate, closed_fraction):
+    """
+    Evalúa los niveles actuales de LevelManager para un jugador típico
+    """
+    rows = []
+    for level in LevelManager().levels:
+        length = average_phrase_length(level)
+        result = evaluate(level.wall_speed, level.tolerance_time, length, error_rate, closed_fraction)
+        rows.append({
+            'level': level.number,
+            'wall_speed': level.wall_speed,
+            'tolerance_time': level.tolerance_time,
+            'phrase_difficulty': level.phrase_difficulty,
+            'target_difficulty': level.target_difficulty,
+            'phrase_length': round(length, 1),
+            'survival_time': round(float(result['survival_time']), 2),
+            'required_wpm': round(float(result['required_wpm']), 1),
+        })
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+def draw_heatmap(path, values, row_labels, column_labels, title, cell=44, margin=70):
+    """
+    Guarda un heatmap con OpenCV: filas x columnas con el valor en cada celda
+    """
+    rows, columns = values.shape
+    finite = values[np.isfinite(values)]
+    low, high = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 1.0)
+    normalized = np.zeros_like(values) if high == low else (values - low) / (high - low)
+    colors = cv2.applyColorMap((np.clip(normalized, 0, 1) * 255).astype(np.uint8), cv2.COLORMAP_VIRIDIS)
+    colors = cv2.resize(colors, (columns * cell, rows * cell), interpolation=cv2.INTER_NEAREST)
+
+    image = np.full((rows * cell + margin + 30, columns * cell + margin + 10, 3), 255, dtype=np.uint8)
+    image[margin:margin + rows * cell, margin:margin + columns * cell] = colors
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    cv2.putText(image, title, (10, 25), font, 0.6, (0, 0, 0), 1, cv2.LINE_AA)
+    for r in range(rows):
+        cv2.putText(image, row_labels[r], (5, margin + r * cell + cell // 2 + 5), font, 0.4, (0, 0, 0), 1, cv2.LINE_AA)
+        for c in range(columns):
+            value = values[r, c]
+            text = f"{value:.0f}" if np.isfinite(value) else '-'
+            color = (0, 0, 0) if normalized[r, c] > 0.6 else (255, 255, 255)
+            cv2.putText(image, text, (margin + c * cell + 4, margin + r * cell + cell // 2 + 5),
+                        font, 0.35, color, 1, cv2.LINE_AA)
+    for c in range(columns):
+        cv2.putText(image, column_labels[c], (margin + c * cell + 4, margin - 10), font, 0.4, (0, 0, 0), 1, cv2.LINE_AA)
+    cv2.imwrite(path, image)
+
+
+def nearest(values, target):
+    return int(np.abs(values - target).argmin())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluador analítico de balance de niveles")
+    parser.add_argument('--out', default='balance', help="directorio de salida")
+    parser.add_argument('--error-rate', type=float, default=0.04, help="error del jugador típico")
+    parser.add_argument('--closed', type=float, default=0.6, help="fracción con ojos cerrados del jugador típico")
+    parser.add_argument('--length', type=float, default=35, help="largo de frase para los heatmaps")
+    args = parser.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+
+    start = time.perf_counter()
+    axes, results = evaluate_grid(DEFAULT_GRID)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    cells = results['required_wpm'].size
+    print(f"[OK] {cells} combinaciones evaluadas en {elapsed_ms:.1f} ms")
+
+    write_grid_csv(os.path.join(args.out, 'grid.csv'), axes, results)
+
+    # Cortes de la grilla para el jugador típico
+    length_index = nearest(axes['phrase_length'], args.length)
+    error_index = nearest(axes['error_rate'], args.error_rate)
+    closed_index = nearest(axes['closed_fraction'], args.closed)
+    speed_labels = [f"{v:g}" for v in axes['wall_speed']]
+
+    wpm = results['required_wpm'][:, :, length_index, error_index, closed_index]
+    draw_heatmap(os.path.join(args.out, 'required_wpm_speed_tolerance.png'), wpm, speed_labels,
+                 [f"{v:g}s" for v in axes['tolerance_time']],
+                 f"WPM necesario (largo {axes['phrase_length'][length_index]:g}, error "
+                 f"{axes['error_rate'][error_index]:.2f}, ojos cerrados {axes['closed_fraction'][closed_index]:.1f})")
+
+    tolerance_index = nearest(axes['tolerance_time'], 4.0)
+    survival = results['survival_time'][:, tolerance_index, length_index, error_index, :]
+    draw_heatmap(os.path.join(args.out, 'survival_speed_closed.png'), survival, speed_labels,
+                 [f"{v:.1f}" for v in axes['closed_fraction']],
+                 "Segundos hasta el choque (velocidad x fraccion ojos cerrados)")
+
+    wpm_length = results['required_wpm'][:, tolerance_index, :, error_index, closed_index]
+    draw_heatmap(os.path.join(args.out, 'required_wpm_speed_length.png'), wpm_length, speed_labels,
+                 [f"{v:g}" for v in axes['phrase_length']],
+                 "WPM necesario (velocidad x largo de frase)")
+
+    rows = write_level_report(os.path.join(args.out, 'levels.csv'), args.error_rate, args.closed)
+    for row in rows:
+        print(f"  Nivel {row['level']}: {row['survival_time']}s hasta el choque, "
+              f"{row['required_wpm']} WPM necesarios (frase de {row['phrase_length']} caracteres)")
+    print(f"[OK] CSV y heatmaps en {args.out}/")
@@ -1,32 +1,86 @@
+from config import (
+    ENDLESS_START_SPEED, ENDLESS_SPEED_STEP, ENDLESS_MAX_SPEED,
+    ENDLESS_START_TOLERANCE, ENDLESS_TOLERANCE_STEP, ENDLESS_MIN_TOLERANCE, ENDLESS_RAMP_LEVELS
+)
+
+
 class Level:
-    def __init__(self, number, wall_speed, tolerance_time, phrase_difficulty):
+    def __init__(self, number, wall_speed, tolerance_time, phrase_difficulty, target_difficulty=None):
         """
         Representa un nivel del juego
+        
+        target_difficulty: Opcional, dificultad numérica de la frase: posición 0-1
+        entre las frases de phrase_difficulty ordenadas por rasgos; si es None
+        se elige al azar dentro de phrase_difficulty
         """
         self.number = number
         self.wall_speed = wall_speed
         self.tolerance_time = tolerance_time
         self.phrase_difficulty = phrase_difficulty
+        self.target_difficulty = target_difficulty
+
+
+def endless_level(number):
+    """
+    Nivel del modo infinito: la velocidad sube y la tolerancia baja en línea
+    recta hasta sus límites; la frase va de fácil a la más difícil en ENDLESS_RAMP_LEVELS
+    """
+    wall_speed = min(ENDLESS_MAX_SPEED, ENDLESS_START_SPEED + ENDLESS_SPEED_STEP * (number - 1))
+    tolerance_time = max(ENDLESS_MIN_TOLERANCE, ENDLESS_START_TOLERANCE - ENDLESS_TOLERANCE_STEP * (number - 1))
+    ramp = min(1.0, (number - 1) / (ENDLESS_RAMP_LEVELS - 1))
+    # La rampa recorre las tres etiquetas en orden; el resto es la posición dentro de cada una
+    position = min(2.999, 3 * (0.10 + 0.85 * ramp))
+    label = int(position)
+    phrase_difficulty = ('easy', 'medium', 'hard')[label]
+    target_difficulty = round(position - label, 3)
+    return Level(number, round(wall_speed, 2), round(tolerance_time, 2), phrase_difficulty, target_difficulty)
+
+
+def endless_levels(start=1):
+    """
+    Generador infinito de niveles (cada nivel se crea al pedirlo)
+    """
+    number = start
+    while True:
+        yield endless_level(number)
+        number += 1
 
 
 class LevelManager:
-    def __init__(self):
+    def __init__(self, endless=False):
+        """
+        endless: modo infinito; los niveles salen de endless_levels y solo se
+        conservan el actual y el siguiente
+        """
         self.current_level = 0
         self.total_levels = 5
+        self.endless = endless
+        self.generator = None
+        self.current = None
+        self.upcoming = None  # siguiente nivel ya generado (peek_next_level)
         
         # Definir los 5 niveles con dificultad progresiva
         self.levels = [
-            Level(1, 1.5, 5.0, 'easy'),      # Nivel 1: Facil
-            Level(2, 2.0, 4.0, 'medium'),    # Nivel 2: Medio
-            Level(3, 2.5, 3.5, 'medium'),    # Nivel 3: Medio
-            Level(4, 3.0, 3.0, 'hard'),      # Nivel 4: Dificil
-            Level(5, 3.5, 2.5, 'hard'),      # Nivel 5: Muy Dificil
+            Level(1, 1.5, 5.0, 'easy', 0.30),      # Nivel 1: Facil
+            Level(2, 2.0, 4.0, 'medium', 0.25),    # Nivel 2: Medio
+            Level(3, 2.5, 3.5, 'medium', 0.75),    # Nivel 3: Medio
+            Level(4, 3.0, 3.0, 'hard', 0.35),      # Nivel 4: Dificil
+            Level(5, 3.5, 2.5, 'hard', 0.80),      # Nivel 5: Muy Dificil
         ]
+        if endless:
+            self.total_levels = None
+            self.start_level(1)
     
     def start_level(self, level_number):
         """
         Inicia un nivel especifico
         """
+        if self.endless:
+            self.generator = endless_levels(level_number)
+            self.current = next(self.generator)
+            self.upcoming = None
+            self.current_level = level_number - 1
+            return self.current
         if 1 <= level_number <= self.total_levels:
             self.current_level = level_number - 1
             return self.get_current_level()
@@ -37,6 +91,11 @@ class LevelManager:
         Avanza al siguiente nivel
         Retorna True si hay mas niveles, False si se completaron todos
         """
+        if self.endless:
+            self.current = self.peek_next_level()
+            self.upcoming = None
+            self.current_level += 1
+            return True
         if self.current_level < self.total_levels - 1:
             self.current_level += 1
             return True
@@ -46,14 +105,30 @@ class LevelManager:
         """
         Retorna el nivel actual
         """
+        if self.endless:
+            return self.current
         if 0 <= self.current_level < self.total_levels:
             return self.levels[self.current_level]
         return None
     
+    def peek_next_level(self):
+        """
+        Retorna el siguiente nivel sin avanzar (None si no hay más)
+        """
+        if self.endless:
+            if self.upcoming is None:
+                self.upcoming = next(self.generator)
+            return self.upcoming
+        if self.current_level + 1 < self.total_levels:
+            return self.levels[self.current_level + 1]
+        return None
+    
     def is_final_level(self):
         """
         Verifica si es el ultimo nivel
         """
+        if self.endless:
+            return False
         return self.current_level == self.total_levels - 1
     
     def get_level_number(self):
@@ -67,3 +142,5 @@ class LevelManager:
         Reinicia al primer nivel
         """
         self.current_level = 0
+        if self.endless:
+            self.start_level(1)
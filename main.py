@@ -1,41 +1,71 @@
 import pygame
+import random
 import sys
-import numpy as np
+import time
+from functools import partial
 from config import (
-    WINDOW_WIDTH, WINDOW_HEIGHT, FPS,
-    TOLERANCE_TIME
+    WINDOW_WIDTH, WINDOW_HEIGHT, REFERENCE_FPS,
+    TOLERANCE_TIME, IDLE_STATES, IDLE_REDRAW_MS, IDLE_INFERENCE_INTERVAL_MS,
+    PAUSED_INFERENCE_INTERVAL_MS, NO_FACE_PAUSE_TIME,
+    WALL_SPEED_EYES_CLOSED, ERROR_SPEED_PENALTY, WALL_STOP_DURATION,
+    ENDLESS_HISTORY, ENDLESS_RAMP_LEVELS, ENDLESS_LEADERBOARD_OFFSET,
+    ASSET_BUNDLE_PATH, COMPLETE_SOUND_PATH, SPECTATOR_HOST, SPECTATOR_PORT, INFERENCE_SERVER
 )
 from camera import Camera
-from player import Player
+from player import Player, SPRITE_CONFIG
 from walls import WallManager
 from phrase_manager import PhraseManager
 from ui import UI
 from level_manager import LevelManager
 from score_manager import ScoreManager
-from effects import ParticleSystem, ScreenShake, ColorManager
-from floor import Floor
+from telemetry import TelemetryLog
+from leaderboard import Leaderboard
+from effects import ParticleSystem, ScreenShake, ColorManager, set_max_glow
+from floor import Floor, FLOOR_TILE_PATH
+from asset_manager import AssetManager
+from asset_bundle import open_bundle, SYNTH_SOUNDS
+from async_runner import AsyncRunner
+from spectator import SpectatorServer, parse_address as parse_spectator_address
+from audio import KeystrokeAudio, pre_init_mixer
+import hardware_probe
+import synth
+import game_clock
+from session_recorder import SessionRecorder
 
 
 class Game:
-    def __init__(self):
-        # Inicializar Pygame primero
+    def __init__(self, preset=None, camera=None, persist=True, endless=False,
+                 inference_server=INFERENCE_SERVER):
+        """
+        preset: Opcional, (nombre, dict) del preset de rendimiento (por defecto el del probe)
+        camera: Opcional, cámara ya creada (el replay usa una cámara simulada)
+        persist: Si las partidas se guardan (puntajes y telemetría)
+        endless: Modo infinito (niveles generados sin fin)
+        inference_server: Opcional, 'host:puerto' del servidor de inferencia compartido
+        """
+        self.endless = endless
+        # Inicializar Pygame primero (mixer de baja latencia configurado antes de init)
+        pre_init_mixer()
         pygame.init()
         pygame.mixer.init()  # Inicializar mixer para sonidos
+        self.keystroke_audio = KeystrokeAudio()
+        self.last_events_time = time.perf_counter()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("No Mires - Typing Game")
         self.clock = pygame.time.Clock()
 
-        # Generar sonidos
-        self.error_sound = self.generate_error_sound()
-        self.uppercase_sound = self.generate_uppercase_sound()
-        self.lowercase_sound = self.generate_lowercase_sound()
-
-        # Cargar sonido de completar frase
-        try:
-            self.complete_sound = pygame.mixer.Sound("Sonidos/myinstants.mp3")
-        except Exception as e:
-            print(f"No se pudo cargar el sonido de completar: {e}")
-            self.complete_sound = None
+        # Elegir preset de rendimiento (probe en el primer arranque, luego caché)
+        if preset is None:
+            preset = hardware_probe.load_or_probe(self.screen)
+        self.preset_name, self.preset = preset
+        self.fps = self.preset['fps']
+        # Las velocidades están en píxeles por frame a REFERENCE_FPS
+        self.frame_scale = REFERENCE_FPS / float(self.fps)
+        self.inference_interval = self.preset['inference_interval']
+        self.frame_count = 0
+        self.last_inference_ticks = 0
+        self.no_face_since = None  # ticks desde los que no se detecta cara jugando
+        set_max_glow(self.preset['max_glow'])
 
         # Crear UI temporal para mostrar pantalla de carga
         self.ui = UI(self.screen)
@@ -45,151 +75,114 @@ class Game:
         self.ui.draw_loading(0)
         pygame.display.flip()
         
-        # Cargar componentes con progreso
-        # Cámara (30%)
-        self.camera = Camera()
-        self.screen.fill((0, 0, 0))
-        self.ui.draw_loading(30)
-        pygame.display.flip()
+        # Encolar assets: se decodifican en paralelo mientras se dibuja el progreso real
+        # Si hay bundle pre-decodificado se toma de ahí; lo que falte o esté viejo
+        # se decodifica desde los archivos sueltos
+        self.assets = AssetManager()
+        mixer_format = pygame.mixer.get_init()
+        self.bundle = open_bundle(ASSET_BUNDLE_PATH, mixer_format)
+        for anim_name, sprite in SPRITE_CONFIG.items():
+            if not self.assets.add_bundled(f"sprite_{anim_name}", self.bundle):
+                self.assets.add_image(f"sprite_{anim_name}", sprite['path'])
+        if not self.assets.add_bundled('floor_tile', self.bundle):
+            self.assets.add_image('floor_tile', FLOOR_TILE_PATH)
         
-        # Jugador con sprites (50%)
-        self.player = Player()
-        self.screen.fill((0, 0, 0))
-        self.ui.draw_loading(50)
-        pygame.display.flip()
+        # Sonidos (PCM vectorizado, cacheado en disco)
+        for sound_name in SYNTH_SOUNDS:
+            if not self.assets.add_bundled(sound_name, self.bundle):
+                self.assets.add_sound(sound_name, partial(synth.get_pcm, sound_name, mixer_format))
+        if not self.assets.add_bundled('complete', self.bundle):
+            self.assets.add_sound('complete', partial(synth.get_file_pcm, COMPLETE_SOUND_PATH, mixer_format))
         
-        # Paredes y suelo (70%)
-        self.walls = WallManager()
-        self.floor = Floor()
-        self.screen.fill((0, 0, 0))
-        self.ui.draw_loading(70)
-        pygame.display.flip()
+        # La cámara se abre en el hilo principal mientras el pool decodifica
+        if camera is None:
+            self.assets.add_main_thread('camera', lambda: Camera(
+                self.preset['camera_width'],
+                self.preset['camera_height'],
+                self.preset['refine_landmarks'],
+                inference_server
+            ))
+        
+        while not self.assets.is_done():
+            progress = self.assets.poll()
+            pygame.event.pump()
+            self.screen.fill((0, 0, 0))
+            self.ui.draw_loading(progress)
+            pygame.display.flip()
+            self.clock.tick(REFERENCE_FPS)
+        self.assets.shutdown()
+        if self.bundle is not None:
+            # convert_alpha y Sound(buffer=) ya copiaron los datos: liberar el mapeo
+            self.bundle.close()
+            self.bundle = None
+        
+        self.camera = camera or self.assets.get('camera')
+        self.error_sound = self.assets.get('error')
+        self.uppercase_sound = self.assets.get('uppercase')
+        self.lowercase_sound = self.assets.get('lowercase')
+        self.complete_sound = self.assets.get('complete')
+        if self.complete_sound is None:
+            print("No se pudo cargar el sonido de completar")
+        
+        # Jugador con sprites ya decodificados
+        self.player = Player({
+            anim_name: self.assets.get(f"sprite_{anim_name}") for anim_name in SPRITE_CONFIG
+        })
+        self.player.animation_speed *= self.frame_scale
         
-        # Managers (85%)
+        # Paredes y suelo
+        self.walls = WallManager(self.preset['particle_count'], self.frame_scale)
+        self.walls.track(self.player)
+        self.floor = Floor(self.assets.get('floor_tile'))
+        
+        # Managers
         self.phrase_manager = PhraseManager()
-        self.level_manager = LevelManager()
-        self.score_manager = ScoreManager()
-        self.screen.fill((0, 0, 0))
-        self.ui.draw_loading(85)
-        pygame.display.flip()
+        self.level_manager = LevelManager(endless)
+        self.score_manager = ScoreManager(persist, ENDLESS_HISTORY if endless else None)
+        self.telemetry = TelemetryLog() if persist else None
+        self.leaderboard = Leaderboard.load() if persist else None
+        self.level_percentile = None  # % de jugadores superados en el último nivel
         
-        # Efectos (100%)
-        self.particle_system = ParticleSystem()
+        # Efectos
+        self.particle_system = ParticleSystem(self.preset['max_particles'])
         self.screen_shake = ScreenShake()
         self.color_manager = ColorManager()
-        self.screen.fill((0, 0, 0))
-        self.ui.draw_loading(100)
-        pygame.display.flip()
-        
-        # Esperar un momento para que se vea el 100%
-        pygame.time.wait(500)
         
         # Estados del juego
+        game_clock.advance()
         self.game_state = "MENU"  # Iniciar en pantalla de inicio
         self.tolerance_timer = TOLERANCE_TIME
-        self.start_ticks = pygame.time.get_ticks()
+        self.start_ticks = game_clock.ticks()
         self.wall_stop_timer = 0
         self.current_wall_speed = 0
+        self.next_level_ready = False  # próximo nivel precalculado en LEVEL_COMPLETE
+        
+        # Grabación de la sesión (session_recorder.SessionRecorder)
+        self.recorder = None
+        self.spectator = None  # spectator.SpectatorServer (--spectate)
+        self.deferred_quit = False  # True con el runner asíncrono (async_runner)
         
         # Iniciar primer nivel
         self.start_new_level()
 
         self.running = True
 
-    def generate_error_sound(self):
+    def start_session(self, seed):
         """
-        Genera un sonido de error sintético (beep corto)
+        Reinicia la partida desde el primer nivel con todo el azar derivado de
+        una semilla: con los mismos eventos y el mismo reloj el resultado es idéntico
         """
-        sample_rate = 22050
-        duration = 0.1  # 100ms
-        frequency = 400  # Hz - tono grave para error
-
-        # Generar onda cuadrada para un sonido más "duro"
-        samples = int(sample_rate * duration)
-        wave = np.zeros((samples, 2), dtype=np.int16)
-
-        for i in range(samples):
-            # Onda cuadrada
-            value = 0.3 if (i // (sample_rate // frequency // 2)) % 2 == 0 else -0.3
-            # Fade out para evitar clic al final
-            fade = 1.0 - (i / samples) * 0.7
-            sample_value = int(value * 32767 * fade)
-            wave[i] = [sample_value, sample_value]  # Stereo
-
-        sound_array = pygame.sndarray.make_sound(wave)
-        return sound_array
-
-    def generate_lowercase_sound(self):
-        """
-        Genera sonido para minúsculas (tono medio-bajo, suave)
-        """
-        sample_rate = 22050
-        duration = 0.06  # 60ms - corto
-
-        # Tono medio-bajo con armónico
-        freq1 = 440  # La (tono de referencia)
-        freq2 = 550  # Do# (tercera menor)
-
-        samples = int(sample_rate * duration)
-        wave = np.zeros((samples, 2), dtype=np.int16)
-
-        for i in range(samples):
-            t = i / sample_rate
-            # Onda senoidal pura para sonido claro
-            value1 = np.sin(2 * np.pi * freq1 * t) * 0.12
-            value2 = np.sin(2 * np.pi * freq2 * t) * 0.06
-            value = value1 + value2
-
-            # Envelope suave
-            if i < samples * 0.15:
-                envelope = i / (samples * 0.15)
-            elif i > samples * 0.6:
-                envelope = 1.0 - ((i - samples * 0.6) / (samples * 0.4))
-            else:
-                envelope = 1.0
-
-            sample_value = int(value * 32767 * envelope)
-            wave[i] = [sample_value, sample_value]
-
-        sound_array = pygame.sndarray.make_sound(wave)
-        return sound_array
-
-    def generate_uppercase_sound(self):
-        """
-        Genera sonido para mayúsculas (tono alto, brillante, distintivo)
-        """
-        sample_rate = 22050
-        duration = 0.07  # 70ms
-
-        # Tonos más altos para mayúsculas (más "brillante")
-        freq1 = 880  # La una octava arriba
-        freq2 = 1047  # Do una octava arriba
-        freq3 = 1319  # Mi (añade brillo)
-
-        samples = int(sample_rate * duration)
-        wave = np.zeros((samples, 2), dtype=np.int16)
-
-        for i in range(samples):
-            t = i / sample_rate
-            # Tres frecuencias para sonido más complejo y distintivo
-            value1 = np.sin(2 * np.pi * freq1 * t) * 0.10
-            value2 = np.sin(2 * np.pi * freq2 * t) * 0.08
-            value3 = np.sin(2 * np.pi * freq3 * t) * 0.05  # Armónico brillante
-            value = value1 + value2 + value3
-
-            # Envelope con ataque rápido para sonido "punchy"
-            if i < samples * 0.05:
-                envelope = i / (samples * 0.05)
-            elif i > samples * 0.65:
-                envelope = 1.0 - ((i - samples * 0.65) / (samples * 0.35))
-            else:
-                envelope = 1.0
-
-            sample_value = int(value * 32767 * envelope)
-            wave[i] = [sample_value, sample_value]
-
-        sound_array = pygame.sndarray.make_sound(wave)
-        return sound_array
+        random.seed(seed)  # partículas y screen shake
+        self.phrase_manager.seed(seed)
+        self.level_manager.reset()
+        self.score_manager.reset_game()
+        self.frame_count = 0
+        self.last_inference_ticks = 0
+        self.no_face_since = None
+        self.wall_stop_timer = 0
+        self.screen_shake = ScreenShake()
+        self.color_manager = ColorManager()
+        self.start_new_level()
 
     def start_new_level(self):
         """
@@ -202,6 +195,8 @@ class Game:
             self.walls.reset()
             self.score_manager.reset_level()
             self.particle_system.clear()
+            self.level_percentile = None
+            self.next_level_ready = False
             
             # Configurar velocidad de paredes según el nivel
             # Configurar velocidad de paredes según el nivel
@@ -215,31 +210,130 @@ class Game:
             # Obtener nueva frase
             difficulty = current_level.phrase_difficulty
             # CORREGIDO: usar get_random_phrase y eliminar set_phrase
-            self.current_phrase = self.phrase_manager.get_random_phrase(difficulty)
+            self.current_phrase = self.phrase_manager.get_random_phrase(
+                difficulty, current_level.target_difficulty
+            )
             
             # Resetear timer
-            self.start_ticks = pygame.time.get_ticks()
+            self.start_ticks = game_clock.ticks()
             self.game_state = "MEMORIZING"
         else:
-            self.game_state = "GAME_COMPLETE"
+            self.end_game("GAME_COMPLETE")
+
+    def prepare_next_level(self):
+        """
+        Durante LEVEL_COMPLETE elige la frase del próximo nivel y renderiza su
+        texto, para que el cambio de nivel no tenga trabajo pendiente
+        """
+        if self.next_level_ready:
+            return
+        self.next_level_ready = True
+        level = self.level_manager.peek_next_level()
+        if level is None:
+            return
+        phrase = self.phrase_manager.prefetch(level.phrase_difficulty, level.target_difficulty)
+        self.ui.prepare_phrase(phrase)
+
+    def leaderboard_level(self):
+        """
+        Nivel del leaderboard para el nivel actual: en modo infinito los niveles
+        posteriores a la rampa comparten uno (mismos parámetros de frase)
+        """
+        level = self.level_manager.current_level
+        if self.endless:
+            return ENDLESS_LEADERBOARD_OFFSET + min(level, ENDLESS_RAMP_LEVELS)
+        return level
 
-    def handle_events(self):
+    def log_level(self, outcome):
+        """
+        Registra el nivel terminado (completado o perdido) en la telemetría
+        """
+        if self.telemetry is None:
+            return
+        level = self.level_manager.get_current_level()
+        score = self.score_manager
+        self.telemetry.append({
+            'timestamp': time.time(),
+            'outcome': outcome,
+            'level': level.number,
+            'phrase_difficulty': level.phrase_difficulty,
+            'target_difficulty': level.target_difficulty,
+            'level_wall_speed': level.wall_speed,
+            'tolerance_time': level.tolerance_time,
+            'phrase_id': self.phrase_manager.current_phrase_id,
+            'wall_speed': self.walls.current_speed,
+            'penalized_speed': self.current_wall_speed,
+            'wpm': score.calculate_wpm(),
+            'accuracy': score.calculate_accuracy(),
+            'max_combo': score.max_combo,
+            'eyes_closed_time': score.eyes_closed_time,
+            'level_score': score.level_score,
+            'total_score': score.total_score,
+            'typed_chars': self.phrase_manager.input_length,
+            'correct_chars': score.correct_chars,
+        })
+
+    def end_game(self, state):
+        """
+        Termina la partida (GAME_OVER o GAME_COMPLETE) y la guarda en segundo plano
+        """
+        self.game_state = state
+        self.score_manager.save_high_score(outcome=state)
+
+    def quit_game(self):
+        """
+        Cierra el juego guardando la grabación y los puntajes pendientes.
+        Con deferred_quit (runner asíncrono) solo marca el fin del bucle:
+        el cierre lo hace el runner sin bloquear el frame
+        """
+        self.running = False
+        if self.deferred_quit:
+            return
+        self.stop_recording()
+        for close in self.shutdown_tasks():
+            close()
+        pygame.quit()
+        sys.exit()
+
+    def shutdown_tasks(self):
+        """
+        Pasos de cierre independientes entre sí (pueden correr en paralelo)
+        """
+        tasks = [self.score_manager.close, self.camera.release]
+        if self.leaderboard:
+            tasks.append(self.leaderboard.save)
+        if self.telemetry:
+            tasks.append(self.telemetry.close)
+        if self.spectator:
+            tasks.append(self.spectator.close)
+        return tasks
+
+    def handle_events(self, events=None):
         """
         Maneja los eventos de entrada
+
+        Args:
+            events: Opcional, eventos ya extraídos de la cola (modo reposo)
         """
-        for event in pygame.event.get():
+        if events is None:
+            events = pygame.event.get()
+        # Momento en que se leyeron las teclas (medición de latencia de audio);
+        # una tecla pudo esperar en la cola desde la lectura anterior
+        events_time = time.perf_counter()
+        queue_wait_ms = (events_time - self.last_events_time) * 1000
+        self.last_events_time = events_time
+        for event in events:
             if event.type == pygame.QUIT:
-                self.running = False
-                self.camera.cap.release()
-                pygame.quit()
-                sys.exit()
+                self.quit_game()
             
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    self.running = False
-                    self.camera.cap.release()
-                    pygame.quit()
-                    sys.exit()
+                    self.quit_game()
+                
+                # Cualquier tecla reanuda la partida en pausa
+                if self.game_state == "PAUSED":
+                    self.resume_game()
+                    continue
                 
                 # Pantalla de inicio
                 if self.game_state == "MENU":
@@ -259,7 +353,7 @@ class Game:
                         if self.level_manager.next_level():
                             self.start_new_level()
                         else:
-                            self.game_state = "GAME_COMPLETE"
+                            self.end_game("GAME_COMPLETE")
                 
                 # Input de escritura
                 elif self.game_state == "PLAYING":
@@ -282,23 +376,23 @@ class Game:
                     else:
                         # Añadir caracter si es valido
                         if event.unicode and event.unicode.isprintable():
-                            # Verificar si el caracter es correcto
-                            current_input = self.phrase_manager.get_user_input()
-                            expected_char = self.current_phrase[len(current_input)] if len(current_input) < len(self.current_phrase) else None
-                            
-                            self.phrase_manager.add_character(event.unicode)
+                            # Verificar si el caracter es correcto (estado incremental, O(1))
+                            expected_char = self.phrase_manager.get_expected_char()
+                            is_correct = self.phrase_manager.add_character(event.unicode)
                             
                             # Actualizar estadísticas
-                            is_correct = (event.unicode == expected_char)
+                            self.score_manager.record_keystroke(
+                                event.unicode, expected_char, is_correct, self.camera.eyes_open
+                            )
                             if is_correct:
                                 self.score_manager.add_correct_character()
                                 # No se reproduce sonido para caracteres correctos
                             else:
                                 self.score_manager.add_incorrect_character()
-                                # Reproducir sonido de error
-                                self.error_sound.play()
+                                # Reproducir sonido de error (pool de canales de baja latencia)
+                                self.keystroke_audio.play(self.error_sound, events_time, queue_wait_ms)
                                 # Aumentar velocidad ligeramente por error
-                                self.current_wall_speed += 0.3
+                                self.current_wall_speed += ERROR_SPEED_PENALTY
                                 self.walls.set_speed(self.current_wall_speed)
                             
                             # Verificar si completó la frase
@@ -308,18 +402,140 @@ class Game:
                                     self.complete_sound.play()
 
                                 # Frase correcta: detener paredes por 2 segundos
-                                self.wall_stop_timer = 2000  # WALL_STOP_DURATION
+                                self.wall_stop_timer = WALL_STOP_DURATION
                                 self.walls.stop_moving()
 
-                                self.score_manager.complete_level(self.level_manager.current_level)
+                                level_score = self.score_manager.complete_level(
+                                    self.level_manager.current_level,
+                                    self.phrase_manager.current_phrase_id
+                                )
+                                if self.leaderboard:
+                                    self.level_percentile = self.leaderboard.submit(
+                                        self.leaderboard_level(), level_score
+                                    )
+                                self.log_level("LEVEL_COMPLETE")
                                 self.game_state = "LEVEL_COMPLETE"
     
+    def pause_game(self):
+        """
+        Pausa la partida (no se detecta la cara del jugador)
+        """
+        self.game_state = "PAUSED"
+        self.walls.stop_moving()
+        self.score_manager.pause_typing()
+    
+    def resume_game(self):
+        """
+        Reanuda la partida pausada
+        """
+        self.game_state = "PLAYING"
+        self.no_face_since = None
+        self.score_manager.resume_typing()
+    
+    def is_idle(self):
+        """
+        Verifica si la pantalla es estática (sin animaciones pendientes)
+        """
+        return (self.game_state in IDLE_STATES
+                and not self.particle_system.particles
+                and not self.screen_shake.is_shaking())
+    
+    def get_idle_inference_interval(self):
+        """
+        Retorna cada cuántos ms se ejecuta FaceMesh en reposo (0 = suspendido)
+        """
+        if self.game_state == "PAUSED":
+            return PAUSED_INFERENCE_INTERVAL_MS
+        return IDLE_INFERENCE_INTERVAL_MS
+    
+    def should_run_inference(self):
+        """
+        Decide si en este frame se procesa la cámara con FaceMesh
+        """
+        if self.game_state in IDLE_STATES:
+            interval = self.get_idle_inference_interval()
+            if interval <= 0:
+                return False
+            return game_clock.ticks() - self.last_inference_ticks >= interval
+        # Jugando: cada inference_interval frames según el preset
+        return self.frame_count % self.inference_interval == 0
+    
+    def get_idle_redraw_timeout(self):
+        """
+        Retorna cada cuántos ms se redibuja en reposo si no llegan eventos
+        """
+        timeout = IDLE_REDRAW_MS
+        interval = self.get_idle_inference_interval()
+        if interval > 0:
+            timeout = min(timeout, interval)
+        return timeout
+    
+    def wait_for_events(self):
+        """
+        Espera bloqueando hasta el próximo evento o hasta que toque redibujar.
+        Retorna la lista de eventos pendientes (vacía si venció el tiempo)
+        """
+        event = pygame.event.wait(self.get_idle_redraw_timeout())
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+    
+    def update_face_presence(self):
+        """
+        Pausa la partida si no se detecta la cara durante NO_FACE_PAUSE_TIME segundos.
+        Retorna True si se pausó
+        """
+        # Sin cámara no hay forma de saber si el jugador está presente
+        if not self.camera.frame_ok or self.camera.face_detected:
+            self.no_face_since = None
+            return False
+        
+        current_time = game_clock.ticks()
+        if self.no_face_since is None:
+            self.no_face_since = current_time
+        elif current_time - self.no_face_since >= NO_FACE_PAUSE_TIME * 1000:
+            self.pause_game()
+            return True
+        return False
+    
+    def step(self, events, frame_us=None):
+        """
+        Avanza un frame de lógica: fija el reloj del frame, procesa los eventos
+        y actualiza. Es el único punto de entrada que graba y reproduce el replay
+
+        Args:
+            events: Eventos del frame
+            frame_us: Opcional, tiempo del frame en microsegundos (replay)
+        """
+        game_clock.advance(frame_us)
+        if self.recorder:
+            self.recorder.begin_frame(events)
+        self.handle_events(events)
+        self.update()
+        if self.recorder:
+            self.recorder.end_frame(self.camera)
+        if self.spectator:
+            self.spectator.publish(self)
+    
+    def stop_recording(self):
+        """
+        Cierra la grabación en curso guardando el resultado de la sesión
+        """
+        if self.recorder:
+            self.recorder.finish(self)
+            self.recorder = None
+    
     def update(self):
         """
         Actualiza la logica del juego
         """
-        # Detectar estado de los ojos
-        eyes_open = self.camera.detect_eyes()
+        # Detectar estado de los ojos (menos a menudo en reposo o según el preset)
+        if self.should_run_inference():
+            eyes_open = self.camera.detect_eyes()
+            self.last_inference_ticks = game_clock.ticks()
+        else:
+            eyes_open = self.camera.eyes_open
+        self.frame_count += 1
         
         # Actualizar sistema de puntuacion de ojos cerrados
         if not eyes_open and self.game_state == "PLAYING":
@@ -329,7 +545,7 @@ class Game:
             
         if self.game_state == "MEMORIZING":
             # Cuenta regresiva
-            current_time = pygame.time.get_ticks()
+            current_time = game_clock.ticks()
             elapsed = (current_time - self.start_ticks) / 1000
             self.tolerance_timer = max(0, TOLERANCE_TIME - elapsed)
             
@@ -337,10 +553,19 @@ class Game:
                 self.game_state = "PLAYING"
                 self.score_manager.start_typing()
         
-        elif self.game_state == "PLAYING":
+        elif self.game_state == "PAUSED":
+            # La cara volvió a aparecer: reanudar
+            if self.camera.face_detected:
+                self.resume_game()
+        
+        elif self.game_state == "LEVEL_COMPLETE":
+            # Precalcular el próximo nivel mientras se muestra el resultado
+            self.prepare_next_level()
+        
+        elif self.game_state == "PLAYING" and not self.update_face_presence():
             # Actualizar timer de parada de paredes (después de completar frase)
             if self.wall_stop_timer > 0:
-                self.wall_stop_timer -= 1000 / 60  # Restar ms por frame (asumiendo 60 FPS)
+                self.wall_stop_timer -= 1000 / self.fps  # Restar ms por frame
                 self.walls.stop_moving()
             else:
                 # Lógica de movimiento según ojos
@@ -350,17 +575,20 @@ class Game:
                     self.walls.start_moving()
                 else:
                     # Ojos cerrados: velocidad MÍNIMA (muy lenta)
-                    self.walls.set_speed(0.5)  # WALL_SPEED_MINIMAL
+                    self.walls.set_speed(WALL_SPEED_EYES_CLOSED)
                     self.walls.start_moving()
             
             self.walls.update()
             
-            # Verificar colisión
+            # Verificar colisión: candidatos del barrido por intervalos y prueba exacta en este frame
             if self.walls.check_collision(self.player):
-                self.game_state = "GAME_OVER"
-            
-            # Actualizar nivel de peligro del jugador
-            self.player.update_danger_level(self.walls.get_walls())
+                self.log_level("GAME_OVER")
+                self.end_game("GAME_OVER")
+                # Dejar al jugador pegado a la pared que lo alcanzó
+                self.player.update_danger_level(self.walls.get_rects())
+            else:
+                # Actualizar nivel de peligro del jugador
+                self.player.danger_level = self.walls.danger_level()
             
             # Actualizar color manager segun peligro
             self.color_manager.set_danger_level(self.player.danger_level)
@@ -371,7 +599,7 @@ class Game:
         
         
         # Actualizar animación del jugador
-        is_typing = len(self.phrase_manager.get_user_input()) > 0
+        is_typing = self.phrase_manager.input_length > 0
         self.player.update_animation(self.game_state, is_typing)
         # Actualizar sistemas visuales
         self.particle_system.update()
@@ -413,12 +641,13 @@ class Game:
         self.ui.draw_webcam_feed(frame)
         
         # HUD
-        if self.game_state in ["PLAYING", "MEMORIZING"]:
+        if self.game_state in ["PLAYING", "MEMORIZING", "PAUSED"]:
             self.ui.draw_hud(
                 self.level_manager.get_level_number(),
                 self.score_manager.total_score,
                 self.score_manager.combo,
-                self.score_manager.calculate_wpm()
+                self.score_manager.get_live_wpm(),
+                self.walls.seconds_until_impact() if self.game_state == "PLAYING" else None
             )
         
         if self.game_state == "MENU":
@@ -439,11 +668,15 @@ class Game:
             # Indicador de peligro
             self.ui.draw_danger_indicator(self.player.danger_level)
         
+        elif self.game_state == "PAUSED":
+            self.ui.draw_paused()
+        
         elif self.game_state == "LEVEL_COMPLETE":
             score_breakdown = self.score_manager.get_score_breakdown()
             self.ui.draw_level_complete(
                 self.level_manager.get_level_number(),
-                score_breakdown
+                score_breakdown,
+                self.level_percentile
             )
         
         elif self.game_state == "GAME_OVER":
@@ -459,17 +692,48 @@ class Game:
         Bucle principal del juego
         """
         while self.running:
-            self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+            self.run_frame()
         
         # Limpieza
-        self.camera.release()
-        pygame.quit()
-        sys.exit()
+        self.quit_game()
+    
+    def run_frame(self):
+        """
+        Un frame del bucle síncrono: lógica, dibujo y espera con clock.tick
+        """
+        if self.is_idle():
+            # Reposo: redibujar solo con eventos o cada IDLE_REDRAW_MS
+            self.step(self.wait_for_events())
+            self.draw()
+        else:
+            self.step(pygame.event.get())
+            self.draw()
+            self.clock.tick(self.fps)
 
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="No Mires - Typing Game")
+    parser.add_argument('--record', metavar='ARCHIVO',
+                        help="graba la sesión (reproducir con: python session_recorder.py ARCHIVO)")
+    parser.add_argument('--endless', action='store_true', help="modo infinito")
+    parser.add_argument('--async', dest='async_loop', action='store_true',
+                        help="bucle asyncio: cámara en un executor y ritmo con timers del loop")
+    parser.add_argument('--spectate', metavar='[HOST:]PUERTO', type=parse_spectator_address, nargs='?',
+                        const=(SPECTATOR_HOST, SPECTATOR_PORT),
+                        help="publica la partida a espectadores (python spectator.py view); "
+                             f"por defecto solo en {SPECTATOR_HOST}")
+    parser.add_argument('--inference-server', metavar='HOST:PUERTO', default=INFERENCE_SERVER,
+                        help="FaceMesh en el servidor compartido (python inference_server.py serve)")
+    args = parser.parse_args()
+    
+    game = Game(endless=args.endless, inference_server=args.inference_server)
+    if args.record:
+        SessionRecorder(args.record).start(game)
+    if args.spectate:
+        host, port = args.spectate
+        game.spectator = SpectatorServer(host, port)
+    if args.async_loop:
+        AsyncRunner(game).run()
+    else:
+        game.run()
\ No newline at end of file
@@ -0,0 +1,474 @@
+import math
+import random
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from config import (
+    WINDOW_WIDTH, WALL_WIDTH, WALL_HEIGHT, GROUND_Y,
+    WALL_START_LEFT, WALL_START_RIGHT, PLAYER_START_X, PLAYER_SIZE,
+    PARTICLE_COUNT, REFERENCE_FPS
+)
+from effects import draw_glow_rect
+
+# Distancia a partir de la cual un obstáculo deja de ser peligroso
+DANGER_DISTANCE = WINDOW_WIDTH // 4
+# Recorrido (píxeles) con el que se elige la recta que sigue justo después de un quiebre
+DANGER_PROBE = 1e-6
+
+# Configuraciones de obstáculos. dx/dy: píxeles que avanza el obstáculo por
+# píxel de velocidad de pared (1 = a la velocidad del nivel)
+OBSTACLE_LAYOUTS = {
+    # El juego clásico: dos paredes que se cierran sobre el jugador
+    'two_walls': [
+        {'x': WALL_START_LEFT, 'y': GROUND_Y - WALL_HEIGHT, 'width': WALL_WIDTH, 'height': WALL_HEIGHT, 'dx': 1.0, 'dy': 0.0},
+        {'x': WALL_START_RIGHT, 'y': GROUND_Y - WALL_HEIGHT, 'width': WALL_WIDTH, 'height': WALL_HEIGHT, 'dx': -1.0, 'dy': 0.0},
+    ],
+    # Dos pares: uno bajo y más rápido entra desde fuera de la pantalla
+    'double_pair': [
+        {'x': WALL_START_LEFT, 'y': GROUND_Y - WALL_HEIGHT, 'width': WALL_WIDTH, 'height': WALL_HEIGHT, 'dx': 1.0, 'dy': 0.0},
+        {'x': WALL_START_RIGHT, 'y': GROUND_Y - WALL_HEIGHT, 'width': WALL_WIDTH, 'height': WALL_HEIGHT, 'dx': -1.0, 'dy': 0.0},
+        {'x': -300, 'y': GROUND_Y - 150, 'width': WALL_WIDTH, 'height': 150, 'dx': 1.4, 'dy': 0.0},
+        {'x': WINDOW_WIDTH + 270, 'y': GROUND_Y - 150, 'width': WALL_WIDTH, 'height': 150, 'dx': -1.4, 'dy': 0.0},
+    ],
+    # Paredes más una prensa que baja sobre el jugador
+    'crusher': [
+        {'x': WALL_START_LEFT, 'y': GROUND_Y - WALL_HEIGHT, 'width': WALL_WIDTH, 'height': WALL_HEIGHT, 'dx': 0.8, 'dy': 0.0},
+        {'x': WALL_START_RIGHT, 'y': GROUND_Y - WALL_HEIGHT, 'width': WALL_WIDTH, 'height': WALL_HEIGHT, 'dx': -0.8, 'dy': 0.0},
+        {'x': PLAYER_START_X - 40, 'y': -200, 'width': PLAYER_SIZE + 80, 'height': 200, 'dx': 0.0, 'dy': 1.0},
+    ],
+}
+
+
+def travel_intervals(origin, size, direction, box):
+    """
+    Para cada obstáculo, el intervalo del recorrido [entrada, salida] en que su
+    caja se superpone con box (left, top, right, bottom). Vectorizado por eje:
+    la posición es origin + recorrido * direction, así que cada eje da un intervalo
+
+    Returns:
+        (entrada, salida) arrays; vacío si entrada >= salida
+    """
+    count = len(origin)
+    start = np.full(count, -np.inf)
+    end = np.full(count, np.inf)
+    for axis in (0, 1):
+        # Superposición: origin + t·d + size > box_min  y  origin + t·d < box_max
+        low = box[axis] - (origin[:, axis] + size[:, axis])
+        high = box[axis + 2] - origin[:, axis]
+        d = direction[:, axis]
+        static_overlap = (low < 0) & (high > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t1 = low / d
+            t2 = high / d
+        moving = d != 0
+        enter = np.where(moving, np.minimum(t1, t2), np.where(static_overlap, -np.inf, np.inf))
+        leave = np.where(moving, np.maximum(t1, t2), np.where(static_overlap, np.inf, -np.inf))
+        start = np.maximum(start, enter)
+        end = np.minimum(end, leave)
+    return start, end
+
+
+class IntervalSweep:
+    def __init__(self, start, end):
+        """
+        Barrido sobre intervalos ordenados por entrada. Como el recorrido solo
+        crece, advance() mueve un puntero: O(1) amortizado por frame sin
+        importar cuántos obstáculos haya
+        """
+        valid = np.flatnonzero((start < end) & (end >= 0))
+        order = valid[np.argsort(start[valid], kind='stable')]
+        self.starts = start[order].tolist()
+        self.ends = end[order].tolist()
+        self.ids = order.tolist()
+        self.next = 0
+        self.active = []  # índices (en orden de entrada) de los intervalos abiertos
+
+    def advance(self, t):
+        """
+        Retorna los obstáculos cuyo intervalo contiene t
+        """
+        starts = self.starts
+        while self.next < len(starts) and starts[self.next] <= t:
+            self.active.append(self.next)
+            self.next += 1
+        if not self.active:
+            return []
+        ends = self.ends
+        if any(ends[k] < t for k in self.active):
+            self.active = [k for k in self.active if ends[k] >= t]
+        return [self.ids[k] for k in self.active]
+
+    def next_start(self):
+        return self.starts[self.next] if self.next < len(self.starts) else math.inf
+
+
+class ObstacleManager:
+    def __init__(self, layout, particle_count=PARTICLE_COUNT, speed_scale=1.0):
+        """
+        Obstáculos en arrays contiguos. Todos avanzan con la velocidad de pared
+        (ojos, errores, parada), así que la posición de cada uno es
+        origen + recorrido · dirección, con un único recorrido acumulado.
+        El choque y la cercanía se resuelven como intervalos de recorrido
+        (fase amplia, un barrido) y solo los candidatos se prueban contra los
+        píxeles del jugador
+
+        layout: lista de obstáculos (ver OBSTACLE_LAYOUTS)
+        speed_scale: factor para mantener la velocidad real si el juego no corre a REFERENCE_FPS
+        """
+        self.origin = np.array([(o['x'], o['y']) for o in layout], dtype=np.float64).reshape(-1, 2)
+        self.size = np.array([(o['width'], o['height']) for o in layout], dtype=np.float64).reshape(-1, 2)
+        self.direction = np.array([(o['dx'], o['dy']) for o in layout], dtype=np.float64).reshape(-1, 2)
+        self.particle_count = particle_count
+        self.particle_timer = 0
+        self.speed_scale = speed_scale
+        self.moving = False
+        self.current_speed = 0
+        self.travel = 0.0  # píxeles recorridos a velocidad 1
+        self.player = None
+        self.player_box = None  # caja con los píxeles de todos los frames del jugador
+        self.collision_sweep = None
+        self.danger_sweep = None
+        # Separación con el jugador: por obstáculo, el máximo de 4 rectas en el
+        # recorrido (a + b·t); la distancia mínima es la envolvente inferior
+        self.danger_a = None
+        self.danger_b = None
+        self.danger_segment = None  # (desde, valor, pendiente, hasta) del tramo actual
+
+    def __len__(self):
+        return len(self.origin)
+
+    def track(self, player):
+        """
+        Jugador contra el que se calculan choque y peligro (recalcular si se mueve)
+        """
+        self.player = player
+        self._build_sweeps()
+
+    def _build_sweeps(self):
+        if self.player is None:
+            return
+        rect = self.player_box = self.player.hitbox_bounds()
+        # 1 píxel de margen: el Rect usa el píxel entero por debajo de la posición real
+        box = (rect.left - 1, rect.top - 1, rect.right + 1, rect.bottom + 1)
+        self.collision_sweep = IntervalSweep(*travel_intervals(self.origin, self.size, self.direction, box))
+        box = (rect.left - DANGER_DISTANCE, rect.top - DANGER_DISTANCE,
+               rect.right + DANGER_DISTANCE, rect.bottom + DANGER_DISTANCE)
+        self.danger_sweep = IntervalSweep(*travel_intervals(self.origin, self.size, self.direction, box))
+        # Por eje: caja del jugador antes del obstáculo (baja) o después (sube)
+        ox, oy = self.origin[:, 0], self.origin[:, 1]
+        w, h = self.size[:, 0], self.size[:, 1]
+        dx, dy = self.direction[:, 0], self.direction[:, 1]
+        self.danger_a = np.column_stack((rect.left - ox - w, ox - rect.right, rect.top - oy - h, oy - rect.bottom))
+        self.danger_b = np.column_stack((-dx, dx, -dy, dy))
+        self.danger_segment = None
+
+    def set_speed(self, speed):
+        """
+        Establece la velocidad de todos los obstáculos
+        """
+        self.current_speed = speed
+
+    def increase_speed(self, amount):
+        """
+        Aumenta la velocidad actual
+        """
+        self.current_speed += amount
+
+    def start_moving(self):
+        """
+        Inicia el movimiento de los obstáculos
+        """
+        self.moving = True
+
+    def stop_moving(self):
+        """
+        Detiene el movimiento de los obstáculos
+        """
+        self.moving = False
+
+    def update(self):
+        """
+        Avanza el recorrido (las posiciones se calculan al dibujar)
+        """
+        if self.moving:
+            self.travel += self.current_speed * self.speed_scale
+
+    def positions(self):
+        """
+        Posición (x, y) de todos los obstáculos: una operación vectorizada
+        """
+        return self.origin + self.travel * self.direction
+
+    def obstacle_rect(self, index):
+        x = self.origin[index, 0] + self.travel * self.direction[index, 0]
+        y = self.origin[index, 1] + self.travel * self.direction[index, 1]
+        return pygame.Rect(math.floor(x), math.floor(y), int(self.size[index, 0]), int(self.size[index, 1]))
+
+    def get_rects(self):
+        """
+        Rects de todos los obstáculos en su posición actual
+        """
+        corners = np.floor(self.positions()).astype(np.int64)
+        sizes = self.size.astype(np.int64)
+        return [pygame.Rect(x, y, w, h) for (x, y), (w, h) in zip(corners.tolist(), sizes.tolist())]
+
+    def check_collision(self, player):
+        """
+        Verifica si algún obstáculo colisiona con el jugador: solo se prueban los
+        candidatos cuyo intervalo de recorrido contiene el recorrido actual,
+        primero contra la caja del frame y después contra su máscara
+        """
+        if player is not self.player:
+            self.track(player)
+        for index in self.collision_sweep.advance(self.travel):
+            if player.overlaps_rect(self.obstacle_rect(index)):
+                return True
+        return False
+
+    def _danger_segment(self, t):
+        """
+        Tramo recto de la distancia mínima a partir del recorrido t. La
+        separación de cada obstáculo es el máximo de sus rectas y la distancia
+        el mínimo entre obstáculos (y DANGER_DISTANCE), así que es lineal
+        hasta el próximo quiebre o hasta que entre otro candidato
+
+        Returns:
+            (valor, pendiente, recorrido hasta el que vale)
+        """
+        candidates = self.danger_sweep.advance(t)
+        until = self.danger_sweep.next_start()
+        a = self.danger_a[candidates]
+        b = self.danger_b[candidates]
+        values = a + b * t
+        rows = np.arange(len(candidates))
+        # Recta vigente de cada obstáculo: la mayor justo después de t
+        piece = np.argmax(values + b * DANGER_PROBE, axis=1)
+        value = np.append(values[rows, piece], DANGER_DISTANCE)
+        slope = np.append(b[rows, piece], 0.0)
+        # Otra recta del mismo obstáculo la supera
+        rising = b[:len(rows)] - slope[:len(rows), None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            breaks = np.where(rising > 0, (value[:len(rows), None] - values) / rising, np.inf)
+        # Otro obstáculo pasa a ser el más cercano
+        nearest = int(np.argmin(value + slope * DANGER_PROBE))
+        closing = slope[nearest] - slope
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossings = np.where(closing > 0, (value - value[nearest]) / closing, np.inf)
+        deltas = np.concatenate((breaks.ravel(), crossings))
+        deltas = deltas[deltas > DANGER_PROBE]
+        if len(deltas):
+            until = min(until, t + float(deltas.min()))
+        return float(value[nearest]), float(slope[nearest]), until
+
+    def danger_level(self):
+        """
+        Nivel de peligro (0.0 = seguro, 1.0 = muy peligroso) según el obstáculo
+        más cercano: evalúa la recta del tramo actual y solo la recalcula al
+        pasar un quiebre
+        """
+        if self.player is None:
+            return 0.0
+        t = self.travel
+        segment = self.danger_segment
+        if segment is None or not segment[0] <= t < segment[3]:
+            segment = self.danger_segment = (t,) + self._danger_segment(t)
+        start, value, slope, _ = segment
+        min_dist = value + slope * (t - start)
+        if min_dist <= 0:
+            return 1.0
+        return max(0.0, 1.0 - min_dist / DANGER_DISTANCE)
+
+    def seconds_until_impact(self):
+        """
+        Segundos hasta el próximo choque si la velocidad no cambia (None si no hay)
+        """
+        if not self.moving or self.current_speed <= 0 or self.collision_sweep is None:
+            return None
+        self.collision_sweep.advance(self.travel)
+        if self.collision_sweep.active:
+            return 0.0
+        remaining = self.collision_sweep.next_start() - self.travel
+        if remaining == math.inf:
+            return None
+        return max(0.0, remaining) / (self.current_speed * REFERENCE_FPS)
+
+    def draw(self, screen, color, particle_system=None):
+        """
+        Dibuja los obstáculos visibles con efecto de brillo y partículas en el frente de avance
+        """
+        screen_rect = screen.get_rect()
+        emit = particle_system is not None and self.current_speed > 0
+        if emit:
+            self.particle_timer += 1
+            emit = self.particle_timer >= 3  # Emitir cada 3 frames
+            if emit:
+                self.particle_timer = 0
+
+        for index, rect in enumerate(self.get_rects()):
+            if not rect.colliderect(screen_rect):
+                continue
+            draw_glow_rect(screen, color, rect, glow_size=5)
+            if emit:
+                self._emit_particles(particle_system, index, rect, color)
+
+    def _emit_particles(self, particle_system, index, rect, color):
+        dx, dy = self.direction[index]
+        if abs(dx) >= abs(dy):
+            direction = 'right' if dx > 0 else 'left'
+            edge = rect.right if dx > 0 else rect.left
+            # Emitir partículas a lo largo de la altura
+            for i in range(self.particle_count):
+                particle_system.emit(edge, rect.top + rect.height * i // self.particle_count,
+                                     color, count=2, direction=direction)
+        else:
+            direction = 'down' if dy > 0 else 'up'
+            edge = rect.bottom if dy > 0 else rect.top
+            for i in range(self.particle_count):
+                particle_system.emit(rect.left + rect.width * i // self.particle_count, edge,
+                                     color, count=2, direction=direction)
+
+    def reset(self):
+        """
+        Reinicia los obstáculos a su posición inicial
+        """
+        self.moving = False
+        self.current_speed = 0
+        self.travel = 0.0
+        self.particle_timer = 0
+        self._build_sweeps()
+
+
+def random_layout(count, rng, span=None):
+    """
+    Obstáculos al azar alrededor del jugador (para el benchmark). Sin span el
+    mundo crece con la cantidad y la densidad cerca del jugador se mantiene;
+    con span fijo hay más candidatos cuantos más obstáculos
+    """
+    if span is None:
+        span = count * 40
+    layout = []
+    for _ in range(count):
+        horizontal = rng.random() < 0.7
+        layout.append({
+            'x': rng.uniform(-span, WINDOW_WIDTH + span) if horizontal else rng.uniform(0, WINDOW_WIDTH),
+            'y': rng.uniform(0, GROUND_Y - 50) if horizontal else rng.uniform(-span, -50),
+            'width': rng.randint(20, 120),
+            'height': rng.randint(20, 300),
+            'dx': rng.uniform(-1.5, 1.5) if horizontal else 0.0,
+            'dy': 0.0 if horizontal else rng.uniform(0.2, 1.5),
+        })
+    return layout
+
+
+def benchmark(frames=2000, fixed_span=2000):
+    """
+    Costo por frame (mover + choque + peligro) con barrido vs probar todos los
+    Rect, con densidad constante y con el mundo de tamaño fijo
+    """
+    from player import Player
+    player = Player(load_sprites=False)
+    for title, span in (('densidad constante (el mundo crece)', None),
+                        (f'mundo fijo de {fixed_span} px', fixed_span)):
+        rng = random.Random(0)
+        print(title)
+        print(f"{'obstáculos':>10} {'barrido':>12} {'todos los Rect':>16}")
+        for count in (2, 50, 200, 800):
+            layout = OBSTACLE_LAYOUTS['two_walls'] if count == 2 else random_layout(count, rng, span)
+            obstacles = ObstacleManager(layout, particle_count=0)
+            obstacles.track(player)
+            obstacles.set_speed(0.05)
+            obstacles.start_moving()
+            start = time.perf_counter()
+            for _ in range(frames):
+                obstacles.update()
+                obstacles.check_collision(player)
+                obstacles.danger_level()
+            sweep_us = (time.perf_counter() - start) / frames * 1e6
+
+            obstacles.reset()
+            obstacles.set_speed(0.05)
+            obstacles.start_moving()
+            start = time.perf_counter()
+            for _ in range(frames):
+                obstacles.update()
+                rects = obstacles.get_rects()
+                player.rect.collidelist(rects)
+                min(max(player.rect.left - r.right, r.left - player.rect.right) for r in rects)
+            naive_us = (time.perf_counter() - start) / frames * 1e6
+            print(f"{count:>10} {sweep_us:>10.1f}µs {naive_us:>14.1f}µs")
+
+
+def benchmark_masks(checks=200000, runs=50):
+    """
+    Costo de la prueba de choque contra un obstáculo: Rect del cuadrado
+    completo (antes) vs caja ajustada + máscara del frame (ahora)
+    """
+    from player import Player
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    player = Player()
+    player.current_animation = 'walk'
+    player.sync_body()
+    body = player.collision_rect()
+    cases = {
+        'lejos (caso común)': pygame.Rect(body.left - 200, body.top, WALL_WIDTH, WALL_HEIGHT),
+        'toca el cuadrado, no el sprite': pygame.Rect(player.rect.left - WALL_WIDTH + 5, body.top, WALL_WIDTH, WALL_HEIGHT),
+        'toca la caja del frame': pygame.Rect(body.left - WALL_WIDTH + 3, body.top - 100, WALL_WIDTH, WALL_HEIGHT),
+    }
+    print(f"{'caso':>32} {'cuadrado':>10} {'máscara':>10}  choque")
+    for name, rect in cases.items():
+        start = time.perf_counter()
+        for _ in range(checks):
+            rect.colliderect(player.rect)
+        square_ns = (time.perf_counter() - start) / checks * 1e9
+        start = time.perf_counter()
+        for _ in range(checks):
+            hit = player.overlaps_rect(rect)
+        mask_ns = (time.perf_counter() - start) / checks * 1e9
+        print(f"{name:>32} {square_ns:>8.0f}ns {mask_ns:>8.0f}ns  {'sí' if hit else 'no'}")
+
+    # Por frame en un nivel de dos paredes: la fase amplia solo deja pasar
+    # candidatos en los últimos frames, así que el caso común no cambia
+    square = Player()
+    for anim_name, masks in square.masks.items():
+        square.masks[anim_name] = [pygame.mask.Mask((square.size, square.size), fill=True)] * len(masks)
+        square.bounds[anim_name] = [pygame.Rect(0, 0, square.size, square.size)] * len(masks)
+    square.hitbox = pygame.Rect(0, 0, square.size, square.size)
+    square.sync_body()
+    print(f"\n{'jugador':>10} {'frames':>8} {'sin candidatos':>15} {'con candidatos':>15} {'por frame':>10}")
+    for name, subject in (('cuadrado', square), ('máscara', player)):
+        elapsed = [0.0, 0.0]  # segundos en frames sin / con candidatos
+        counts = [0, 0]
+        for _ in range(runs):
+            subject.reset()
+            obstacles = ObstacleManager(OBSTACLE_LAYOUTS['two_walls'], particle_count=0)
+            obstacles.track(subject)
+            obstacles.set_speed(2)
+            obstacles.start_moving()
+            while True:
+                obstacles.update()
+                start = time.perf_counter()
+                hit = obstacles.check_collision(subject)
+                spent = time.perf_counter() - start
+                candidates = bool(obstacles.collision_sweep.active)
+                elapsed[candidates] += spent
+                counts[candidates] += 1
+                if hit:
+                    break
+                subject.update_animation("PLAYING", True)
+        frames = sum(counts)
+        print(f"{name:>10} {frames // runs:>8} {elapsed[0] / max(1, counts[0]) * 1e6:>13.2f}µs "
+              f"{elapsed[1] / max(1, counts[1]) * 1e6:>13.2f}µs {sum(elapsed) / frames * 1e6:>8.2f}µs")
+
+
+if __name__ == "__main__":
+    # python obstacles.py bench
+    if len(sys.argv) != 2 or sys.argv[1] != 'bench':
+        print("Uso: python obstacles.py bench")
+        sys.exit(1)
+    benchmark()
+    print()
+    benchmark_masks()
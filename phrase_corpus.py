@@ -0,0 +1,222 @@
+import mmap
+import os
+import random
+import struct
+import sys
+
+import numpy as np
+
+from config import PHRASES_BY_DIFFICULTY, PHRASE_CORPUS_PATH
+
+# Formato del archivo de corpus (little-endian):
+#   cabecera: magic 'NMPC', versión u16, número de dificultades u16, total de frases u32
+#   tabla de dificultades: nombre (16 bytes ASCII), primera frase u32, cantidad u32
+#   offsets: (total + 1) u64, posición de cada frase dentro del bloque de texto
+#   texto: frases en UTF-8 concatenadas, agrupadas por dificultad
+CORPUS_MAGIC = b'NMPC'
+CORPUS_VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+DIFFICULTY_ENTRY = struct.Struct('<16sII')
+
+
+class MemoryCorpus:
+    def __init__(self, phrases_by_difficulty):
+        """
+        Corpus en memoria (las listas de config.py son el corpus por defecto)
+        """
+        self.phrases = {}
+        self.starts = {}
+        self.all_phrases = []
+        for difficulty, phrases in phrases_by_difficulty.items():
+            self.phrases[difficulty] = list(phrases)
+            self.starts[difficulty] = len(self.all_phrases)
+            self.all_phrases.extend(phrases)
+        self.total = len(self.all_phrases)
+
+    def difficulties(self):
+        return list(self.phrases)
+
+    def count(self, difficulty):
+        return len(self.phrases.get(difficulty, ()))
+
+    def get(self, difficulty, index):
+        return self.phrases[difficulty][index]
+
+    def phrase_id(self, difficulty, index):
+        """
+        Identificador global de la frase (posición en el corpus)
+        """
+        return self.starts[difficulty] + index
+
+    def get_by_id(self, phrase_id):
+        return self.all_phrases[phrase_id]
+
+    def iter_phrases(self):
+        """
+        Recorre todas las frases en orden de identificador
+        """
+        return iter(self.all_phrases)
+
+
+class MappedCorpus:
+    def __init__(self, path):
+        """
+        Corpus en disco abierto con mmap: abrirlo solo lee la cabecera y la tabla,
+        sin importar cuántas frases tenga
+        """
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, difficulty_count, self.total = HEADER.unpack_from(self.map, 0)
+        if magic != CORPUS_MAGIC or version != CORPUS_VERSION:
+            raise ValueError(f"{path} no es un corpus válido (versión {CORPUS_VERSION})")
+
+        self.ranges = {}
+        position = HEADER.size
+        for _ in range(difficulty_count):
+            name, start, count = DIFFICULTY_ENTRY.unpack_from(self.map, position)
+            self.ranges[name.rstrip(b'\0').decode('ascii')] = (start, count)
+            position += DIFFICULTY_ENTRY.size
+
+        # Vista directa sobre el archivo mapeado (sin copiar)
+        self.offsets = np.frombuffer(self.map, dtype='<u8', count=self.total + 1, offset=position)
+        self.text_start = position + self.offsets.nbytes
+
+    def difficulties(self):
+        return list(self.ranges)
+
+    def count(self, difficulty):
+        return self.ranges.get(difficulty, (0, 0))[1]
+
+    def phrase_id(self, difficulty, index):
+        return self.ranges[difficulty][0] + index
+
+    def get_by_id(self, phrase_id):
+        start = self.text_start + int(self.offsets[phrase_id])
+        end = self.text_start + int(self.offsets[phrase_id + 1])
+        return self.map[start:end].decode('utf-8')
+
+    def get(self, difficulty, index):
+        return self.get_by_id(self.phrase_id(difficulty, index))
+
+    def iter_phrases(self):
+        for phrase_id in range(self.total):
+            yield self.get_by_id(phrase_id)
+
+    def close(self):
+        self.offsets = None
+        self.map.close()
+        self.file.close()
+
+
+class LazyPermutation:
+    def __init__(self, size, rng=random):
+        """
+        Permutación aleatoria de range(size) generada bajo demanda (Fisher-Yates
+        disperso): cada extracción es O(1) y solo guarda las posiciones tocadas
+        """
+        self.size = size
+        self.rng = rng
+        self.reset()
+
+    def reset(self):
+        self.remaining = self.size
+        self.swaps = {}
+
+    def draw(self):
+        """
+        Retorna el siguiente índice sin repetir; al agotarse empieza otra vuelta
+        """
+        if self.size == 0:
+            raise IndexError("No hay frases para esta dificultad")
+        if self.remaining == 0:
+            self.reset()
+
+        j = self.rng.randrange(self.remaining)
+        last = self.remaining - 1
+        value = self.swaps.get(j, j)
+        # Mover el último elemento no extraído a la posición j
+        self.swaps[j] = self.swaps.pop(last, last)
+        if j == last:
+            self.swaps.pop(j, None)
+        self.remaining -= 1
+        return value
+
+
+def build_corpus(path, phrases_by_difficulty):
+    """
+    Escribe un archivo de corpus a partir de {dificultad: [frases]}
+    """
+    names = list(phrases_by_difficulty)
+    encoded = [[phrase.encode('utf-8') for phrase in phrases_by_difficulty[name]] for name in names]
+    total = sum(len(group) for group in encoded)
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(CORPUS_MAGIC, CORPUS_VERSION, len(names), total))
+
+        start = 0
+        for name, group in zip(names, encoded):
+            f.write(DIFFICULTY_ENTRY.pack(name.encode('ascii')[:16], start, len(group)))
+            start += len(group)
+
+        lengths = np.fromiter((len(p) for group in encoded for p in group), dtype='<u8', count=total)
+        offsets = np.zeros(total + 1, dtype='<u8')
+        np.cumsum(lengths, out=offsets[1:])
+        f.write(offsets.tobytes())
+
+        for group in encoded:
+            f.write(b''.join(group))
+
+
+def read_tsv(path):
+    """
+    Lee un archivo de texto con líneas 'dificultad<TAB>frase'
+    """
+    phrases_by_difficulty = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line or '\t' not in line:
+                continue
+            difficulty, phrase = line.split('\t', 1)
+            phrases_by_difficulty.setdefault(difficulty, []).append(phrase)
+    return phrases_by_difficulty
+
+
+def load_default_corpus():
+    """
+    Abre PHRASE_CORPUS_PATH si existe; si no, usa las frases de config.py
+    """
+    if PHRASE_CORPUS_PATH and os.path.exists(PHRASE_CORPUS_PATH):
+        try:
+            corpus = MappedCorpus(PHRASE_CORPUS_PATH)
+            print(f"[OK] Corpus '{PHRASE_CORPUS_PATH}' con {corpus.total} frases")
+            return corpus
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] No se pudo abrir el corpus: {e}")
+    return MemoryCorpus(PHRASES_BY_DIFFICULTY)
+
+
+if __name__ == "__main__":
+    usage = (
+        "Uso:\n"
+        "  python phrase_corpus.py build frases.tsv [salida]   (líneas 'dificultad<TAB>frase')\n"
+        "  python phrase_corpus.py build --builtin [salida]    (frases de config.py)\n"
+        "  python phrase_corpus.py info [corpus]"
+    )
+    if len(sys.argv) < 2 or sys.argv[1] not in ('build', 'info') or (sys.argv[1] == 'build' and len(sys.argv) < 3):
+        print(usage)
+        sys.exit(1)
+
+    if sys.argv[1] == 'build':
+        source = sys.argv[2]
+        output = sys.argv[3] if len(sys.argv) > 3 else PHRASE_CORPUS_PATH
+        phrases = PHRASES_BY_DIFFICULTY if source == '--builtin' else read_tsv(source)
+        build_corpus(output, phrases)
+        print(f"[OK] Corpus escrito en {output}")
+    else:
+        corpus = MappedCorpus(sys.argv[2] if len(sys.argv) > 2 else PHRASE_CORPUS_PATH)
+        for difficulty in corpus.difficulties():
+            print(f"{difficulty}: {corpus.count(difficulty)} frases")
+        corpus.close()
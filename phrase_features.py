@@ -0,0 +1,311 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+from config import PHRASE_DIFFICULTY_SPREAD, PHRASE_SAMPLE_BINS
+from phrase_corpus import LazyPermutation
+
+# Peso de cada rasgo (estandarizado) en la dificultad compuesta
+FEATURE_WEIGHTS = {
+    'length': 0.35,
+    'word_count': 0.05,
+    'accented': 0.15,
+    'uppercase': 0.10,
+    'rare_bigram': 0.20,
+    'same_hand': 0.15,  # 1 - alternancia de manos
+}
+
+# Mano con la que se escribe cada letra (teclado QWERTY español): 0 izquierda, 1 derecha
+LEFT_HAND = "qwertasdfgzxcvbáé"
+RIGHT_HAND = "yuiophjklñnmíóúü"
+
+FEATURES_VERSION = 2  # 2: orden por dificultad dentro de cada etiqueta
+
+
+def _hand_table():
+    table = np.full(256, -1, dtype=np.int8)
+    for char in LEFT_HAND:
+        table[ord(char)] = 0
+    for char in RIGHT_HAND:
+        table[ord(char)] = 1
+    return table
+
+
+HAND_TABLE = _hand_table()
+
+
+def _fold_case(codes):
+    """
+    Pasa a minúscula las letras ASCII y Latin-1 y agrupa el resto en 255
+    """
+    folded = np.minimum(codes, 255).astype(np.int64)
+    upper = _uppercase_mask(folded)
+    folded[upper] += 32
+    return folded
+
+
+def _uppercase_mask(codes):
+    return ((codes >= 65) & (codes <= 90)) | ((codes >= 0xC0) & (codes <= 0xDE) & (codes != 0xD7))
+
+
+def corpus_codepoints(corpus):
+    """
+    Retorna (códigos, offsets) de todo el corpus: un array de codepoints
+    y la posición (en caracteres) donde empieza cada frase
+    """
+    if hasattr(corpus, 'map'):
+        # Corpus mapeado: decodificar el bloque UTF-8 completo de una vez
+        blob = np.frombuffer(corpus.map, dtype=np.uint8, offset=corpus.text_start)
+        text = blob.tobytes().decode('utf-8')
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+        # Offsets en bytes -> offsets en caracteres (bytes que inician un carácter)
+        char_starts = np.zeros(len(blob) + 1, dtype=np.int64)
+        np.cumsum((blob & 0xC0) != 0x80, out=char_starts[1:])
+        offsets = char_starts[corpus.offsets.astype(np.int64)]
+        return codes, offsets
+
+    phrases = list(corpus.iter_phrases())
+    lengths = np.fromiter((len(p) for p in phrases), dtype=np.int64, count=len(phrases))
+    offsets = np.zeros(len(phrases) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    codes = np.frombuffer(''.join(phrases).encode('utf-32-le'), dtype='<u4')
+    return codes, offsets
+
+
+def compute_features(codes, offsets):
+    """
+    Calcula la tabla de rasgos de todas las frases en una pasada vectorizada
+    """
+    count = len(offsets) - 1
+    lengths = np.diff(offsets)
+    phrase_of = np.repeat(np.arange(count), lengths)
+    codes = codes.astype(np.int64)
+
+    def per_phrase(mask):
+        return np.bincount(phrase_of, weights=mask, minlength=count)
+
+    is_space = codes == 32
+    starts_phrase = np.zeros(len(codes), dtype=bool)
+    starts_phrase[offsets[:-1][lengths > 0]] = True
+    prev_space = np.empty(len(codes), dtype=bool)
+    prev_space[0:1] = True
+    prev_space[1:] = is_space[:-1]
+    word_start = ~is_space & (prev_space | starts_phrase)
+
+    features = {
+        'length': lengths.astype(np.float32),
+        'word_count': per_phrase(word_start).astype(np.float32),
+        'accented': per_phrase(codes >= 128).astype(np.float32),
+        'uppercase': per_phrase(_uppercase_mask(codes)).astype(np.float32),
+    }
+
+    # Pares de caracteres consecutivos dentro de la misma frase
+    same_phrase = np.ones(max(len(codes) - 1, 0), dtype=bool)
+    boundaries = offsets[1:-1] - 1
+    same_phrase[boundaries[(boundaries >= 0) & (boundaries < len(same_phrase))]] = False
+    folded = _fold_case(codes)
+    pair_phrase = phrase_of[:-1][same_phrase]
+    pair_count = np.bincount(pair_phrase, minlength=count)
+
+    # Bigramas raros: -log(frecuencia) del bigrama en todo el corpus, promedio por frase
+    bigrams = folded[:-1][same_phrase] * 256 + folded[1:][same_phrase]
+    frequency = np.bincount(bigrams, minlength=256 * 256).astype(np.float64)
+    rarity = -np.log(frequency / max(1.0, frequency.sum()) + 1e-12)
+    rare_sum = np.bincount(pair_phrase, weights=rarity[bigrams], minlength=count)
+    features['rare_bigram'] = (rare_sum / np.maximum(pair_count, 1)).astype(np.float32)
+
+    # Alternancia de manos entre letras consecutivas (más alternancia = más fácil)
+    hands = HAND_TABLE[folded]
+    left, right = hands[:-1][same_phrase], hands[1:][same_phrase]
+    known = (left >= 0) & (right >= 0)
+    alternations = np.bincount(pair_phrase[known], weights=left[known] != right[known], minlength=count)
+    known_pairs = np.bincount(pair_phrase[known], minlength=count)
+    features['same_hand'] = (1.0 - alternations / np.maximum(known_pairs, 1)).astype(np.float32)
+
+    return features
+
+
+def difficulty_scores(features):
+    """
+    Combina los rasgos estandarizados y retorna la dificultad como percentil (0-1)
+    """
+    composite = np.zeros(len(features['length']), dtype=np.float64)
+    for name, weight in FEATURE_WEIGHTS.items():
+        values = features[name].astype(np.float64)
+        std = values.std()
+        if std > 0:
+            composite += weight * (values - values.mean()) / std
+
+    order = np.argsort(composite, kind='stable')
+    difficulty = np.empty(len(order), dtype=np.float32)
+    difficulty[order] = np.arange(len(order)) / max(1, len(order) - 1)
+    return difficulty, order.astype(np.int32)
+
+
+def label_orders(corpus, difficulty):
+    """
+    Ids ordenados por dificultad dentro de cada etiqueta: el tramo [start,
+    start + count) de una etiqueta contiene sus propios ids, del más fácil al
+    más difícil (las frases de una etiqueta son contiguas en el corpus)
+    """
+    orders = np.arange(len(difficulty), dtype=np.int32)
+    for label in corpus.difficulties():
+        count = corpus.count(label)
+        if count:
+            start = corpus.phrase_id(label, 0)
+            ranks = difficulty[start:start + count]
+            orders[start:start + count] = start + np.argsort(ranks, kind='stable')
+    return orders
+
+
+class LabelSampler:
+    def __init__(self, order, rng, bins=PHRASE_SAMPLE_BINS):
+        """
+        Sorteo sin reposición dentro de una etiqueta. Sus ids (ordenados por
+        dificultad) se parten en tramos contiguos, cada uno con su permutación
+        perezosa: se elige un tramo pesando las frases que le quedan y se extrae
+        de él en O(1)
+        """
+        self.order = order
+        count = len(order)
+        bins = max(1, min(bins, count))
+        self.edges = np.arange(bins + 1, dtype=np.int64) * count // bins
+        self.sizes = np.diff(self.edges)
+        # Posición (0-1) del centro de cada tramo dentro de la etiqueta
+        self.centers = (self.edges[:-1] + self.edges[1:] - 1) / 2 / max(1, count - 1)
+        self.permutations = [LazyPermutation(int(size), rng) for size in self.sizes]
+        self.rng = rng
+        self.reset()
+
+    def reset(self):
+        self.remaining = self.sizes.copy()
+        for permutation in self.permutations:
+            permutation.reset()
+
+    def draw(self, target, spread):
+        """
+        Id de frase no jugada. target None: uniforme entre las que quedan; si
+        no, núcleo triangular de ancho spread alrededor de target
+        """
+        if not self.remaining.any():
+            self.reset()
+        if target is None:
+            weights = self.remaining
+        else:
+            kernel = np.maximum(0.0, 1.0 - np.abs(self.centers - target) / spread)
+            weights = self.remaining * kernel
+            if not weights.any():
+                # Ventana agotada: el tramo con frases más cercano al objetivo
+                distance = np.where(self.remaining > 0, np.abs(self.centers - target), np.inf)
+                weights = (distance == distance.min()).astype(np.int64)
+        cumulative = np.cumsum(weights)
+        chosen = int(np.searchsorted(cumulative, self.rng.random() * cumulative[-1], side='right'))
+        chosen = min(chosen, len(cumulative) - 1)
+        self.remaining[chosen] -= 1
+        return int(self.order[self.edges[chosen] + self.permutations[chosen].draw()])
+
+
+class PhraseFeatures:
+    def __init__(self, features, difficulty, order, label_order):
+        """
+        Tabla de rasgos por frase (arrays indexados por id de frase) y selección
+        por dificultad numérica
+        """
+        self.features = features
+        self.difficulty = difficulty
+        self.order = order  # ids de frase ordenados por dificultad
+        self.label_sorted = label_order  # ver label_orders()
+        self.samplers = {}  # (primer id, cantidad) -> LabelSampler de la sesión
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        features = compute_features(*corpus_codepoints(corpus))
+        difficulty, order = difficulty_scores(features)
+        return cls(features, difficulty, order, label_orders(corpus, difficulty))
+
+    def save(self, path, key):
+        np.savez(path, key=np.array(key), difficulty=self.difficulty, order=self.order,
+                 label_order=self.label_sorted, **self.features)
+
+    @classmethod
+    def load(cls, path, key):
+        """
+        Carga la tabla guardada; retorna None si no existe o es de otro corpus
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if str(data['key']) != key:
+                    return None
+                features = {name: data[name] for name in FEATURE_WEIGHTS}
+                return cls(features, data['difficulty'], data['order'], data['label_order'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def label_order(self, start, count):
+        """
+        Ids de [start, start + count) ordenados por dificultad (precalculados)
+        """
+        return self.label_sorted[start:start + count]
+
+    def sample(self, start, count, target, rng, spread=PHRASE_DIFFICULTY_SPREAD):
+        """
+        Elige un id de frase de una etiqueta (sus ids son contiguos: [start,
+        start + count)). target (0-1) es la posición dentro de la etiqueta
+        ordenada por dificultad, con un núcleo triangular alrededor; None elige
+        cualquiera. No repite frases de la etiqueta hasta agotarla
+        """
+        if count == 0:
+            raise IndexError("No hay frases para esta dificultad")
+        sampler = self.samplers.get((start, count))
+        if sampler is None:
+            sampler = LabelSampler(self.label_order(start, count), rng)
+            self.samplers[(start, count)] = sampler
+        return sampler.draw(target, spread)
+
+
+def features_path(corpus_path):
+    return corpus_path + '.features.npz'
+
+
+def corpus_key(corpus_path):
+    stat = os.stat(corpus_path)
+    return f"{FEATURES_VERSION}:{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def load_features(corpus):
+    """
+    Retorna la tabla de rasgos del corpus: la guardada junto al archivo de corpus
+    si está al día; si no, la calcula (y la guarda si el corpus es un archivo)
+    """
+    corpus_path = getattr(corpus, 'path', None)
+    if corpus_path is None:
+        return PhraseFeatures.from_corpus(corpus)
+
+    key = corpus_key(corpus_path)
+    table = PhraseFeatures.load(features_path(corpus_path), key)
+    if table is None:
+        start = time.perf_counter()
+        table = PhraseFeatures.from_corpus(corpus)
+        print(f"[OK] Rasgos de {len(table.order)} frases calculados en {time.perf_counter() - start:.2f}s")
+        try:
+            table.save(features_path(corpus_path), key)
+        except OSError as e:
+            print(f"[ERROR] No se pudo guardar la tabla de rasgos: {e}")
+    return table
+
+
+if __name__ == "__main__":
+    # Calcula (o recalcula) la tabla de rasgos de un corpus: python phrase_features.py [corpus]
+    from phrase_corpus import MappedCorpus
+    from config import PHRASE_CORPUS_PATH
+
+    path = sys.argv[1] if len(sys.argv) > 1 else PHRASE_CORPUS_PATH
+    mapped = MappedCorpus(path)
+    if os.path.exists(features_path(path)):
+        os.remove(features_path(path))
+    load_features(mapped)
+    mapped.close()
@@ -1,25 +1,53 @@
 import random
-from config import PHRASES_BY_DIFFICULTY
+from config import ALIGNMENT_MODE, ALIGNMENT_BAND, ALIGNMENT_MAX_DISTANCE
+from alignment import BandedAligner
+from phrase_corpus import load_default_corpus
+from phrase_features import load_features
 
 
 class PhraseManager:
-    def __init__(self):
+    def __init__(self, corpus=None, alignment_mode=ALIGNMENT_MODE):
+        """
+        corpus: Opcional, fuente de frases (por defecto el archivo de corpus
+        si existe o las listas de config.py)
+        alignment_mode: Corrige por distancia de edición en lugar de por posición
+        """
         self.current_phrase = ""
-        self.user_input = ""
+        self.current_phrase_id = -1
         self.difficulty = 'easy'
-        self.phrases_pool = []
+        self.corpus = corpus or load_default_corpus()
+        # Rasgos por frase: orden por dificultad y sorteo sin reposición de cada etiqueta
+        self.features = load_features(self.corpus)
+        self.rng = random.Random()
         self._init_pool()
+        self.prefetched = None  # (dificultad, objetivo, frase, id) elegida por adelantado
+        
+        # Estado incremental del input (O(1) por pulsación)
+        self.chars = []  # caracteres escritos
+        self.correct_flags = bytearray()  # 1 si la posición es correcta
+        self.correct_count = 0
+        self.first_error = -1  # índice del primer error (-1 = ninguno)
+        self.alignment_mode = alignment_mode
+        self.aligner = None  # alineador banded, solo en modo alineación
     
     def _init_pool(self):
-        """Inicializa el pool de frases según la dificultad"""
-        if self.difficulty in PHRASES_BY_DIFFICULTY:
-            self.phrases_pool = PHRASES_BY_DIFFICULTY[self.difficulty].copy()
-        else:
-            self.phrases_pool = PHRASES_BY_DIFFICULTY['easy'].copy()
+        """Sin frases para la dificultad actual se usan las fáciles"""
+        if self.corpus.count(self.difficulty) == 0:
+            self.difficulty = 'easy'
     
+    def seed(self, seed):
+        """
+        Reinicia la selección de frases con una semilla (sesiones reproducibles):
+        misma semilla, misma secuencia de frases
+        """
+        self.rng.seed(seed)
+        self.features.samplers.clear()
+        self.prefetched = None
+        self._init_pool()
+
     def set_difficulty(self, difficulty):
         """
-        Establece la dificultad y reinicia el pool
+        Establece la dificultad (cada dificultad conserva su pool durante la sesión)
         
         Args:
             difficulty: 'easy', 'medium', o 'hard'
@@ -27,43 +55,117 @@ class PhraseManager:
         self.difficulty = difficulty
         self._init_pool()
     
-    def get_random_phrase(self, difficulty=None):
+    def get_random_phrase(self, difficulty=None, target_difficulty=None):
         """
         Selecciona una frase aleatoria del pool
         
         Args:
             difficulty: Opcional, cambia la dificultad antes de seleccionar
+            target_difficulty: Opcional, dificultad numérica (0-1) dentro de la
+                etiqueta; si es None cualquier frase de la etiqueta
+        """
+        prefetched, self.prefetched = self.prefetched, None
+        if prefetched is not None and prefetched[:2] == (difficulty, target_difficulty):
+            # Ya elegida durante la pantalla anterior (mismo orden de sorteos)
+            self.current_phrase, self.current_phrase_id = prefetched[2:]
+        else:
+            self.current_phrase, self.current_phrase_id = self._select(difficulty, target_difficulty)
+        self.reset()
+        return self.current_phrase
+    
+    def _select(self, difficulty, target_difficulty):
+        """
+        Sortea una frase. Retorna (frase, id)
         """
         if difficulty:
             self.set_difficulty(difficulty)
         
-        if not self.phrases_pool:
-            self._init_pool()
-        
-        self.current_phrase = random.choice(self.phrases_pool)
-        self.phrases_pool.remove(self.current_phrase)
-        self.user_input = ""
-        return self.current_phrase
+        # Solo frases de la etiqueta, cerca de target_difficulty y sin repetir
+        phrase_id = self.features.sample(self.corpus.phrase_id(self.difficulty, 0),
+                                         self.corpus.count(self.difficulty),
+                                         target_difficulty, self.rng)
+        return self.corpus.get_by_id(phrase_id), phrase_id
+    
+    def prefetch(self, difficulty=None, target_difficulty=None):
+        """
+        Elige por adelantado la próxima frase sin tocar la actual; la próxima
+        llamada a get_random_phrase con los mismos argumentos la usa
+        """
+        phrase, phrase_id = self._select(difficulty, target_difficulty)
+        self.prefetched = (difficulty, target_difficulty, phrase, phrase_id)
+        return phrase
+    
+    @property
+    def user_input(self):
+        """
+        Input del usuario como string (se construye al pedirlo)
+        """
+        return ''.join(self.chars)
+    
+    @property
+    def input_length(self):
+        """
+        Número de caracteres escritos
+        """
+        return len(self.chars)
+    
+    def get_expected_char(self):
+        """
+        Retorna el siguiente carácter esperado (None si ya se escribió toda la frase)
+        """
+        if self.aligner is not None:
+            return self.aligner.expected_char()
+        index = len(self.chars)
+        if index < len(self.current_phrase):
+            return self.current_phrase[index]
+        return None
     
     def add_character(self, char):
         """
         Añade un carácter al input del usuario
-        """
-        self.user_input += char
+        Retorna True si no es un error: el carácter esperado en esa posición o,
+        en modo alineación, si no aumentó la distancia de edición
+        """
+        if self.aligner is not None:
+            # El feedback visual marca si quedó alineado con el mismo carácter;
+            # la penalización y la puntuación cuentan solo los errores nuevos
+            is_aligned, new_errors = self.aligner.push(char)
+            is_correct = new_errors == 0
+        else:
+            is_correct = is_aligned = char == self.get_expected_char()
+        
+        if is_aligned:
+            self.correct_count += 1
+        elif self.first_error < 0:
+            self.first_error = len(self.chars)
+        
+        self.chars.append(char)
+        self.correct_flags.append(1 if is_aligned else 0)
+        return is_correct
     
     def remove_character(self):
         """
         Elimina el último carácter del input
         """
-        if len(self.user_input) > 0:
-            self.user_input = self.user_input[:-1]
+        if self.chars:
+            if self.aligner is not None:
+                self.aligner.pop()
+            self.chars.pop()
+            if self.correct_flags.pop():
+                self.correct_count -= 1
+            # Solo se borra el último: si era el primer error ya no queda ninguno antes
+            if self.first_error == len(self.chars):
+                self.first_error = -1
     
     def check_phrase(self):
         """
         Verifica si la frase escrita coincide con la frase objetivo
         Retorna True si es correcta
         """
-        return self.user_input == self.current_phrase
+        if self.aligner is not None:
+            return self.aligner.full_distance() <= ALIGNMENT_MAX_DISTANCE
+        phrase_length = len(self.current_phrase)
+        return len(self.chars) == phrase_length and self.correct_count == phrase_length
     
     def get_current_phrase(self):
         """
@@ -77,41 +179,13 @@ class PhraseManager:
         """
         return self.user_input
     
-    def get_character_comparison(self):
-        """
-        Compara carácter por carácter el input del usuario con la frase objetivo
-        Retorna una lista de tuplas (carácter, es_correcto)
-        """
-        comparison = []
-        for i, char in enumerate(self.user_input):
-            if i < len(self.current_phrase):
-                is_correct = char == self.current_phrase[i]
-                comparison.append((char, is_correct))
-            else:
-                # Caracteres extra son incorrectos
-                comparison.append((char, False))
-        return comparison
-    
-    def get_accuracy(self):
-        """
-        Calcula la precisión actual (% de caracteres correctos)
-        """
-        if len(self.user_input) == 0:
-            return 100
-        
-        correct = sum(1 for char, is_correct in self.get_character_comparison() if is_correct)
-        return int((correct / len(self.user_input)) * 100)
-    
-    def is_character_correct(self, index):
-        """
-        Verifica si un carácter específico es correcto
-        """
-        if index < len(self.user_input) and index < len(self.current_phrase):
-            return self.user_input[index] == self.current_phrase[index]
-        return False
-    
     def reset(self):
         """
         Reinicia el input del usuario
         """
-        self.user_input = ""
\ No newline at end of file
+        self.chars.clear()
+        self.correct_flags.clear()
+        self.correct_count = 0
+        self.first_error = -1
+        if self.alignment_mode:
+            self.aligner = BandedAligner(self.current_phrase, ALIGNMENT_BAND)
\ No newline at end of file
@@ -6,9 +6,33 @@ from config import (
 )
 from effects import draw_glow_rect
 
+# Configuración de cada sprite sheet: ruta y número de frames
+SPRITE_CONFIG = {
+    'idle': {'path': 'assets/pj/Idle.png', 'frames': 8},
+    'walk': {'path': 'assets/pj/Walk.png', 'frames': 8},
+    'run': {'path': 'assets/pj/Run.png', 'frames': 7},
+    'dead': {'path': 'assets/pj/Dead.png', 'frames': 5}
+}
+
+
+def _mask_bounds(mask):
+    """
+    Caja mínima que contiene los píxeles de la máscara (vacía si no hay ninguno)
+    """
+    rects = mask.get_bounding_rects()
+    if not rects:
+        return pygame.Rect(0, 0, 0, 0)
+    return rects[0].unionall(rects[1:])
+
 
 class Player:
-    def __init__(self):
+    def __init__(self, sprite_sheets=None, load_sprites=True):
+        """
+        sprite_sheets: Opcional, {animación: Surface} ya cargadas (AssetManager);
+        las que falten se cargan desde disco
+        load_sprites: False para no convertir las imágenes al formato de la
+        pantalla (simulación sin pantalla); las máscaras de colisión son las mismas
+        """
         self.x = PLAYER_START_X
         self.y = PLAYER_START_Y
         self.size = PLAYER_SIZE
@@ -25,26 +49,31 @@ class Player:
         self.animation_timer = 0
         self.animation_speed = 0.15  # Velocidad de animación
         
+        # Colisión por píxel: máscara y caja ajustada de cada frame (relativas a x, y)
+        self.masks = {}
+        self.bounds = {}
+        self.hitbox = pygame.Rect(0, 0, 0, 0)  # caja que contiene todos los frames
+        self.solid_masks = {}  # máscaras llenas por tamaño de obstáculo
+        self.body = None  # caja ajustada del frame actual en pantalla (ver sync_body)
+        
         # Cargar sprites
-        self._load_sprites()
+        self._load_sprites(sprite_sheets or {}, convert=load_sprites)
+        self._build_masks()
+        self.sync_body()
     
-    def _load_sprites(self):
+    def _load_sprites(self, sprite_sheets, convert=True):
         """
         Carga los sprite sheets y extrae frames individuales
         """
-        # Definir configuración de cada sprite sheet
-        sprite_config = {
-            'idle': {'path': 'assets/pj/Idle.png', 'frames': 8},
-            'walk': {'path': 'assets/pj/Walk.png', 'frames': 8},
-            'run': {'path': 'assets/pj/Run.png', 'frames': 7},
-            'dead': {'path': 'assets/pj/Dead.png', 'frames': 5}
-        }
-        
         # Cargar cada sprite sheet
-        for anim_name, config in sprite_config.items():
+        for anim_name, config in SPRITE_CONFIG.items():
             try:
-                # Cargar imagen completa
-                sheet = pygame.image.load(config['path']).convert_alpha()
+                # Imagen completa (precargada o desde disco)
+                sheet = sprite_sheets.get(anim_name)
+                if sheet is None:
+                    sheet = pygame.image.load(config['path'])
+                    if convert:
+                        sheet = sheet.convert_alpha()
                 
                 # Extraer frames individuales
                 frames = []
@@ -70,31 +99,90 @@ class Player:
                 fallback_surface.fill(CYAN if anim_name != 'dead' else RED)
                 self.animations[anim_name] = [fallback_surface]
     
-    def update_danger_level(self, walls):
+    def _build_masks(self):
+        """
+        Precalcula la máscara de cada frame y su caja ajustada (solo los píxeles
+        visibles); los frames de respaldo ocupan el cuadrado completo
+        """
+        for anim_name, frames in self.animations.items():
+            masks = [pygame.mask.from_surface(frame) for frame in frames]
+            self.masks[anim_name] = masks
+            self.bounds[anim_name] = [_mask_bounds(mask) for mask in masks]
+        all_bounds = [rect for rects in self.bounds.values() for rect in rects if rect.width]
+        if all_bounds:
+            self.hitbox = all_bounds[0].unionall(all_bounds[1:])
+    
+    def sync_body(self):
+        """
+        Recalcula la caja ajustada en pantalla; se llama al cambiar de frame,
+        de animación o de posición (quien las cambie desde afuera también)
+        """
+        self.body = self.bounds[self.current_animation][self.frame_index].move(self.rect.x, self.rect.y)
+    
+    def collision_rect(self):
+        """
+        Caja ajustada del frame actual en coordenadas de pantalla (no modificar)
+        """
+        return self.body
+    
+    def hitbox_bounds(self):
         """
-        Calcula el nivel de peligro basado en la proximidad de las paredes
+        Caja que contiene los píxeles de cualquier frame (para predecir choques)
+        """
+        return self.hitbox.move(self.rect.x, self.rect.y)
+    
+    def overlaps_rect(self, rect):
+        """
+        True si el rect toca algún píxel visible del frame actual: primero la
+        caja ajustada (rechazo barato) y solo si se cruzan, la máscara
+        """
+        if not rect.colliderect(self.body):
+            return False
+        solid = self.solid_masks.get(rect.size)
+        if solid is None:
+            solid = pygame.mask.Mask(rect.size, fill=True)
+            self.solid_masks[rect.size] = solid
+        mask = self.masks[self.current_animation][self.frame_index]
+        return mask.overlap(solid, (rect.x - self.rect.x, rect.y - self.rect.y)) is not None
+    
+    def update_danger_level(self, rects):
+        """
+        Calcula el nivel de peligro basado en la proximidad de los obstáculos
         También ajusta la posición del jugador para que no se salga de las paredes
+
+        Args:
+            rects: Rects de los obstáculos (ObstacleManager.get_rects)
         """
-        left_wall, right_wall = walls
+        # Se mide desde los píxeles visibles del frame actual
+        body = self.body.copy()
+        
+        # Solo cuentan los obstáculos a la altura del jugador
+        rects = [rect for rect in rects if rect.top < body.bottom and body.top < rect.bottom]
+        center = body.centerx
+        left_walls = [rect for rect in rects if rect.centerx <= center]
+        right_walls = [rect for rect in rects if rect.centerx > center]
         
         # Mantener al jugador dentro de los límites de las paredes
         # Limitar por la izquierda
-        if self.rect.left < left_wall.rect.right:
-            self.x = left_wall.rect.right
-            self.rect.x = self.x
+        left_limit = max((rect.right for rect in left_walls), default=None)
+        if left_limit is not None and body.left < left_limit:
+            self.x += left_limit - body.left
+            body.left = left_limit
         
         # Limitar por la derecha
-        if self.rect.right > right_wall.rect.left:
-            self.x = right_wall.rect.left - self.size
+        right_limit = min((rect.left for rect in right_walls), default=None)
+        if right_limit is not None and body.right > right_limit:
+            self.x -= body.right - right_limit
+            body.right = right_limit
+        if self.rect.x != self.x:
             self.rect.x = self.x
+            self.sync_body()
         
-        # Distancia a cada pared
-        dist_left = self.rect.left - left_wall.rect.right
-        dist_right = right_wall.rect.left - self.rect.right
-        
-        # Distancia mínima
-        min_dist = min(dist_left, dist_right)
+        # Distancia mínima a un obstáculo de cada lado
         max_safe_dist = WINDOW_WIDTH // 4
+        dist_left = body.left - left_limit if left_limit is not None else max_safe_dist
+        dist_right = right_limit - body.right if right_limit is not None else max_safe_dist
+        min_dist = min(dist_left, dist_right)
         
         # Calcular nivel de peligro (0.0 = seguro, 1.0 = muy peligroso)
         if min_dist <= 0:
@@ -102,13 +190,11 @@ class Player:
         else:
             self.danger_level = max(0.0, 1.0 - (min_dist / max_safe_dist))
     
-    def check_collision(self, walls):
+    def check_collision(self, rects):
         """
-        Verifica si el jugador colisiona con alguna pared
+        Verifica si el jugador colisiona con algún obstáculo (por píxel)
         """
-        left_wall, right_wall = walls
-        
-        if self.rect.colliderect(left_wall.rect) or self.rect.colliderect(right_wall.rect):
+        if any(self.overlaps_rect(rect) for rect in rects):
             self.is_alive = False
             self.color = RED
             return True
@@ -129,6 +215,7 @@ class Player:
         
         # Determinar qué animación usar
         previous_animation = self.current_animation
+        previous_frame = self.frame_index
         
         if not self.is_alive:
             self.current_animation = 'dead'
@@ -159,6 +246,9 @@ class Player:
             if self.current_animation in self.animations and len(self.animations[self.current_animation]) > 0:
                 num_frames = len(self.animations[self.current_animation])
                 self.frame_index = (self.frame_index + 1) % num_frames
+        
+        if self.frame_index != previous_frame or self.current_animation != previous_animation:
+            self.sync_body()
     
     def draw(self, screen):
         """
@@ -203,4 +293,5 @@ class Player:
         self.rect = pygame.Rect(self.x, self.y, self.size, self.size)
         self.current_animation = 'idle'
         self.frame_index = 0
-        self.animation_timer = 0
\ No newline at end of file
+        self.animation_timer = 0
+        self.sync_body()
\ No newline at end of file
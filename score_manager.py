@@ -1,10 +1,19 @@
-import time
-import json
-import os
+from collections import deque
+
+import game_clock
+from keystroke_log import KeystrokeLog
+from score_store import ScoreStore
 
 
 class ScoreManager:
-    def __init__(self):
+    def __init__(self, persist=True, history=None):
+        """
+        persist: Si se guardan las partidas en la base de puntajes
+        (el replay y las simulaciones no escriben)
+        history: Opcional, cuántos resultados de nivel conservar (modo infinito);
+        None = todos
+        """
+        self.history = history
         self.total_score = 0
         self.level_score = 0
         self.combo = 0
@@ -14,13 +23,37 @@ class ScoreManager:
         self.typing_start_time = None
         self.eyes_closed_time = 0
         self.eyes_closed_start = None
-        self.high_scores_file = "high_scores.json"
+        self.paused_at = None
+        self.keystrokes = KeystrokeLog()
+        self.live_wpm = 0
+        self.level_results = deque(maxlen=history)  # niveles completados en la partida actual
+        self.levels_completed = 0  # incluye los que ya salieron del historial
+        self.persist = persist
+        self.score_store = None  # se abre al primer uso
+        self.run_token = None  # partida en curso en la base (desde el primer nivel)
     
     def start_typing(self):
         """
         Inicia el contador de tiempo para calcular WPM
         """
-        self.typing_start_time = time.time()
+        self.typing_start_time = game_clock.now()
+        self.keystrokes.start()
+    
+    def pause_typing(self):
+        """
+        Pausa el reloj de WPM (el tiempo en pausa no cuenta)
+        """
+        if self.paused_at is None:
+            self.paused_at = game_clock.now()
+    
+    def resume_typing(self):
+        """
+        Reanuda el reloj de WPM descontando el tiempo en pausa
+        """
+        if self.paused_at is not None:
+            if self.typing_start_time is not None:
+                self.typing_start_time += game_clock.now() - self.paused_at
+            self.paused_at = None
     
     def add_correct_character(self):
         """
@@ -32,6 +65,20 @@ class ScoreManager:
         if self.combo > self.max_combo:
             self.max_combo = self.combo
     
+    def record_keystroke(self, char, expected_char, is_correct, eyes_open):
+        """
+        Registra la pulsación en el log de teclas (métricas móviles)
+        """
+        self.keystrokes.append(char, expected_char, is_correct, eyes_open)
+    
+    def get_live_wpm(self):
+        """
+        WPM instantáneo (ventana móvil) para el HUD; congelado durante la pausa
+        """
+        if self.paused_at is None:
+            self.live_wpm = self.keystrokes.instant_wpm()
+        return self.live_wpm
+    
     def add_incorrect_character(self):
         """
         Registra un carácter incorrecto 
@@ -44,14 +91,14 @@ class ScoreManager:
         Inicia el contador de tiempo con ojos cerrados
         """
         if self.eyes_closed_start is None:
-            self.eyes_closed_start = time.time()
+            self.eyes_closed_start = game_clock.now()
     
     def stop_eyes_closed(self):
         """
         Detiene el contador de tiempo con ojos cerrados
         """
         if self.eyes_closed_start is not None:
-            self.eyes_closed_time += time.time() - self.eyes_closed_start
+            self.eyes_closed_time += game_clock.now() - self.eyes_closed_start
             self.eyes_closed_start = None
     
     def calculate_wpm(self):
@@ -61,7 +108,8 @@ class ScoreManager:
         if self.typing_start_time is None:
             return 0
         
-        elapsed_time = time.time() - self.typing_start_time
+        now = self.paused_at if self.paused_at is not None else game_clock.now()
+        elapsed_time = now - self.typing_start_time
         if elapsed_time == 0:
             return 0
         
@@ -101,12 +149,25 @@ class ScoreManager:
         
         return self.level_score
     
-    def complete_level(self, level_number):
+    def complete_level(self, level_number, phrase_id=-1):
         """
         Completa un nivel y añade la puntuacion al total
         """
         score = self.calculate_level_score(level_number)
         self.total_score += score
+        self.levels_completed += 1
+        self.level_results.append({
+            "level": level_number,
+            "phrase_id": phrase_id,
+            "score": score,
+            "wpm": self.calculate_wpm(),
+            "accuracy": self.calculate_accuracy(),
+            "max_combo": self.max_combo,
+            "eyes_closed_time": self.eyes_closed_time
+        })
+        if self.persist:
+            # Cada nivel va a la base al completarse: el historial en memoria puede estar acotado
+            self.get_store().add_level(self.get_run_token(), self.level_results[-1])
         return score
     
     def reset_level(self):
@@ -121,46 +182,68 @@ class ScoreManager:
         self.typing_start_time = None
         self.eyes_closed_time = 0
         self.eyes_closed_start = None
+        self.paused_at = None
+        self.keystrokes.reset()
+        self.live_wpm = 0
     
     def reset_game(self):
         """
         Reinicia todas las estadisticas
         """
         self.total_score = 0
+        self.level_results = deque(maxlen=self.history)
+        self.levels_completed = 0
+        self.run_token = None
         self.reset_level()
     
-    def save_high_score(self, player_name="Player"):
+    def get_store(self):
         """
-        Guarda el puntaje alto en un archivo JSON
+        Retorna la base de puntajes (la primera vez solo arranca el hilo
+        escritor, que la abre; no hay disco en el frame)
         """
-        high_scores = self.load_high_scores()
-        
-        new_score = {
+        if self.score_store is None:
+            self.score_store = ScoreStore()
+        return self.score_store
+
+    def get_run_token(self):
+        """
+        Token de la partida actual en la base (la da de alta la primera vez)
+        """
+        if self.run_token is None:
+            self.run_token = self.get_store().begin_run()
+        return self.run_token
+    
+    def save_high_score(self, player_name="Player", outcome="GAME_OVER"):
+        """
+        Guarda el resultado de la partida en la base (escritura en segundo
+        plano; los niveles ya se guardaron al completarse)
+        """
+        if not self.persist:
+            return
+        run = {
             "name": player_name,
             "score": self.total_score,
             "wpm": self.calculate_wpm(),
             "accuracy": self.calculate_accuracy(),
-            "max_combo": self.max_combo
+            "max_combo": self.max_combo,
+            "outcome": outcome
         }
-        
-        high_scores.append(new_score)
-        high_scores.sort(key=lambda x: x["score"], reverse=True)
-        high_scores = high_scores[:10]  # Mantener solo top 10
-        
-        with open(self.high_scores_file, 'w') as f:
-            json.dump(high_scores, f, indent=2)
+        self.get_store().finish_run(self.get_run_token(), run, self.levels_completed)
+        self.run_token = None
+    
+    def load_high_scores(self, limit=10):
+        """
+        Carga los puntajes altos (top N por puntaje)
+        """
+        return self.get_store().top_scores(limit)
     
-    def load_high_scores(self):
+    def close(self):
         """
-        Carga los puntajes altos desde el archivo
+        Termina de escribir los puntajes pendientes
         """
-        if os.path.exists(self.high_scores_file):
-            try:
-                with open(self.high_scores_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        if self.score_store is not None:
+            self.score_store.close()
+            self.score_store = None
     
     def get_score_breakdown(self):
         """
@@ -172,5 +255,8 @@ class ScoreManager:
             "combo": self.max_combo,
             "eyes_closed_time": round(self.eyes_closed_time, 1),
             "level_score": self.level_score,
-            "total_score": self.total_score
+            "total_score": self.total_score,
+            "interval_p50": self.keystrokes.interval_percentile(50),
+            "interval_p90": self.keystrokes.interval_percentile(90),
+            "worst_keys": self.keystrokes.worst_keys()
         }
@@ -0,0 +1,248 @@
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from config import SCORE_DB_PATH, LEGACY_HIGH_SCORES_PATH, SCORE_WRITE_BATCH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    wpm INTEGER NOT NULL,
+    accuracy INTEGER NOT NULL,
+    max_combo INTEGER NOT NULL,
+    levels INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC);
+
+CREATE TABLE IF NOT EXISTS level_results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    level INTEGER NOT NULL,
+    phrase_id INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    wpm INTEGER NOT NULL,
+    accuracy INTEGER NOT NULL,
+    max_combo INTEGER NOT NULL,
+    eyes_closed_time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS level_results_by_run ON level_results (run_id);
+CREATE INDEX IF NOT EXISTS level_results_by_level ON level_results (level, score DESC);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Partida con niveles ya guardados que todavía no terminó (o se cortó el juego)
+RUN_IN_PROGRESS = 'playing'
+
+
+def connect(path):
+    """
+    Abre la base en modo WAL: los lectores no bloquean al escritor y varios
+    procesos (kioscos) pueden compartir el archivo
+    """
+    connection = sqlite3.connect(path, timeout=5)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class ScoreStore:
+    def __init__(self, path=SCORE_DB_PATH, legacy_path=LEGACY_HIGH_SCORES_PATH):
+        """
+        Puntajes en SQLite: todas las partidas y sus niveles (no solo el top 10).
+        Las escrituras las hace un hilo aparte agrupadas en transacciones, así el
+        bucle del juego nunca espera al disco. Cada nivel se guarda al completarse
+        (el modo infinito solo guarda en memoria los últimos)
+        """
+        self.path = path
+        self.legacy_path = legacy_path
+        self.connection = None  # lecturas (hilo principal), se abre al primer top_scores
+        # El hilo escritor crea el esquema y migra; las lecturas esperan a que termine
+        self.ready = threading.Event()
+        self.tokens = itertools.count(1)
+        self.run_ids = {}  # token -> id en la base (solo lo usa el hilo escritor)
+
+        self.queue = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, name="score-writer", daemon=True)
+        self.writer.start()
+
+    @staticmethod
+    def migrate_legacy(connection, legacy_path):
+        """
+        Importa una sola vez el high_scores.json anterior (el archivo no se borra)
+        """
+        if not legacy_path or not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path, 'r') as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] No se pudo leer {legacy_path}: {e}")
+            return
+
+        # BEGIN IMMEDIATE: si dos kioscos arrancan a la vez, solo uno migra
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if connection.execute("SELECT 1 FROM meta WHERE key = 'legacy_migrated'").fetchone():
+                connection.rollback()
+                return
+            for entry in legacy:
+                connection.execute(
+                    "INSERT INTO runs (name, score, wpm, accuracy, max_combo, levels, outcome, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, 0, 'legacy', ?)",
+                    (entry.get("name", "Player"), entry.get("score", 0), entry.get("wpm", 0),
+                     entry.get("accuracy", 0), entry.get("max_combo", 0), os.path.getmtime(legacy_path))
+                )
+            connection.execute("INSERT INTO meta (key, value) VALUES ('legacy_migrated', ?)", (legacy_path,))
+            connection.commit()
+            print(f"[OK] Migrados {len(legacy)} puntajes de {legacy_path}")
+        except sqlite3.Error as e:
+            connection.rollback()
+            print(f"[ERROR] No se pudo migrar {legacy_path}: {e}")
+
+    def begin_run(self):
+        """
+        Encola el alta de una partida en curso. Retorna el token con el que se
+        le agregan niveles y se termina (retorna enseguida)
+        """
+        token = next(self.tokens)
+        self.queue.put(('begin', token, time.time()))
+        return token
+
+    def add_level(self, token, result):
+        """
+        Encola un nivel completado (dict con level, phrase_id, score, wpm,
+        accuracy, max_combo y eyes_closed_time)
+        """
+        self.queue.put(('level', token, dict(result)))
+
+    def finish_run(self, token, run, levels):
+        """
+        Encola el resultado final de la partida
+
+        Args:
+            run: dict con name, score, wpm, accuracy, max_combo y outcome
+            levels: niveles completados en toda la partida
+        """
+        self.queue.put(('finish', token, dict(run, levels=levels)))
+
+    def _open(self):
+        """
+        Abre la base, crea el esquema y migra (en el hilo escritor: es todo disco)
+        """
+        try:
+            connection = connect(self.path)
+            connection.executescript(SCHEMA)
+            self.migrate_legacy(connection, self.legacy_path)
+            return connection
+        except sqlite3.Error as e:
+            print(f"[ERROR] No se pudo abrir la base de puntajes {self.path}: {e}")
+            return None
+        finally:
+            self.ready.set()
+
+    def _write_loop(self):
+        connection = self._open()
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            # Agrupar lo que ya esté encolado en una sola transacción
+            while len(batch) < SCORE_WRITE_BATCH:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            items = [item for item in batch if item is not None]
+            running = len(items) == len(batch)
+            if items and connection is not None:
+                begun = []
+                try:
+                    with connection:
+                        for kind, token, data in items:
+                            self._write_item(connection, kind, token, data, begun)
+                except sqlite3.Error as e:
+                    # La transacción se deshizo: las partidas dadas de alta en ella no existen
+                    for token in begun:
+                        self.run_ids.pop(token, None)
+                    print(f"[ERROR] No se pudieron guardar {len(items)} puntajes: {e}")
+            for _ in batch:
+                self.queue.task_done()
+        if connection is not None:
+            connection.close()
+
+    def _write_item(self, connection, kind, token, data, begun):
+        if kind == 'begin':
+            cursor = connection.execute(
+                "INSERT INTO runs (name, score, wpm, accuracy, max_combo, levels, outcome, created_at) "
+                "VALUES ('', 0, 0, 0, 0, 0, ?, ?)",
+                (RUN_IN_PROGRESS, data)
+            )
+            self.run_ids[token] = cursor.lastrowid
+            begun.append(token)
+            return
+        run_id = self.run_ids.get(token)
+        if run_id is None:
+            return  # el alta falló: no hay partida a la que asociarlo
+        if kind == 'level':
+            connection.execute(
+                "INSERT INTO level_results (run_id, level, phrase_id, score, wpm, accuracy, max_combo, eyes_closed_time) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, data["level"], data["phrase_id"], data["score"], data["wpm"],
+                 data["accuracy"], data["max_combo"], data["eyes_closed_time"])
+            )
+        else:
+            connection.execute(
+                "UPDATE runs SET name = ?, score = ?, wpm = ?, accuracy = ?, max_combo = ?, levels = ?, "
+                "outcome = ? WHERE id = ?",
+                (data["name"], data["score"], data["wpm"], data["accuracy"], data["max_combo"],
+                 data["levels"], data["outcome"], run_id)
+            )
+            del self.run_ids[token]
+
+    def top_scores(self, limit=10):
+        """
+        Mejores partidas (consulta sobre el índice por puntaje)
+        """
+        self.ready.wait()
+        try:
+            if self.connection is None:
+                self.connection = connect(self.path)
+            rows = self.connection.execute(
+                "SELECT name, score, wpm, accuracy, max_combo FROM runs WHERE outcome != ? "
+                "ORDER BY score DESC LIMIT ?",
+                (RUN_IN_PROGRESS, limit)
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"[ERROR] No se pudieron leer los puntajes: {e}")
+            return []
+        return [
+            {"name": name, "score": score, "wpm": wpm, "accuracy": accuracy, "max_combo": max_combo}
+            for name, score, wpm, accuracy, max_combo in rows
+        ]
+
+    def flush(self):
+        """
+        Espera a que se escriba todo lo encolado
+        """
+        self.queue.join()
+
+    def close(self):
+        """
+        Termina el hilo escritor (escribiendo lo pendiente) y cierra la base
+        """
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
+        if self.connection is not None:
+            self.connection.close()
@@ -0,0 +1,340 @@
+import os
+import random
+import struct
+import sys
+import time
+
+import pygame
+
+import game_clock
+from config import PERFORMANCE_PRESETS
+
+# Formato de la grabación (little-endian):
+#   cabecera: magic 'NMSR', versión u16, semilla u64, tiempo inicial u64 (µs),
+#             fps u16, intervalo de inferencia u16, preset (16 bytes), estado de cámara u8
+#   modo u8 (0 = niveles fijos, 1 = infinito; desde la versión 2)
+#   primera frase: longitud u16 + UTF-8 (verificación)
+#   frames: delta de tiempo u32 (µs), flags u8, número de teclas u16,
+#           y por tecla: código pygame i32, carácter u32 (0 = ninguno)
+#   cierre: un frame con FLAG_END seguido del resultado de la sesión
+#           (desde la versión 3 con nivel y combos u32 y puntajes i64: el modo
+#           infinito los desbordaba)
+SESSION_MAGIC = b'NMSR'
+SESSION_VERSION = 3
+HEADER = struct.Struct('<4sHQQHH16sB')
+MODE = struct.Struct('<B')
+PHRASE_LENGTH = struct.Struct('<H')
+FRAME = struct.Struct('<IBH')
+KEY = struct.Struct('<iI')
+OUTCOMES = {
+    1: struct.Struct('<16sHiiHHIIIidd'),
+    2: struct.Struct('<16sHiiHHIIIidd'),
+    3: struct.Struct('<16sIqqIIIIIidd'),
+}
+OUTCOME = OUTCOMES[SESSION_VERSION]
+
+# Flags del frame: estado de la cámara tras el update y marcas de control
+FLAG_EYES_OPEN = 1
+FLAG_FACE_DETECTED = 2
+FLAG_FRAME_OK = 4
+FLAG_PARTIAL = 8  # la sesión terminó durante handle_events (sin update)
+FLAG_END = 128
+
+OUTCOME_FIELDS = (
+    'game_state', 'level', 'total_score', 'level_score', 'combo', 'max_combo',
+    'correct_chars', 'total_chars', 'frames', 'phrase_id', 'eyes_closed_time', 'wall_speed'
+)
+
+
+def camera_flags(camera):
+    return ((FLAG_EYES_OPEN if camera.eyes_open else 0)
+            | (FLAG_FACE_DETECTED if camera.face_detected else 0)
+            | (FLAG_FRAME_OK if camera.frame_ok else 0))
+
+
+def game_outcome(game, frames):
+    """
+    Resultado comparable de una sesión (lo que el replay debe reproducir)
+    """
+    score = game.score_manager
+    return {
+        'game_state': game.game_state,
+        'level': game.level_manager.current_level,
+        'total_score': score.total_score,
+        'level_score': score.level_score,
+        'combo': score.combo,
+        'max_combo': score.max_combo,
+        'correct_chars': score.correct_chars,
+        'total_chars': score.total_chars,
+        'frames': frames,
+        'phrase_id': game.phrase_manager.current_phrase_id,
+        'eyes_closed_time': score.eyes_closed_time,
+        'wall_speed': game.current_wall_speed,
+    }
+
+
+class SessionRecorder:
+    def __init__(self, path):
+        """
+        Graba una sesión: semilla, teclas con su tiempo y el estado de la cámara
+        de cada frame (lo necesario para repetirla sin jugador ni webcam)
+        """
+        self.path = path
+        self.file = None
+        self.frames = 0
+        self.last_us = 0
+        self.pending = None  # (tiempo, teclas) del frame en curso
+
+    def start(self, game, seed=None):
+        """
+        Empieza a grabar reiniciando la partida con la semilla
+        """
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+        game_clock.advance()
+        game.start_session(seed)
+
+        self.file = open(self.path, 'wb')
+        self.last_us = game_clock.micros()
+        self.file.write(HEADER.pack(
+            SESSION_MAGIC, SESSION_VERSION, seed, self.last_us,
+            game.fps, game.inference_interval,
+            game.preset_name.encode('ascii')[:16], camera_flags(game.camera)
+        ))
+        self.file.write(MODE.pack(1 if game.endless else 0))
+        phrase = game.current_phrase.encode('utf-8')
+        self.file.write(PHRASE_LENGTH.pack(len(phrase)) + phrase)
+        game.recorder = self
+        print(f"[OK] Grabando sesión en {self.path} (semilla {seed})")
+
+    def begin_frame(self, events):
+        """
+        Guarda las teclas del frame (antes de procesarlas)
+        """
+        keys = []
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key != pygame.K_ESCAPE:
+                char = event.unicode
+                keys.append((event.key, ord(char) if len(char) == 1 else 0))
+        self.pending = (game_clock.micros(), keys)
+
+    def _write_frame(self, flags):
+        frame_us, keys = self.pending
+        self.pending = None
+        self.file.write(FRAME.pack(frame_us - self.last_us, flags, len(keys)))
+        for key, code in keys:
+            self.file.write(KEY.pack(key, code))
+        self.last_us = frame_us
+        self.frames += 1
+
+    def end_frame(self, camera):
+        """
+        Escribe el frame con el estado de la cámara que decidió el update
+        """
+        self._write_frame(camera_flags(camera))
+
+    def finish(self, game):
+        """
+        Cierra la grabación con el resultado de la sesión
+        """
+        if self.file is None:
+            return
+        if self.pending is not None:
+            # Se salió en medio del frame: el replay solo procesa sus eventos
+            self._write_frame(camera_flags(game.camera) | FLAG_PARTIAL)
+
+        outcome = game_outcome(game, self.frames)
+        self.file.write(FRAME.pack(0, FLAG_END, 0))
+        self.file.write(OUTCOME.pack(
+            outcome['game_state'].encode('ascii')[:16],
+            *(outcome[name] for name in OUTCOME_FIELDS[1:])
+        ))
+        self.file.close()
+        self.file = None
+        size_kb = os.path.getsize(self.path) / 1024
+        print(f"[OK] Sesión grabada: {self.frames} frames, {size_kb:.1f} KB")
+
+
+def read_session(path):
+    """
+    Lee una grabación. Retorna (cabecera, frames, resultado); el resultado es
+    None si el archivo quedó truncado (el juego se cerró sin terminar la grabación)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    magic, version, seed, start_us, fps, inference_interval, preset, flags = HEADER.unpack_from(data, 0)
+    if magic != SESSION_MAGIC or not 1 <= version <= SESSION_VERSION:
+        raise ValueError(f"{path} no es una grabación válida (versión {SESSION_VERSION})")
+    position = HEADER.size
+    endless = False
+    if version >= 2:
+        endless = MODE.unpack_from(data, position)[0] == 1
+        position += MODE.size
+    (phrase_length,) = PHRASE_LENGTH.unpack_from(data, position)
+    position += PHRASE_LENGTH.size
+    header = {
+        'seed': seed,
+        'start_us': start_us,
+        'fps': fps,
+        'inference_interval': inference_interval,
+        'preset': preset.rstrip(b'\0').decode('ascii'),
+        'camera_flags': flags,
+        'endless': endless,
+        'phrase': data[position:position + phrase_length].decode('utf-8'),
+    }
+    position += phrase_length
+
+    frames = []
+    outcome = None
+    frame_us = start_us
+    while position + FRAME.size <= len(data):
+        delta_us, flags, key_count = FRAME.unpack_from(data, position)
+        position += FRAME.size
+        if flags & FLAG_END:
+            outcome_format = OUTCOMES[version]
+            if position + outcome_format.size <= len(data):
+                values = outcome_format.unpack_from(data, position)
+                outcome = dict(zip(OUTCOME_FIELDS, values))
+                outcome['game_state'] = outcome['game_state'].rstrip(b'\0').decode('ascii')
+            break
+        if position + key_count * KEY.size > len(data):
+            break
+        keys = [KEY.unpack_from(data, position + i * KEY.size) for i in range(key_count)]
+        position += key_count * KEY.size
+        frame_us += delta_us
+        frames.append((frame_us, flags, keys))
+    return header, frames, outcome
+
+
+class FakeCamera:
+    def __init__(self, flags):
+        """
+        Cámara simulada: entrega el estado de ojos y cara grabado en cada frame
+        """
+        self.eyes_open = False
+        self.face_detected = False
+        self.frame_ok = False
+        self.frame = None
+        self._apply(flags)
+        self.pending_flags = flags
+
+    def _apply(self, flags):
+        self.eyes_open = bool(flags & FLAG_EYES_OPEN)
+        self.face_detected = bool(flags & FLAG_FACE_DETECTED)
+        self.frame_ok = bool(flags & FLAG_FRAME_OK)
+
+    def load_frame(self, flags):
+        """
+        Prepara el resultado de la próxima inferencia
+        """
+        self.pending_flags = flags
+
+    def detect_eyes(self):
+        self._apply(self.pending_flags)
+        return self.eyes_open
+
+    def get_frame(self):
+        return self.frame
+
+    def release(self):
+        pass
+
+
+def key_events(keys):
+    return [pygame.event.Event(pygame.KEYDOWN, key=key, unicode=chr(code) if code else '', mod=0)
+            for key, code in keys]
+
+
+def wait_step():
+    """
+    Modo paso a paso: espera una tecla. Retorna False si se pidió salir
+    """
+    while True:
+        event = pygame.event.wait()
+        if event.type == pygame.QUIT:
+            return False
+        if event.type == pygame.KEYDOWN:
+            return event.key != pygame.K_ESCAPE
+
+
+def replay(path, mode='fast'):
+    """
+    Reproduce una grabación a través de Game.step con reloj virtual y cámara simulada
+
+    Args:
+        path: Archivo de la grabación
+        mode: 'realtime' (a la velocidad original), 'fast' (sin dibujar, lo más
+            rápido posible) o 'step' (un frame por tecla)
+
+    Returns:
+        True si el resultado coincide con el grabado
+    """
+    from main import Game
+
+    header, frames, expected = read_session(path)
+    preset = dict(PERFORMANCE_PRESETS.get(header['preset'], PERFORMANCE_PRESETS['high']))
+    preset['fps'] = header['fps']
+    preset['inference_interval'] = header['inference_interval']
+
+    camera = FakeCamera(header['camera_flags'])
+    game = Game((header['preset'], preset), camera, persist=False, endless=header['endless'])
+    game_clock.advance(header['start_us'])
+    game.start_session(header['seed'])
+    if game.current_phrase != header['phrase']:
+        print(f"[ERROR] La frase no coincide: '{game.current_phrase}' != '{header['phrase']}'")
+        return False
+
+    start = time.perf_counter()
+    for frame_us, flags, keys in frames:
+        camera.load_frame(flags)
+        events = key_events(keys)
+        if flags & FLAG_PARTIAL:
+            game_clock.advance(frame_us)
+            game.handle_events(events)
+        else:
+            game.step(events, frame_us)
+
+        if mode == 'realtime':
+            delay = (frame_us - header['start_us']) / 1000000.0 - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+            pygame.event.pump()
+            game.draw()
+        elif mode == 'step':
+            game.draw()
+            if not wait_step():
+                break
+    elapsed = time.perf_counter() - start
+
+    duration = (frames[-1][0] - header['start_us']) / 1000000.0 if frames else 0
+    print(f"[OK] {len(frames)} frames ({duration:.1f}s de juego) reproducidos en {elapsed:.2f}s")
+    if expected is None:
+        print("[ERROR] La grabación no tiene resultado final (archivo truncado); no se puede verificar")
+        return False
+
+    actual = game_outcome(game, len(frames))
+    mismatches = [name for name in OUTCOME_FIELDS if actual[name] != expected[name]]
+    for name in mismatches:
+        print(f"[ERROR] {name}: grabado {expected[name]}, replay {actual[name]}")
+    if not mismatches:
+        print(f"[OK] Resultado idéntico: {actual['game_state']}, nivel {actual['level'] + 1}, "
+              f"puntaje {actual['total_score']}")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    # python session_recorder.py sesion.nmsr [--realtime | --fast | --step]
+    usage = "Uso: python session_recorder.py sesion.nmsr [--realtime | --fast | --step]"
+    args = sys.argv[1:]
+    modes = {'--realtime': 'realtime', '--fast': 'fast', '--step': 'step'}
+    if not args or args[0] in modes or any(arg not in modes for arg in args[1:]):
+        print(usage)
+        sys.exit(1)
+
+    replay_mode = modes[args[1]] if len(args) > 1 else 'fast'
+    if replay_mode == 'fast':
+        # Sin ventana ni audio: solo lógica
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    sys.exit(0 if replay(args[0], replay_mode) else 1)
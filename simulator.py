@@ -0,0 +1,413 @@
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import game_clock
+from config import (
+    REFERENCE_FPS, TOLERANCE_TIME, WALL_SPEED_EYES_CLOSED, ERROR_SPEED_PENALTY
+)
+from level_manager import LevelManager
+from phrase_manager import PhraseManager
+from player import Player
+from score_manager import ScoreManager
+from walls import WallManager
+
+# Modelos de jugador sintético
+#   wpm / wpm_sd: velocidad de escritura (normal por sesión)
+#   error_rate: probabilidad de error por tecla con los ojos abiertos
+#   blind_error_rate: error adicional al escribir con los ojos cerrados
+#   closed_fraction: fracción del tiempo con los ojos cerrados mientras escribe
+#   peek_seconds: duración media de cada vistazo (ojos abiertos)
+#   memory_failure: probabilidad de no memorizar la frase (mira mucho más ese nivel)
+TYPIST_PROFILES = {
+    'principiante': {'wpm': 25, 'wpm_sd': 6, 'error_rate': 0.06, 'blind_error_rate': 0.08,
+                     'closed_fraction': 0.4, 'peek_seconds': 1.2, 'memory_failure': 0.3},
+    'promedio': {'wpm': 45, 'wpm_sd': 8, 'error_rate': 0.03, 'blind_error_rate': 0.04,
+                 'closed_fraction': 0.6, 'peek_seconds': 0.8, 'memory_failure': 0.15},
+    'experto': {'wpm': 75, 'wpm_sd': 10, 'error_rate': 0.015, 'blind_error_rate': 0.015,
+                'closed_fraction': 0.85, 'peek_seconds': 0.5, 'memory_failure': 0.05},
+}
+
+# Campos de cada resultado por nivel (tuplas, para pasar poco entre procesos)
+RESULT_FIELDS = ('profile', 'session', 'level', 'won', 'seconds', 'score', 'wpm', 'accuracy',
+                 'eyes_closed_time', 'errors')
+
+FRAME_US = 1000000 // REFERENCE_FPS
+
+# Estado de cada proceso del pool (se crea una vez por proceso)
+_worker = {}
+
+
+class SyntheticTypist:
+    def __init__(self, profile, rng):
+        """
+        Jugador simulado: intervalos entre teclas, errores y parpadeos/vistazos
+        """
+        self.profile = profile
+        self.rng = rng
+        self.wpm = max(5.0, rng.gauss(profile['wpm'], profile['wpm_sd']))
+        # 5 caracteres por palabra; gamma con forma 4 alrededor del intervalo medio
+        self.mean_interval = 60.0 / (self.wpm * 5)
+        self.start_level()
+
+    def start_level(self):
+        """
+        Nuevo nivel: puede no haber memorizado la frase (entonces mira casi siempre)
+        """
+        closed = self.profile['closed_fraction']
+        if self.rng.random() < self.profile['memory_failure']:
+            closed *= 0.25
+        peek = self.profile['peek_seconds']
+        frame_seconds = 1.0 / REFERENCE_FPS
+        # Cadena de Markov por frame con la fracción y duración de vistazo pedidas
+        self.p_close = min(1.0, frame_seconds / peek) if closed > 0 else 0.0
+        closed_seconds = peek * closed / (1.0 - closed) if closed < 1 else float('inf')
+        self.p_open = min(1.0, frame_seconds / closed_seconds) if closed > 0 else 1.0
+        self.eyes_open = True
+        self.pending_backspace = False
+
+    def next_interval(self):
+        return self.rng.gammavariate(4.0, self.mean_interval / 4.0)
+
+    def update_eyes(self):
+        if self.eyes_open:
+            if self.rng.random() < self.p_close:
+                self.eyes_open = False
+        elif self.rng.random() < self.p_open:
+            self.eyes_open = True
+        return self.eyes_open
+
+    def next_key(self, expected):
+        """
+        Retorna el carácter que escribe (o None para borrar). Tras un error
+        (suena el sonido de error) borra con la tecla siguiente
+        """
+        if self.pending_backspace:
+            self.pending_backspace = False
+            return None
+        error_rate = self.profile['error_rate']
+        if not self.eyes_open:
+            error_rate += self.profile['blind_error_rate']
+        if expected is not None and self.rng.random() >= error_rate:
+            return expected
+        self.pending_backspace = True
+        return 'x' if expected != 'x' else 'z'
+
+
+class HeadlessSession:
+    def __init__(self, phrase_manager):
+        """
+        Partida sin pantalla ni cámara con la lógica real de paredes, jugador,
+        frases y puntaje; replica las reglas de Game.update para el estado PLAYING
+        """
+        self.phrase_manager = phrase_manager
+        self.walls = WallManager(particle_count=0)
+        self.player = Player(load_sprites=False)
+        self.walls.track(self.player)
+        self.score_manager = ScoreManager(persist=False)
+        self.level_manager = LevelManager()
+
+    def play_level(self, typist, now_us):
+        """
+        Juega el nivel actual. Retorna (ganó, segundos jugando, errores, tiempo final)
+        """
+        level = self.level_manager.get_current_level()
+        self.player.reset()
+        self.walls.reset()
+        self.score_manager.reset_level()
+        self.phrase_manager.get_random_phrase(level.phrase_difficulty, level.target_difficulty)
+        current_wall_speed = level.wall_speed
+        self.walls.set_speed(current_wall_speed)
+        typist.start_level()
+
+        # Memorización (Game usa TOLERANCE_TIME); las paredes no se mueven
+        now_us += TOLERANCE_TIME * 1000000
+        game_clock.advance(now_us)
+        self.score_manager.start_typing()
+        start_us = now_us
+        next_key_us = now_us + int(typist.next_interval() * 1000000)
+        errors = 0
+
+        walls = self.walls
+        player = self.player
+        score = self.score_manager
+        phrase = self.phrase_manager
+        while True:
+            now_us += FRAME_US
+            game_clock.advance(now_us)
+
+            # Eventos del frame (Game.handle_events)
+            while next_key_us <= now_us:
+                char = typist.next_key(phrase.get_expected_char())
+                if char is None:
+                    phrase.remove_character()
+                else:
+                    expected_char = phrase.get_expected_char()
+                    is_correct = phrase.add_character(char)
+                    score.record_keystroke(char, expected_char, is_correct, typist.eyes_open)
+                    if is_correct:
+                        score.add_correct_character()
+                    else:
+                        score.add_incorrect_character()
+                        current_wall_speed += ERROR_SPEED_PENALTY
+                        walls.set_speed(current_wall_speed)
+                        errors += 1
+                    if phrase.check_phrase():
+                        score.complete_level(self.level_manager.current_level)
+                        return True, (now_us - start_us) / 1000000.0, errors, now_us
+                next_key_us += int(typist.next_interval() * 1000000)
+
+            # Update (Game.update, estado PLAYING)
+            eyes_open = typist.update_eyes()
+            if eyes_open:
+                score.stop_eyes_closed()
+                walls.set_speed(current_wall_speed)
+            else:
+                score.start_eyes_closed()
+                walls.set_speed(WALL_SPEED_EYES_CLOSED)
+            walls.start_moving()
+            walls.update()
+            if walls.check_collision(player):
+                score.stop_eyes_closed()
+                return False, (now_us - start_us) / 1000000.0, errors, now_us
+            # La animación decide la máscara de colisión del próximo frame
+            player.danger_level = walls.danger_level()
+            player.update_animation("PLAYING", phrase.input_length > 0)
+
+    def play(self, profile_index, session_index, profile, seed):
+        """
+        Juega una sesión completa (hasta perder o terminar los niveles)
+        """
+        rng = random.Random(seed)
+        self.phrase_manager.seed(seed)
+        self.level_manager.reset()
+        self.score_manager.reset_game()
+        typist = SyntheticTypist(profile, rng)
+
+        results = []
+        now_us = 0
+        while True:
+            won, seconds, errors, now_us = self.play_level(typist, now_us)
+            score = self.score_manager
+            results.append((
+                profile_index, session_index, self.level_manager.get_level_number(), won, seconds,
+                score.level_score if won else 0, score.calculate_wpm(), score.calculate_accuracy(),
+                score.eyes_closed_time, errors
+            ))
+            if not won or not self.level_manager.next_level():
+                return results, now_us / 1000000.0
+
+
+def _init_worker():
+    _worker['session'] = HeadlessSession(PhraseManager())
+
+
+def run_batch(profile_index, profile, seeds):
+    """
+    Corre un lote de sesiones en un proceso del pool.
+    Retorna (resultados, segundos simulados, segundos de CPU)
+    """
+    if 'session' not in _worker:
+        _init_worker()
+    session = _worker['session']
+    start = time.process_time()
+    results = []
+    simulated = 0.0
+    for session_index, seed in seeds:
+        session_results, seconds = session.play(profile_index, session_index, profile, seed)
+        results.extend(session_results)
+        simulated += seconds
+    return results, simulated, time.process_time() - start
+
+
+def percentiles(values):
+    if len(values) == 0:
+        return None
+    p10, p50, p90 = np.percentile(values, [10, 50, 90])
+    return {'mean': round(float(np.mean(values)), 2), 'p10': round(float(p10), 2),
+            'p50': round(float(p50), 2), 'p90': round(float(p90), 2)}
+
+
+def aggregate(results, profile_names):
+    """
+    Agrega los resultados por perfil y nivel
+    """
+    data = np.array(results, dtype=np.float64).reshape(-1, len(RESULT_FIELDS))
+    column = {name: data[:, i] for i, name in enumerate(RESULT_FIELDS)}
+    summary = {}
+    for profile_index, name in enumerate(profile_names):
+        levels = {}
+        in_profile = column['profile'] == profile_index
+        for level in np.unique(column['level'][in_profile]).astype(int):
+            rows = in_profile & (column['level'] == level)
+            won = rows & (column['won'] == 1)
+            lost = rows & (column['won'] == 0)
+            levels[str(level)] = {
+                'played': int(rows.sum()),
+                'win_rate': round(float(won.sum() / rows.sum()), 3),
+                'time_to_collision': percentiles(column['seconds'][lost]),
+                'time_to_complete': percentiles(column['seconds'][won]),
+                'score': percentiles(column['score'][won]),
+                'wpm': percentiles(column['wpm'][rows]),
+                'eyes_closed_time': percentiles(column['eyes_closed_time'][rows]),
+                'errors': percentiles(column['errors'][rows]),
+            }
+        summary[name] = levels
+    return summary
+
+
+def simulate(profile_names, sessions, workers, seed=0, batch_size=50):
+    """
+    Reparte las sesiones de cada perfil en lotes sobre un ProcessPoolExecutor
+    """
+    start = time.perf_counter()
+    results = []
+    simulated = 0.0
+    cpu = 0.0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = []
+        for profile_index, name in enumerate(profile_names):
+            seeds = [(i, seed * 1000003 + profile_index * 10000019 + i) for i in range(sessions)]
+            for first in range(0, sessions, batch_size):
+                futures.append(pool.submit(run_batch, profile_index, TYPIST_PROFILES[name],
+                                           seeds[first:first + batch_size]))
+        for future in futures:
+            batch_results, batch_simulated, batch_cpu = future.result()
+            results.extend(batch_results)
+            simulated += batch_simulated
+            cpu += batch_cpu
+    elapsed = time.perf_counter() - start
+    return results, simulated, cpu, elapsed
+
+
+def soak(levels, draw_every=10, warmup=100, persist=False):
+    """
+    Prueba de resistencia del modo infinito: juega `levels` niveles generados con
+    el Game real (sin ventana, cámara simulada) y mide con tracemalloc cuánto
+    crece la memoria después del calentamiento (cachés de una sola vez).
+    persist: también guarda puntajes y telemetría (en los directorios de config)
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import pygame
+    from config import PERFORMANCE_PRESETS
+    from main import Game
+    from session_recorder import FakeCamera, FLAG_EYES_OPEN, FLAG_FACE_DETECTED, FLAG_FRAME_OK
+
+    camera = FakeCamera(FLAG_EYES_OPEN | FLAG_FACE_DETECTED | FLAG_FRAME_OK)
+    game = Game(('high', dict(PERFORMANCE_PRESETS['high'])), camera, persist=persist, endless=True)
+    now_us = 0
+    game_clock.advance(now_us)
+    game.start_session(0)
+    space = [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, unicode=' ', mod=0)]
+
+    def frame(events=(), skip_us=FRAME_US):
+        nonlocal now_us
+        now_us += skip_us
+        game.step(list(events), now_us)
+
+    checkpoints = []
+    baseline = None
+    lost = 0
+    start = time.perf_counter()
+    for played in range(1, levels + 1):
+        # Memorización de una vez; luego dos teclas por frame
+        frame(skip_us=TOLERANCE_TIME * 1000000)
+        phrase = game.current_phrase
+        for i in range(0, len(phrase), 2):
+            if game.game_state != "PLAYING":
+                break
+            frame(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a, unicode=char, mod=0)
+                  for char in phrase[i:i + 2])
+            if played % draw_every == 0 and i == 0:
+                game.draw()
+        if game.game_state == "GAME_OVER":
+            lost += 1
+        # Pantalla de nivel completado (precálculo) y siguiente nivel
+        frame()
+        if played % draw_every == 0:
+            game.draw()
+        frame(space)
+
+        if played == warmup:
+            tracemalloc.start()
+            baseline = tracemalloc.take_snapshot()
+        if played > warmup and (played - warmup) % max(1, (levels - warmup) // 10) == 0:
+            current, peak = tracemalloc.get_traced_memory()
+            checkpoints.append((played, current, peak))
+            print(f"  nivel {played:>6}: {current / 1024:8.1f} KB en uso desde el calentamiento "
+                  f"(pico {peak / 1024:.1f} KB)")
+    elapsed = time.perf_counter() - start
+
+    if baseline is None:
+        print("[ERROR] Muy pocos niveles para medir después del calentamiento")
+        return None
+    final = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    growth = final.compare_to(baseline, 'lineno')
+    print(f"[OK] {levels} niveles en {elapsed:.1f}s (llegó al nivel {game.level_manager.get_level_number()}, "
+          f"{lost} perdidos)")
+    first, last = checkpoints[0], checkpoints[-1]
+    per_thousand = (last[1] - first[1]) / max(1, last[0] - first[0]) * 1000
+    print(f"[OK] Crecimiento entre controles: {per_thousand / 1024:.2f} KB cada 1000 niveles")
+    print("  Mayores diferencias desde el calentamiento:")
+    for stat in growth[:5]:
+        print(f"    {stat}")
+    if persist:
+        import telemetry
+        if game.game_state != "GAME_OVER":
+            game.end_game("GAME_OVER")
+        for close in game.shutdown_tasks():
+            close()
+        records = telemetry.read_all()
+        print(f"[OK] Telemetría: {len(records)} niveles, puntaje total final "
+              f"{records[-1]['total_score'] if records else 0}")
+    return checkpoints
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulación sin pantalla de partidas con jugadores sintéticos")
+    parser.add_argument('--sessions', type=int, default=1000, help="sesiones por perfil")
+    parser.add_argument('--profile', default='all', choices=['all'] + list(TYPIST_PROFILES))
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='simulation_results.json')
+    parser.add_argument('--soak', type=int, metavar='NIVELES',
+                        help="prueba de memoria del modo infinito (p. ej. 10000 niveles)")
+    parser.add_argument('--persist', action='store_true',
+                        help="con --soak, guardar también puntajes y telemetría")
+    args = parser.parse_args()
+
+    if args.soak:
+        soak(args.soak, persist=args.persist)
+        raise SystemExit(0)
+
+    names = list(TYPIST_PROFILES) if args.profile == 'all' else [args.profile]
+    all_results, simulated_seconds, cpu_seconds, wall_seconds = simulate(
+        names, args.sessions, args.workers, args.seed
+    )
+    report = {
+        'sessions_per_profile': args.sessions,
+        'seed': args.seed,
+        'profiles': {name: TYPIST_PROFILES[name] for name in names},
+        'simulated_seconds': round(simulated_seconds, 1),
+        'elapsed_seconds': round(wall_seconds, 2),
+        'speedup_per_core': round(simulated_seconds / max(cpu_seconds, 1e-9)),
+        'levels': aggregate(all_results, names),
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"[OK] {len(names) * args.sessions} sesiones ({simulated_seconds / 3600:.1f} h de juego) "
+          f"en {wall_seconds:.1f}s con {args.workers} procesos; "
+          f"{report['speedup_per_core']}x tiempo real por núcleo")
+    for name in names:
+        rates = ', '.join(f"N{level} {stats['win_rate'] * 100:.0f}%" for level, stats in report['levels'][name].items())
+        print(f"  {name}: {rates}")
+    print(f"[OK] Resultados en {args.out}")
@@ -0,0 +1,720 @@
+import argparse
+import math
+import queue
+import socket
+import struct
+import threading
+import time
+from types import SimpleNamespace
+
+import pygame
+
+from config import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, WHITE, REFERENCE_FPS,
+    SPECTATOR_HOST, SPECTATOR_PORT, SPECTATOR_KEYFRAME_INTERVAL, SPECTATOR_QUEUE_FRAMES
+)
+from player import SPRITE_CONFIG
+
+# Protocolo (little-endian), un flujo por espectador:
+#   saludo: magic 'NMSP', versión u16
+#   mensajes: longitud u16 + tipo u8 (keyframe/delta) + frame u32 + máscara u16
+#             + los campos marcados en la máscara: SCALAR_FIELDS y luego BIT_PHRASE...
+# Un keyframe trae todos los campos; un delta solo los que cambiaron desde el
+# frame anterior. El visor ignora deltas hasta el primer keyframe y ante un
+# salto de frame (mensajes descartados) espera el siguiente
+SPECTATOR_MAGIC = b'NMSP'
+SPECTATOR_VERSION = 2
+HELLO = struct.Struct('<4sH')
+LENGTH = struct.Struct('<H')
+MESSAGE = struct.Struct('<BIH')
+TEXT = struct.Struct('<H')
+TYPED = struct.Struct('<HHH')  # caracteres conservados, caracteres nuevos, bytes UTF-8 nuevos
+WALL = struct.Struct('<hhHH')
+WALL_MOVE = struct.Struct('<bb')
+COUNT = struct.Struct('<H')  # cantidad de paredes
+
+KEYFRAME = 1
+DELTA = 2
+
+GAME_STATES = ("MENU", "MEMORIZING", "PLAYING", "PAUSED", "LEVEL_COMPLETE", "GAME_OVER", "GAME_COMPLETE")
+ANIMATIONS = tuple(SPRITE_CONFIG)
+NO_VALUE = 0xFFFF  # impacto sin choque previsto
+
+# Campos numéricos (ya cuantizados al capturarlos) y su formato
+SCALAR_FIELDS = (
+    ('game_state', struct.Struct('<B')),
+    ('level', struct.Struct('<H')),
+    ('score', struct.Struct('<I')),
+    ('combo', struct.Struct('<H')),
+    ('wpm', struct.Struct('<H')),
+    ('danger', struct.Struct('<B')),  # 0-255
+    ('animation', struct.Struct('<B')),
+    ('frame', struct.Struct('<B')),
+    ('alive', struct.Struct('<B')),
+    ('countdown', struct.Struct('<H')),  # centésimas de segundo
+    ('impact', struct.Struct('<H')),  # centésimas de segundo o NO_VALUE
+)
+BIT_PHRASE = 1 << len(SCALAR_FIELDS)
+BIT_TYPED = BIT_PHRASE << 1
+BIT_WALLS = BIT_TYPED << 1  # posición y tamaño de todas las paredes
+BIT_WALLS_MOVE = BIT_WALLS << 1  # solo el desplazamiento (i8) de cada pared
+
+
+def parse_address(address):
+    """
+    'host:puerto' (o solo 'puerto') -> (host, puerto); sin host, SPECTATOR_HOST
+    """
+    host, _, port = str(address).rpartition(':')
+    return host or SPECTATOR_HOST, int(port)
+
+
+def _clamp(value, high):
+    return min(max(int(value), 0), high)
+
+
+def _i16(value):
+    return min(max(value, -32768), 32767)
+
+
+def _centis(seconds):
+    if seconds is None or not math.isfinite(seconds):
+        return NO_VALUE
+    return _clamp(round(seconds * 100), NO_VALUE - 1)
+
+
+def capture_state(game):
+    """
+    Estado visible del juego en este frame, cuantizado a lo que se transmite
+    """
+    player = game.player
+    score = game.score_manager
+    playing = game.game_state == "PLAYING"
+    return {
+        'game_state': GAME_STATES.index(game.game_state),
+        'level': _clamp(game.level_manager.get_level_number(), 0xFFFF),
+        'score': _clamp(score.total_score, 0xFFFFFFFF),
+        'combo': _clamp(score.combo, 0xFFFF),
+        'wpm': _clamp(round(score.get_live_wpm()), 0xFFFF),
+        'danger': _clamp(round(player.danger_level * 255), 255),
+        'animation': ANIMATIONS.index(player.current_animation),
+        'frame': _clamp(player.frame_index, 255),
+        'alive': int(player.is_alive),
+        'countdown': _centis(game.tolerance_timer),
+        'impact': _centis(game.walls.seconds_until_impact() if playing else None),
+        'phrase': game.current_phrase,
+        'typed': ''.join(game.phrase_manager.chars),
+        'flags': bytes(game.phrase_manager.correct_flags),
+        'walls': tuple((_i16(rect.x), _i16(rect.y), rect.width, rect.height) for rect in game.walls.get_rects()),
+    }
+
+
+def _pack_text(text):
+    data = text.encode('utf-8')
+    return TEXT.pack(len(data)) + data
+
+
+def _common_prefix(a, b):
+    length = min(len(a), len(b))
+    for i in range(length):
+        if a[i] != b[i]:
+            return i
+    return length
+
+
+def _pack_walls(walls):
+    return COUNT.pack(len(walls)) + b''.join(WALL.pack(*wall) for wall in walls)
+
+
+def _wall_moves(walls, previous):
+    """
+    Desplazamientos (dx, dy) si solo cambiaron las posiciones y entran en i8; si no, None
+    """
+    if len(walls) != len(previous):
+        return None
+    moves = []
+    for (x, y, w, h), (px, py, pw, ph) in zip(walls, previous):
+        dx, dy = x - px, y - py
+        if w != pw or h != ph or not (-128 <= dx <= 127 and -128 <= dy <= 127):
+            return None
+        moves.append((dx, dy))
+    return moves
+
+
+class StateEncoder:
+    def __init__(self, keyframe_interval=SPECTATOR_KEYFRAME_INTERVAL):
+        """
+        Codifica cada frame como delta contra el anterior, con un keyframe
+        cada keyframe_interval frames
+        """
+        self.keyframe_interval = keyframe_interval
+        self.previous = None
+        self.frame = -1
+
+    def encode(self, state):
+        """
+        Codifica el frame siguiente. Retorna (mensaje, es_keyframe)
+        """
+        self.frame += 1
+        keyframe = self.previous is None or self.frame % self.keyframe_interval == 0
+        message = self._encode(state, None if keyframe else self.previous)
+        self.previous = state
+        return message, keyframe
+
+    def keyframe(self):
+        """
+        Keyframe del último frame codificado (para un espectador que se conecta)
+        """
+        return self._encode(self.previous, None)
+
+    def _encode(self, state, previous):
+        mask = 0
+        parts = []
+        for bit, (name, packer) in enumerate(SCALAR_FIELDS):
+            if previous is None or state[name] != previous[name]:
+                mask |= 1 << bit
+                parts.append(packer.pack(state[name]))
+
+        if previous is None or state['phrase'] != previous['phrase']:
+            mask |= BIT_PHRASE
+            parts.append(_pack_text(state['phrase']))
+
+        typed, flags = state['typed'], state['flags']
+        if previous is None or typed != previous['typed'] or flags != previous['flags']:
+            # Normalmente se agregó o borró un carácter: solo viaja lo nuevo
+            keep = 0
+            if previous is not None:
+                keep = min(_common_prefix(typed, previous['typed']), _common_prefix(flags, previous['flags']))
+            suffix = typed[keep:].encode('utf-8')
+            mask |= BIT_TYPED
+            parts.append(TYPED.pack(keep, len(typed) - keep, len(suffix)) + suffix + flags[keep:])
+
+        walls = state['walls']
+        if previous is None or walls != previous['walls']:
+            moves = None if previous is None else _wall_moves(walls, previous['walls'])
+            if moves is None:
+                mask |= BIT_WALLS
+                parts.append(_pack_walls(walls))
+            else:
+                mask |= BIT_WALLS_MOVE
+                parts.append(b''.join(WALL_MOVE.pack(dx, dy) for dx, dy in moves))
+
+        kind = KEYFRAME if previous is None else DELTA
+        body = MESSAGE.pack(kind, self.frame, mask) + b''.join(parts)
+        return LENGTH.pack(len(body)) + body
+
+
+class StateDecoder:
+    def __init__(self):
+        """
+        Reconstruye el estado desde el flujo de bytes (acepta trozos de cualquier tamaño)
+        """
+        self.buffer = bytearray()
+        self.greeted = False
+        self.state = None
+        self.frame = None
+        self.skipped = 0  # deltas ignorados esperando un keyframe
+
+    def feed(self, data):
+        """
+        Agrega bytes recibidos. Retorna la lista de frames completos aplicados
+        """
+        self.buffer += data
+        if not self.greeted:
+            if len(self.buffer) < HELLO.size:
+                return []
+            magic, version = HELLO.unpack_from(self.buffer, 0)
+            if magic != SPECTATOR_MAGIC or version != SPECTATOR_VERSION:
+                raise ValueError(f"no es un flujo de espectador (versión {SPECTATOR_VERSION})")
+            del self.buffer[:HELLO.size]
+            self.greeted = True
+
+        frames = []
+        position = 0
+        while position + LENGTH.size <= len(self.buffer):
+            (length,) = LENGTH.unpack_from(self.buffer, position)
+            end = position + LENGTH.size + length
+            if end > len(self.buffer):
+                break
+            if self._apply(memoryview(self.buffer)[position + LENGTH.size:end]):
+                frames.append(self.frame)
+            position = end
+        del self.buffer[:position]
+        return frames
+
+    def _apply(self, body):
+        kind, frame, mask = MESSAGE.unpack_from(body, 0)
+        if kind == DELTA and (self.state is None or frame != self.frame + 1):
+            self.skipped += 1
+            return False
+        state = {} if kind == KEYFRAME else self.state
+        position = MESSAGE.size
+
+        for bit, (name, packer) in enumerate(SCALAR_FIELDS):
+            if mask & (1 << bit):
+                (state[name],) = packer.unpack_from(body, position)
+                position += packer.size
+
+        if mask & BIT_PHRASE:
+            (length,) = TEXT.unpack_from(body, position)
+            position += TEXT.size
+            state['phrase'] = bytes(body[position:position + length]).decode('utf-8')
+            position += length
+
+        if mask & BIT_TYPED:
+            keep, count, size = TYPED.unpack_from(body, position)
+            position += TYPED.size
+            suffix = bytes(body[position:position + size]).decode('utf-8')
+            position += size
+            flags = bytes(body[position:position + count])
+            position += count
+            if kind == KEYFRAME:
+                state['typed'], state['flags'] = suffix, flags
+            else:
+                state['typed'] = state['typed'][:keep] + suffix
+                state['flags'] = state['flags'][:keep] + flags
+
+        if mask & BIT_WALLS:
+            (count,) = COUNT.unpack_from(body, position)
+            position += COUNT.size
+            walls = []
+            for _ in range(count):
+                walls.append(WALL.unpack_from(body, position))
+                position += WALL.size
+            state['walls'] = tuple(walls)
+        elif mask & BIT_WALLS_MOVE:
+            walls = []
+            for x, y, w, h in state['walls']:
+                dx, dy = WALL_MOVE.unpack_from(body, position)
+                position += WALL_MOVE.size
+                walls.append((x + dx, y + dy, w, h))
+            state['walls'] = tuple(walls)
+
+        self.state = state
+        self.frame = frame
+        return True
+
+
+class LoopbackClient:
+    def __init__(self):
+        """
+        Espectador en el mismo proceso (sin sockets): decodifica lo que recibe
+        """
+        self.decoder = StateDecoder()
+        self.needs_keyframe = True
+        self.bytes_sent = 0
+        self.decode_seconds = 0.0
+        self.closed = False
+        self.send(HELLO.pack(SPECTATOR_MAGIC, SPECTATOR_VERSION))
+
+    def send(self, data):
+        start = time.perf_counter()
+        self.bytes_sent += len(data)
+        self.decoder.feed(data)
+        self.decode_seconds += time.perf_counter() - start
+
+    def close(self):
+        self.closed = True
+
+
+class TcpClient:
+    def __init__(self, connection, address, backlog=SPECTATOR_QUEUE_FRAMES):
+        """
+        Espectador conectado por TCP: send() solo encola y un hilo escribe en
+        el socket, así un espectador lento no frena el juego
+        """
+        self.connection = connection
+        self.address = address
+        self.queue = queue.Queue(backlog)
+        self.needs_keyframe = True
+        self.bytes_sent = 0
+        self.closed = False
+        self.queue.put(HELLO.pack(SPECTATOR_MAGIC, SPECTATOR_VERSION))
+        self.writer = threading.Thread(target=self._write_loop, name="spectator-writer", daemon=True)
+        self.writer.start()
+
+    def send(self, data):
+        try:
+            self.queue.put_nowait(data)
+            self.bytes_sent += len(data)
+        except queue.Full:
+            # Muy atrasado: descartar lo pendiente y continuar desde un keyframe
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.needs_keyframe = True
+
+    def _write_loop(self):
+        while True:
+            data = self.queue.get()
+            if data is None:
+                break
+            try:
+                self.connection.sendall(data)
+            except OSError:
+                break
+        self.closed = True
+        self.connection.close()
+
+    def close(self):
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            self.connection.close()
+
+
+class SpectatorBroadcaster:
+    def __init__(self, keyframe_interval=SPECTATOR_KEYFRAME_INTERVAL):
+        """
+        Publica el estado del juego a los espectadores conectados y mide
+        el costo de serialización y los bytes enviados
+        """
+        self.encoder = StateEncoder(keyframe_interval)
+        self.clients = []
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.keyframes = 0
+        self.keyframe_bytes = 0
+        self.delta_bytes = 0
+        self.serialize_seconds = 0.0
+        self.failed = False  # el estado no entró en el protocolo: se dejó de publicar
+
+    def add_client(self, client):
+        with self.lock:
+            self.clients.append(client)
+
+    def publish(self, game):
+        """
+        Captura y envía el frame actual (llamado una vez por frame desde Game.step)
+        """
+        if self.failed:
+            return
+        start = time.perf_counter()
+        state = capture_state(game)
+        try:
+            message, keyframe = self.encoder.encode(state)
+        except struct.error as e:
+            # Un campo no entra en su tamaño (p. ej. un mensaje de más de 64 KB):
+            # se desconecta a los espectadores en lugar de cortar el juego
+            print(f"[ERROR] El estado no entra en el protocolo de espectadores ({e}); se dejan de publicar")
+            self.failed = True
+            self.close()
+            return
+        self.serialize_seconds += time.perf_counter() - start
+        self.frames += 1
+        if keyframe:
+            self.keyframes += 1
+            self.keyframe_bytes += len(message)
+        else:
+            self.delta_bytes += len(message)
+
+        with self.lock:
+            self.clients = [client for client in self.clients if not client.closed]
+            clients = list(self.clients)
+        resync = None
+        for client in clients:
+            if client.needs_keyframe and not keyframe:
+                if resync is None:
+                    resync = self.encoder.keyframe()
+                client.needs_keyframe = False
+                client.send(resync)
+            else:
+                client.needs_keyframe = False
+                client.send(message)
+
+    def report(self, fps=REFERENCE_FPS):
+        """
+        Costo por frame y ancho de banda por espectador (promedios)
+        """
+        frames = max(1, self.frames)
+        deltas = max(1, self.frames - self.keyframes)
+        bytes_per_frame = (self.keyframe_bytes + self.delta_bytes) / frames
+        return {
+            'frames': self.frames,
+            'keyframes': self.keyframes,
+            'keyframe_bytes': self.keyframe_bytes / max(1, self.keyframes),
+            'delta_bytes': self.delta_bytes / deltas,
+            'bytes_per_frame': bytes_per_frame,
+            'kbit_per_second': bytes_per_frame * fps * 8 / 1000,
+            'serialize_us': self.serialize_seconds * 1000000 / frames,
+        }
+
+    def close(self):
+        with self.lock:
+            clients, self.clients = self.clients, []
+        for client in clients:
+            client.close()
+
+
+class SpectatorServer(SpectatorBroadcaster):
+    def __init__(self, host=SPECTATOR_HOST, port=SPECTATOR_PORT, keyframe_interval=SPECTATOR_KEYFRAME_INTERVAL):
+        """
+        Acepta espectadores por TCP en un hilo; cada uno recibe un keyframe al conectarse
+        """
+        super().__init__(keyframe_interval)
+        self.socket = socket.create_server((host, port))
+        self.port = self.socket.getsockname()[1]
+        self.acceptor = threading.Thread(target=self._accept_loop, name="spectator-accept", daemon=True)
+        self.acceptor.start()
+        print(f"[OK] Servidor de espectadores en {host}:{self.port}")
+
+    def _accept_loop(self):
+        while True:
+            try:
+                connection, address = self.socket.accept()
+            except OSError:
+                break
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.add_client(TcpClient(connection, address))
+            print(f"[OK] Espectador conectado: {address[0]}:{address[1]}")
+
+    def close(self):
+        self.socket.close()
+        super().close()
+
+
+class LoopbackSpectator(SpectatorBroadcaster):
+    def __init__(self, keyframe_interval=SPECTATOR_KEYFRAME_INTERVAL):
+        """
+        Reemplazo sin red para pruebas: un solo espectador en el mismo proceso
+        """
+        super().__init__(keyframe_interval)
+        self.client = LoopbackClient()
+        self.add_client(self.client)
+
+    @property
+    def state(self):
+        return self.client.decoder.state
+
+
+class SpectatorViewer:
+    def __init__(self, surface):
+        """
+        Dibuja un estado reconstruido con los mismos elementos que Game.draw
+        (sin partículas ni screen shake, que no se transmiten)
+        """
+        from effects import ColorManager
+        from floor import Floor
+        from player import Player
+        from ui import UI
+        self.surface = surface
+        self.ui = UI(surface)
+        self.player = Player(load_sprites=False)
+        self.floor = Floor()
+        self.color_manager = ColorManager()
+
+    def render(self, state):
+        from effects import draw_glow_rect, draw_glow_text
+        surface = self.surface
+        game_state = GAME_STATES[state['game_state']]
+        danger = state['danger'] / 255
+        self.color_manager.set_danger_level(danger)
+        surface.fill(self.color_manager.get_background_color())
+        self.floor.draw(surface)
+
+        wall_color = self.color_manager.get_wall_color()
+        screen_rect = surface.get_rect()
+        for wall in state['walls']:
+            rect = pygame.Rect(wall)
+            if rect.colliderect(screen_rect):
+                draw_glow_rect(surface, wall_color, rect, glow_size=5)
+
+        player = self.player
+        player.current_animation = ANIMATIONS[state['animation']]
+        player.frame_index = min(state['frame'], len(player.animations[player.current_animation]) - 1)
+        player.danger_level = danger
+        player.is_alive = bool(state['alive'])
+        player.draw(surface)
+
+        if game_state in ("PLAYING", "MEMORIZING", "PAUSED"):
+            impact = None if state['impact'] == NO_VALUE else state['impact'] / 100
+            self.ui.draw_hud(state['level'], state['score'], state['combo'], state['wpm'], impact)
+
+        if game_state == "MENU":
+            self.ui.draw_menu()
+        elif game_state == "MEMORIZING":
+            self.ui.draw_phrase(state['phrase'], show=True)
+            self.ui.draw_countdown(state['countdown'] / 100)
+            self.ui.draw_instructions()
+        elif game_state == "PLAYING":
+            self.ui.draw_phrase(state['phrase'], show=True)
+            typed = SimpleNamespace(chars=state['typed'], correct_flags=state['flags'],
+                                    input_length=len(state['typed']))
+            self.ui.draw_user_input_with_feedback(typed)
+            self.ui.draw_danger_indicator(danger)
+        elif game_state == "PAUSED":
+            self.ui.draw_paused()
+        elif game_state == "LEVEL_COMPLETE":
+            draw_glow_text(surface, self.ui.title_font, f"NIVEL {state['level']} COMPLETADO",
+                           (WINDOW_WIDTH // 2, 150), WHITE, glow_size=4)
+            draw_glow_text(surface, self.ui.font, f"Puntuación Total: {state['score']}",
+                           (WINDOW_WIDTH // 2, 260), WHITE, glow_size=0)
+        elif game_state == "GAME_OVER":
+            self.ui.draw_game_over()
+        elif game_state == "GAME_COMPLETE":
+            self.ui.draw_game_complete(state['score'])
+
+
+def view(host, port, frames=None, snapshot=None):
+    """
+    Visor: se conecta al servidor, reconstruye el estado y lo dibuja.
+    Con SDL_VIDEODRIVER=dummy funciona sin pantalla (snapshot guarda el último frame)
+    """
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("No Mires - Espectador")
+    viewer = SpectatorViewer(screen)
+    decoder = StateDecoder()
+    connection = socket.create_connection((host, port))
+    received = 0
+    rendered = 0
+    try:
+        while frames is None or rendered < frames:
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                break
+            data = connection.recv(65536)
+            if not data:
+                break
+            received += len(data)
+            # Solo se dibuja el último estado recibido: si el visor se atrasa no acumula
+            if decoder.feed(data):
+                viewer.render(decoder.state)
+                pygame.display.flip()
+                rendered += 1
+    finally:
+        connection.close()
+    if snapshot and decoder.state is not None:
+        pygame.image.save(screen, snapshot)
+    print(f"[OK] {rendered} frames dibujados, {received / 1024:.1f} KB recibidos, "
+          f"{decoder.skipped} deltas descartados")
+    pygame.quit()
+
+
+def _scripted_events(game, frame, script):
+    """
+    Jugador simulado para el benchmark: escribe la frase con algún error,
+    avanza de nivel y reinicia al perder
+    """
+    state = game.game_state
+    if state == "PLAYING":
+        if script.get('started') != game.start_ticks:
+            # Nivel nuevo (o reiniciado): empezar la frase desde el principio
+            script.update(started=game.start_ticks, index=0, mistakes=set(), erase=False)
+        if frame % 4 == 0 and script['index'] < len(game.current_phrase):
+            index = script['index']
+            if script['erase']:
+                script['erase'] = False
+                return [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_BACKSPACE, unicode='\b', mod=0)]
+            if index % 15 == 7 and index not in script['mistakes']:
+                script['mistakes'].add(index)
+                script['erase'] = True
+                return [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_x, unicode='#', mod=0)]
+            script['index'] += 1
+            char = game.current_phrase[index]
+            return [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a, unicode=char, mod=0)]
+    elif state in ("LEVEL_COMPLETE", "GAME_OVER", "GAME_COMPLETE", "MENU") and frame % 45 == 0:
+        return [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, unicode=' ', mod=0)]
+    return []
+
+
+class _TcpReader:
+    def __init__(self, port):
+        """
+        Espectador TCP del benchmark: lee y decodifica en un hilo hasta que se cierre
+        """
+        self.connection = socket.create_connection(('127.0.0.1', port))
+        self.decoder = StateDecoder()
+        self.received = 0
+        self.thread = threading.Thread(target=self._read_loop, daemon=True)
+        self.thread.start()
+
+    def _read_loop(self):
+        while True:
+            data = self.connection.recv(65536)
+            if not data:
+                break
+            self.received += len(data)
+            self.decoder.feed(data)
+        self.connection.close()
+
+
+def benchmark(frames=3600, tcp_clients=2):
+    """
+    Partida simulada (reloj virtual) publicada a un espectador loopback,
+    verificando que cada frame reconstruido sea idéntico al capturado, y a
+    varios espectadores por TCP local
+    """
+    from main import Game
+    from session_recorder import FakeCamera, FLAG_EYES_OPEN, FLAG_FACE_DETECTED, FLAG_FRAME_OK
+
+    camera = FakeCamera(FLAG_EYES_OPEN | FLAG_FACE_DETECTED | FLAG_FRAME_OK)
+    game = Game(camera=camera, persist=False)
+    game.start_session(0)
+    server = SpectatorServer('127.0.0.1', 0)
+    loopback = LoopbackClient()
+    server.add_client(loopback)
+    readers = [_TcpReader(server.port) for _ in range(tcp_clients)]
+    deadline = time.monotonic() + 5
+    while len(server.clients) < tcp_clients + 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    game.spectator = server
+
+    viewer = SpectatorViewer(pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)))
+    script = {}
+    mismatches = 0
+    render_seconds = 0.0
+    renders = 0
+    frame_us = 1000000 // game.fps
+    for frame in range(frames):
+        # Ojos cerrados un tercio del tiempo para variar la velocidad de las paredes
+        flags = FLAG_FACE_DETECTED | FLAG_FRAME_OK | (FLAG_EYES_OPEN if (frame // 40) % 3 else 0)
+        camera.load_frame(flags)
+        game.step(_scripted_events(game, frame, script), (frame + 1) * frame_us)
+        if loopback.decoder.state != capture_state(game):
+            mismatches += 1
+        if frame % 30 == 0:
+            start = time.perf_counter()
+            viewer.render(loopback.decoder.state)
+            render_seconds += time.perf_counter() - start
+            renders += 1
+
+    game.spectator = None
+    expected = capture_state(game)
+    server.close()
+    for reader in readers:
+        reader.thread.join(timeout=5)
+    tcp_ok = sum(1 for reader in readers if reader.decoder.state == expected)
+
+    report = server.report(game.fps)
+    print(f"  {report['frames']} frames, {report['keyframes']} keyframes "
+          f"(cada {server.encoder.keyframe_interval} frames), frames distintos al capturado: {mismatches}")
+    print(f"  Keyframe (estado completo): {report['keyframe_bytes']:.0f} B  delta medio: {report['delta_bytes']:.1f} B")
+    print(f"  Por espectador: {report['bytes_per_frame']:.1f} B/frame = "
+          f"{report['kbit_per_second']:.1f} kbit/s a {game.fps} FPS")
+    print(f"  Captura + serialización: {report['serialize_us']:.1f} µs/frame  "
+          f"decodificación: {loopback.decode_seconds * 1000000 / max(1, report['frames']):.1f} µs/frame  "
+          f"visor: {render_seconds * 1000 / max(1, renders):.2f} ms/frame dibujado")
+    print(f"  TCP local: {tcp_ok}/{tcp_clients} espectadores con el estado final idéntico, "
+          f"{sum(reader.received for reader in readers) / max(1, tcp_clients) / 1024:.1f} KB cada uno")
+    pygame.quit()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Espectadores: visor y benchmark")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    view_parser = subparsers.add_parser('view', help="conectarse a una partida")
+    view_parser.add_argument('--host', default='127.0.0.1')
+    view_parser.add_argument('--port', type=int, default=SPECTATOR_PORT)
+    view_parser.add_argument('--frames', type=int, help="terminar después de N frames dibujados")
+    view_parser.add_argument('--snapshot', metavar='PNG', help="guardar el último frame dibujado")
+    bench_parser = subparsers.add_parser('bench', help="ancho de banda y costo por frame")
+    bench_parser.add_argument('--frames', type=int, default=3600)
+    bench_parser.add_argument('--clients', type=int, default=2, help="espectadores TCP")
+    args = parser.parse_args()
+    if args.command == 'view':
+        view(args.host, args.port, args.frames, args.snapshot)
+    else:
+        benchmark(args.frames, args.clients)
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pygame
+
+from config import CACHE_DIR, MIXER_FREQUENCY
+
+# Frecuencia a la que se generan las formas de onda (la misma del mixer)
+SYNTH_SAMPLE_RATE = MIXER_FREQUENCY
+
+# Subir este número invalida los PCM guardados (p. ej. si cambia render())
+SYNTH_VERSION = 1
+SOUND_CACHE_DIR = os.path.join(CACHE_DIR, 'sounds')
+
+# Sonidos procedurales. Añadir un sonido nuevo = añadir una entrada.
+#   duration: segundos
+#   oscillators: lista de (forma, frecuencia Hz, amplitud), se suman
+#   envelope: ('fade', caida) -> baja linealmente de 1.0 a 1.0 - caida
+#             ('ar', ataque, release) -> sube hasta la fracción ataque y baja a 0
+#             desde la fracción release hasta el final
+SOUND_DEFINITIONS = {
+    # Beep de error: onda cuadrada grave para un sonido más "duro"
+    'error': {
+        'duration': 0.1,
+        'oscillators': [('square', 400, 0.3)],
+        'envelope': ('fade', 0.7),
+    },
+    # Minúsculas: tono medio-bajo, suave (La + Do#)
+    'lowercase': {
+        'duration': 0.06,
+        'oscillators': [('sine', 440, 0.12), ('sine', 550, 0.06)],
+        'envelope': ('ar', 0.15, 0.6),
+    },
+    # Mayúsculas: tono alto, brillante, con ataque rápido
+    'uppercase': {
+        'duration': 0.07,
+        'oscillators': [('sine', 880, 0.10), ('sine', 1047, 0.08), ('sine', 1319, 0.05)],
+        'envelope': ('ar', 0.05, 0.65),
+    },
+}
+
+
+def oscillator(shape, frequency, amplitude, index, sample_rate):
+    """
+    Genera una forma de onda para los índices de muestra dados
+    """
+    if shape == 'sine':
+        t = index / sample_rate
+        return np.sin(2 * np.pi * frequency * t) * amplitude
+    if shape == 'square':
+        # Semiperiodo entero en muestras
+        half_period = max(1, sample_rate // frequency // 2)
+        return np.where((index // half_period) % 2 == 0, amplitude, -amplitude)
+    raise ValueError(f"Forma de onda desconocida: {shape}")
+
+
+def envelope(spec, index, samples):
+    """
+    Genera la envolvente de amplitud para los índices de muestra dados
+    """
+    kind = spec[0]
+    if kind == 'fade':
+        return 1.0 - (index / samples) * spec[1]
+    if kind == 'ar':
+        attack_end = samples * spec[1]
+        release_start = samples * spec[2]
+        env = np.ones(samples)
+        attack = index < attack_end
+        env[attack] = index[attack] / attack_end
+        release = index > release_start
+        env[release] = 1.0 - (index[release] - release_start) / (samples - release_start)
+        return env
+    raise ValueError(f"Envolvente desconocida: {kind}")
+
+
+def render(definition, channels=2, sample_rate=SYNTH_SAMPLE_RATE):
+    """
+    Genera el PCM int16 de un sonido procedural
+
+    Returns:
+        Array (muestras,) si channels == 1, si no (muestras, channels)
+    """
+    samples = int(sample_rate * definition['duration'])
+    index = np.arange(samples)
+
+    value = np.zeros(samples)
+    for shape, frequency, amplitude in definition['oscillators']:
+        value += oscillator(shape, frequency, amplitude, index, sample_rate)
+    value *= envelope(definition['envelope'], index, samples)
+
+    # astype trunca hacia cero, igual que int()
+    mono = (value * 32767).astype(np.int16)
+    if channels == 1:
+        return mono
+    return np.repeat(mono[:, None], channels, axis=1)
+
+
+def _mixer_format():
+    """
+    Retorna (frecuencia, tamaño, canales) del mixer inicializado
+    """
+    mixer_format = pygame.mixer.get_init()
+    if mixer_format is None:
+        raise RuntimeError("pygame.mixer no está inicializado")
+    return mixer_format
+
+
+def _cache_path(name, key_data):
+    key = hashlib.sha1(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(SOUND_CACHE_DIR, f"{name}-{key}.npy")
+
+
+def _load_cached(path):
+    if os.path.exists(path):
+        try:
+            return np.load(path)
+        except (OSError, ValueError):
+            return None
+    return None
+
+
+def _save_cached(path, pcm):
+    try:
+        os.makedirs(SOUND_CACHE_DIR, exist_ok=True)
+        np.save(path, pcm)
+    except OSError as e:
+        print(f"[ERROR] No se pudo guardar {path}: {e}")
+
+
+def get_pcm(name, mixer_format=None):
+    """
+    Retorna el PCM de un sonido de SOUND_DEFINITIONS, desde la caché si existe
+    """
+    mixer_format = mixer_format or _mixer_format()
+    definition = SOUND_DEFINITIONS[name]
+    path = _cache_path(name, [SYNTH_VERSION, SYNTH_SAMPLE_RATE, definition, list(mixer_format)])
+
+    pcm = _load_cached(path)
+    if pcm is None:
+        pcm = render(definition, channels=mixer_format[2])
+        _save_cached(path, pcm)
+    return pcm
+
+
+def get_file_pcm(path, mixer_format=None):
+    """
+    Retorna el PCM decodificado de un archivo de audio (mp3, ogg, wav...),
+    desde la caché si el archivo no cambió
+    """
+    mixer_format = mixer_format or _mixer_format()
+    stat = os.stat(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_file = _cache_path(name, [SYNTH_VERSION, os.path.abspath(path), stat.st_size,
+                                    int(stat.st_mtime), list(mixer_format)])
+
+    pcm = _load_cached(cache_file)
+    if pcm is None:
+        pcm = pygame.sndarray.array(pygame.mixer.Sound(path))
+        _save_cached(cache_file, pcm)
+    return pcm
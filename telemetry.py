@@ -0,0 +1,251 @@
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+
+from config import TELEMETRY_DIR, TELEMETRY_MAX_BYTES, TELEMETRY_BACKUPS, TELEMETRY_FLUSH_INTERVAL
+
+# Formato del log (little-endian):
+#   cabecera del archivo: magic 'NMTL', versión u16
+#   registros: longitud u16 + CRC32 u32 del contenido + contenido (RECORD)
+# La longitud permite agregar campos al final sin romper lectores viejos y el
+# CRC detecta un registro a medio escribir si el juego se cortó.
+# Versión 2: puntajes i64 (en el modo infinito el total crece ~cuadráticamente
+# con el nivel y pasaba de i32 cerca del nivel 2000)
+LOG_MAGIC = b'NMTL'
+LOG_VERSION = 2
+FILE_HEADER = struct.Struct('<4sH')
+FRAME = struct.Struct('<HI')
+RECORDS = {
+    1: struct.Struct('<dBHBfffiffHBHfiiHH'),
+    2: struct.Struct('<dBHBfffiffHBHfqqHH'),
+}
+RECORD = RECORDS[LOG_VERSION]
+
+RECORD_FIELDS = (
+    'timestamp', 'outcome', 'level', 'phrase_difficulty', 'target_difficulty',
+    'level_wall_speed', 'tolerance_time', 'phrase_id', 'wall_speed', 'penalized_speed',
+    'wpm', 'accuracy', 'max_combo', 'eyes_closed_time', 'level_score', 'total_score',
+    'typed_chars', 'correct_chars'
+)
+
+OUTCOMES = ('LEVEL_COMPLETE', 'GAME_OVER')
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+LOG_NAME = 'levels.log'
+
+
+def log_path(directory, index=0):
+    """
+    levels.log es el archivo activo; levels.1.log, levels.2.log... los rotados
+    """
+    if index == 0:
+        return os.path.join(directory, LOG_NAME)
+    return os.path.join(directory, f"levels.{index}.log")
+
+
+def encode_record(record):
+    """
+    Empaqueta un registro (dict con RECORD_FIELDS) con su longitud y CRC
+    """
+    values = dict(record)
+    values['outcome'] = OUTCOMES.index(values['outcome'])
+    difficulty = values['phrase_difficulty']
+    values['phrase_difficulty'] = DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else 255
+    if values['target_difficulty'] is None:
+        values['target_difficulty'] = -1.0
+    # Contadores u16: saturar en lugar de fallar (p. ej. WPM de una ráfaga instantánea)
+    for name in ('level', 'wpm', 'max_combo', 'typed_chars', 'correct_chars'):
+        values[name] = min(max(values[name], 0), 0xFFFF)
+    payload = RECORD.pack(*(values[name] for name in RECORD_FIELDS))
+    return FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_record(payload, version=LOG_VERSION):
+    values = dict(zip(RECORD_FIELDS, RECORDS[version].unpack_from(payload, 0)))
+    values['outcome'] = OUTCOMES[values['outcome']]
+    difficulty = values['phrase_difficulty']
+    values['phrase_difficulty'] = DIFFICULTIES[difficulty] if difficulty < len(DIFFICULTIES) else None
+    if values['target_difficulty'] < 0:
+        values['target_difficulty'] = None
+    return values
+
+
+class TelemetryLog:
+    def __init__(self, directory=TELEMETRY_DIR, max_bytes=TELEMETRY_MAX_BYTES,
+                 backups=TELEMETRY_BACKUPS, flush_interval=TELEMETRY_FLUSH_INTERVAL):
+        """
+        Log append-only de niveles jugados. append() solo empaqueta y encola;
+        un hilo escribe por lotes con fsync y rota los archivos
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.file = None
+        self.writer = threading.Thread(target=self._write_loop, name="telemetry-writer", daemon=True)
+        self.writer.start()
+
+    def append(self, record):
+        """
+        Encola un registro (no toca el disco)
+        """
+        self.queue.put(encode_record(record))
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = log_path(self.directory)
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(LOG_MAGIC, LOG_VERSION))
+            return
+        with open(path, 'rb') as f:
+            header = f.read(FILE_HEADER.size)
+        if len(header) == FILE_HEADER.size:
+            magic, version = FILE_HEADER.unpack(header)
+            if magic == LOG_MAGIC and version != LOG_VERSION:
+                # Log de una versión anterior: queda como rotado (se sigue leyendo)
+                self._rotate()
+                return
+        # Si el juego se cortó a mitad de un registro, descartar la cola dañada
+        # para que lo nuevo no quede detrás de ella
+        try:
+            with open(path, 'rb') as f:
+                _, valid_end = scan_log(f.read(), path)
+        except ValueError as e:
+            # No es un log nuestro: apartarlo y empezar uno nuevo
+            print(f"[ERROR] {e}")
+            self.file.close()
+            os.replace(path, path + '.bad')
+            self._open()
+            return
+        if valid_end < self.file.tell():
+            self.file.truncate(valid_end)
+            self.file.seek(valid_end)
+            if valid_end == 0:
+                self.file.write(FILE_HEADER.pack(LOG_MAGIC, LOG_VERSION))
+
+    def _rotate(self):
+        """
+        levels.log -> levels.1.log -> levels.2.log...; el más viejo se descarta
+        """
+        self.file.close()
+        self.file = None
+        oldest = log_path(self.directory, self.backups)
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for index in range(self.backups - 1, -1, -1):
+            path = log_path(self.directory, index)
+            if os.path.exists(path):
+                os.replace(path, log_path(self.directory, index + 1))
+        self._open()
+
+    def _write_batch(self, batch):
+        data = b''.join(batch)
+        if self.file is None:
+            self._open()
+        elif self.file.tell() + len(data) > self.max_bytes and self.file.tell() > FILE_HEADER.size:
+            self._rotate()
+        self.file.write(data)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def _write_loop(self):
+        running = True
+        while running:
+            batch = []
+            # Esperar el primer registro y juntar los que lleguen dentro del intervalo
+            item = self.queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    running = False
+                else:
+                    batch.append(item)
+                if not running:
+                    break
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except OSError as e:
+                    print(f"[ERROR] No se pudo escribir la telemetría: {e}")
+        if self.file is not None:
+            self.file.close()
+
+    def close(self):
+        """
+        Escribe lo pendiente y termina el hilo
+        """
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
+
+
+def scan_log(data, path):
+    """
+    Recorre el contenido de un log. Retorna (registros, fin válido): se detiene
+    en el primer registro truncado o con CRC inválido (escritura interrumpida)
+    """
+    if len(data) < FILE_HEADER.size:
+        return [], 0
+    magic, version = FILE_HEADER.unpack_from(data, 0)
+    if magic != LOG_MAGIC or version not in RECORDS:
+        raise ValueError(f"{path} no es un log de telemetría (versión {LOG_VERSION})")
+    record_size = RECORDS[version].size
+
+    records = []
+    position = FILE_HEADER.size
+    while position < len(data):
+        payload = b''
+        if position + FRAME.size <= len(data):
+            length, crc = FRAME.unpack_from(data, position)
+            payload = data[position + FRAME.size:position + FRAME.size + length]
+        if not payload or len(payload) < length or zlib.crc32(payload) != crc or length < record_size:
+            print(f"[ERROR] {path}: registro dañado en el byte {position}, se ignora el resto")
+            break
+        records.append(decode_record(payload, version))
+        position += FRAME.size + length
+    return records, position
+
+
+def read_log(path):
+    """
+    Lee los registros de un archivo de log sin fallar si quedó dañado al final
+    """
+    with open(path, 'rb') as f:
+        return scan_log(f.read(), path)[0]
+
+
+def read_all(directory=TELEMETRY_DIR, backups=TELEMETRY_BACKUPS):
+    """
+    Todos los registros, del archivo rotado más viejo al activo
+    """
+    records = []
+    for index in range(backups, -1, -1):
+        path = log_path(directory, index)
+        if os.path.exists(path):
+            records.extend(read_log(path))
+    return records
+
+
+if __name__ == "__main__":
+    # Resumen por nivel: python telemetry.py [directorio]
+    records = read_all(sys.argv[1] if len(sys.argv) > 1 else TELEMETRY_DIR)
+    print(f"{len(records)} niveles registrados")
+    levels = sorted({record['level'] for record in records})
+    for level in levels:
+        played = [record for record in records if record['level'] == level]
+        failed = [record for record in played if record['outcome'] == 'GAME_OVER']
+        wpm = sum(record['wpm'] for record in played) / len(played)
+        accuracy = sum(record['accuracy'] for record in played) / len(played)
+        print(f"Nivel {level}: {len(played)} jugados, {len(failed)} perdidos, "
+              f"WPM {wpm:.0f}, precisión {accuracy:.0f}%")
@@ -7,23 +7,28 @@ from config import (
     WEBCAM_X, WEBCAM_Y, WEBCAM_WIDTH, WEBCAM_HEIGHT,
     FONT_SIZE, PHRASE_FONT_SIZE, INPUT_FONT_SIZE, TITLE_FONT_SIZE, HUD_FONT_SIZE
 )
-from effects import draw_glow_text
+from effects import draw_glow_text, render_glow_text
+from font_manager import FontManager
 
 
 class UI:
-    def __init__(self, screen):
+    def __init__(self, screen, font_manager=None):
         self.screen = screen
-        pygame.font.init()
-        # Usar Consolas para mejor legibilidad (monospace)
-        self.font = pygame.font.SysFont('consolas', FONT_SIZE, bold=False)
-        self.phrase_font = pygame.font.SysFont('consolas', PHRASE_FONT_SIZE, bold=True)
-        self.input_font = pygame.font.SysFont('consolas', INPUT_FONT_SIZE, bold=False)
-        self.title_font = pygame.font.SysFont('consolas', TITLE_FONT_SIZE, bold=True)
-        self.hud_font = pygame.font.SysFont('consolas', HUD_FONT_SIZE, bold=False)
+        # Usar Consolas para mejor legibilidad (monospace), resuelta una sola vez
+        self.font_manager = font_manager or FontManager()
+        self.font = self.font_manager.get(FONT_SIZE, bold=False)
+        self.phrase_font = self.font_manager.get(PHRASE_FONT_SIZE, bold=True)
+        self.input_font = self.font_manager.get(INPUT_FONT_SIZE, bold=False)
+        self.title_font = self.font_manager.get(TITLE_FONT_SIZE, bold=True)
+        self.hud_font = self.font_manager.get(HUD_FONT_SIZE, bold=False)
+        self.font_manager.report()
+        # Frases ya renderizadas (la actual y la siguiente)
+        self.phrase_surfaces = {}
     
-    def draw_hud(self, level_number, score, combo, wpm):
+    def draw_hud(self, level_number, score, combo, wpm, impact_seconds=None):
         """
         Dibuja el HUD con informacion del juego - todo en la parte superior
+        impact_seconds: segundos hasta el choque a la velocidad actual (None = no mostrar)
         """
         # Nivel en esquina superior izquierda
         level_text = f"NIVEL {level_number}"
@@ -41,29 +46,42 @@ class UI:
         if combo > 0:
             combo_text = f"COMBO x{combo}"
             draw_glow_text(self.screen, self.hud_font, combo_text, (WINDOW_WIDTH - 150, 20), WHITE, glow_size=1)
+        
+        # Tiempo hasta el choque debajo del nivel (la posición es el centro del texto)
+        if impact_seconds is not None:
+            impact_text = f"IMPACTO: {impact_seconds:.1f}s"
+            impact_color = RED if impact_seconds < 3 else WHITE
+            draw_glow_text(self.screen, self.hud_font, impact_text, (90, 55), impact_color, glow_size=1)
     
     def draw_phrase(self, phrase, show=True):
         """
         Dibuja la frase objetivo centrada verticalmente
         """
         if show:
-            draw_glow_text(
-                self.screen,
-                self.phrase_font,
-                f'{phrase}',
-                (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 3),
-                WHITE,
-                glow_size=1  # Reducido de 4 a 1
-            )
+            surface = self.prepare_phrase(phrase)
+            self.screen.blit(surface, surface.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 3)))
+    
+    def prepare_phrase(self, phrase):
+        """
+        Renderiza la frase una sola vez (se puede llamar antes de mostrarla);
+        se conservan solo las dos últimas
+        """
+        surface = self.phrase_surfaces.get(phrase)
+        if surface is None:
+            surface = render_glow_text(self.phrase_font, f'{phrase}', WHITE, glow_size=1)  # Reducido de 4 a 1
+            if len(self.phrase_surfaces) >= 2:
+                del self.phrase_surfaces[next(iter(self.phrase_surfaces))]
+            self.phrase_surfaces[phrase] = surface
+        return surface
     
     def draw_user_input_with_feedback(self, phrase_manager):
         """
         Dibuja el input del usuario con feedback visual caracter por caracter
         """
-        comparison = phrase_manager.get_character_comparison()
-        user_input = phrase_manager.get_user_input()
+        # Estado incremental del PhraseManager: no se recalcula la comparación
+        input_length = phrase_manager.input_length
         
-        if not user_input:
+        if input_length == 0:
             # Mostrar placeholder
             draw_glow_text(
                 self.screen,
@@ -76,13 +94,15 @@ class UI:
             return
         
         # Calcular posición inicial para centrar el texto
-        total_width = len(user_input) * 25  # Ajustado para Consolas
+        total_width = input_length * 25  # Ajustado para Consolas
         start_x = (WINDOW_WIDTH - total_width) // 2
         y = WINDOW_HEIGHT - 100
         
-        # Dibujar cada carácter con su color (blanco correcto, gris incorrecto)
+        # Dibujar cada carácter con su color (blanco correcto, gris incorrecto);
+        # el primer error se subraya: es hasta donde hay que borrar
+        first_error = phrase_manager.first_error
         x_offset = start_x
-        for char, is_correct in comparison:
+        for index, (char, is_correct) in enumerate(zip(phrase_manager.chars, phrase_manager.correct_flags)):
             color = WHITE if is_correct else GRAY
             char_surface = self.input_font.render(char, True, color)
             char_rect = char_surface.get_rect(center=(x_offset, y))
@@ -96,6 +116,9 @@ class UI:
                 # self.screen.blit(glow_surf, (glow_rect.x + 1, glow_rect.y))
             
             self.screen.blit(char_surface, char_rect)
+            if index == first_error:
+                pygame.draw.line(self.screen, RED, (char_rect.left, char_rect.bottom),
+                                 (char_rect.right, char_rect.bottom), 2)
             x_offset += char_rect.width + 2
     
     def draw_countdown(self, time_left):
@@ -146,6 +169,31 @@ class UI:
             glow_size=1  # Reducido de 3 a 1
         )
     
+    def draw_paused(self):
+        """
+        Dibuja la pantalla de pausa (no se detecta la cara)
+        """
+        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 160))
+        self.screen.blit(overlay, (0, 0))
+        
+        draw_glow_text(
+            self.screen,
+            self.title_font,
+            'PAUSA',
+            (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 50),
+            WHITE,
+            glow_size=2
+        )
+        draw_glow_text(
+            self.screen,
+            self.font,
+            'Vuelve frente a la cámara o presiona una tecla',
+            (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 50),
+            GRAY,
+            glow_size=1
+        )
+    
     def draw_victory(self):
         """
         Dibuja la pantalla de victoria
@@ -167,9 +215,10 @@ class UI:
             glow_size=1  # Reducido de 3 a 1
         )
     
-    def draw_level_complete(self, level_number, score_breakdown):
+    def draw_level_complete(self, level_number, score_breakdown, percentile=None):
         """
         Dibuja la pantalla de nivel completado con desglose de puntuación
+        percentile: Opcional, % de jugadores superados en este nivel (leaderboard)
         """
         draw_glow_text(
             self.screen,
@@ -182,7 +231,6 @@ class UI:
         
         # Desglose de puntuación
         y_offset = 230  # Subido un poco
-        line_height = 50  # Reducido de 100 a 50 para evitar desbordamiento
         
         stats = [
             (f"WPM: {score_breakdown['wpm']}", WHITE),
@@ -190,9 +238,22 @@ class UI:
             (f"Combo Maximo: {score_breakdown['combo']}", WHITE),
             (f"Tiempo Ojos Cerrados: {score_breakdown['eyes_closed_time']}s", WHITE),
             (f"Puntos del Nivel: {score_breakdown['level_score']}", WHITE),
+        ]
+        if percentile is not None:
+            stats.append((f"Superaste al {percentile}% de los jugadores en este nivel", WHITE))
+        stats += [
             (f"Puntuación Total: {score_breakdown['total_score']}", WHITE),
+            (f"Ritmo: p50 {score_breakdown['interval_p50']} ms / p90 {score_breakdown['interval_p90']} ms", GRAY),
         ]
         
+        # Teclas con más errores (si hubo)
+        if score_breakdown['worst_keys']:
+            keys_text = '  '.join(f"'{char}' {rate}%" for char, rate in score_breakdown['worst_keys'])
+            stats.append((f"Errores por tecla: {keys_text}", GRAY))
+        
+        # Hasta 50 px por línea sin tapar la instrucción de abajo
+        line_height = min(50, (WINDOW_HEIGHT - 120 - y_offset) // len(stats))
+        
         for text, color in stats:
             draw_glow_text(
                 self.screen,